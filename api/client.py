@@ -0,0 +1,99 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.api_config import API_CONCURRENCY, API_TIMEOUT, API_MAX_RETRIES, API_BACKOFF, API_MAX_BACKOFF
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class IngestionError(Exception):
+    pass
+
+
+class RetryableResponse(Exception):
+    # Raised by a response check when the body itself signals a rate limit or a transient failure
+    pass
+
+
+class IngestionClient:
+    # Fetches JSON pages concurrently over one keep-alive session. Rate limits (429 or a body the
+    # check rejects), 5xx responses, timeouts and dropped connections are retried with exponential
+    # backoff and jitter, honouring Retry-After when the server sends it.
+    def __init__(self, concurrency: int = API_CONCURRENCY, timeout: float = API_TIMEOUT,
+                 max_retries: int = API_MAX_RETRIES, backoff: float = API_BACKOFF,
+                 max_backoff: float = API_MAX_BACKOFF, session: requests.Session = None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ingestion')
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def _delay(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _count(self, retried: bool):
+        with self._lock:
+            self.requests += 1
+            if retried:
+                self.retries += 1
+
+    def get_json(self, url: str, params: Dict = None, check: Callable[[Dict], None] = None) -> Dict:
+        for attempt in range(self.max_retries + 1):
+            self._count(attempt > 0)
+            retry_after, reason = None, None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code in RETRY_STATUSES:
+                    retry_after, reason = response.headers.get('Retry-After'), f"HTTP {response.status_code}"
+                else:
+                    response.raise_for_status()
+                    data = response.json()
+                    if check:
+                        check(data)
+                    return data
+            except (requests.ConnectionError, requests.Timeout, RetryableResponse) as e:
+                reason = str(e) or type(e).__name__
+            if attempt < self.max_retries:
+                time.sleep(self._delay(attempt, retry_after))
+        raise IngestionError(f"GET {url} failed after {self.max_retries + 1} attempts: {reason}")
+
+    def map_json(self, pages: Iterable[Tuple[str, Dict]], check: Callable[[Dict], None] = None) -> Iterator[Dict]:
+        # Yields each page in request order while keeping at most 2 * concurrency requests in flight,
+        # so callers can consume an unbounded page stream without buffering it
+        in_flight = deque()
+        for url, params in pages:
+            in_flight.append(self._executor.submit(self.get_json, url, params, check))
+            if len(in_flight) >= 2 * self.concurrency:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
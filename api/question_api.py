@@ -1,25 +1,60 @@
-from typing import List
-import requests
+from typing import Dict, Iterator, List, Set
+
+from api.client import IngestionClient, IngestionError, RetryableResponse
+from config.api_config import QUESTION_API_URL, QUESTION_PAGE_SIZE
 from model.Question import Question
 from model.Answer import Answer
 
+# OpenTDB reports errors in the body: 5 means too many requests from this address
+RATE_LIMITED = 5
+
+
+def _check_response(data: Dict):
+    if data.get('response_code') == RATE_LIMITED:
+        raise RetryableResponse("OpenTDB rate limit")
+    if data.get('response_code', 0) != 0:
+        raise IngestionError(f"OpenTDB returned response_code {data['response_code']}")
+
+
+def _to_pair(q_data: Dict) -> tuple[Question, List[Answer]]:
+    question = Question(
+        question_text=q_data['question'],
+        correct_answer=q_data['correct_answer']
+    )
+
+    incorrect_answers = [
+        Answer(question_id=None, incorrect_answer=a_data)
+        for a_data in q_data['incorrect_answers']
+    ]
+
+    return question, incorrect_answers
 
-def fetch_questions() -> List[tuple[Question, List[Answer]]]:
-    response = requests.get("https://opentdb.com/api.php?amount=20")
-    data = response.json()
-    question_answer_pairs = []
 
-    for q_data in data['results']:
-        question = Question(
-            question_text=q_data['question'],
-            correct_answer=q_data['correct_answer']
-        )
+def fetch_questions(amount: int = 20, client: IngestionClient = None) -> List[tuple[Question, List[Answer]]]:
+    return list(iter_questions(amount, client=client))
 
-        incorrect_answers = [
-            Answer(question_id=None, incorrect_answer=a_data)
-            for a_data in q_data['incorrect_answers']
-        ]
 
-        question_answer_pairs.append((question, incorrect_answers))
+def iter_questions(total: int, page_size: int = QUESTION_PAGE_SIZE, client: IngestionClient = None,
+                   max_stalled_rounds: int = 3) -> Iterator[tuple[Question, List[Answer]]]:
+    # Pages are fetched concurrently and questions are deduplicated by text. Because the API samples at
+    # random, full pages keep being requested until `total` distinct questions are found or several
+    # rounds in a row bring nothing new, which means the bank is exhausted.
+    if client is None:
+        with IngestionClient() as client:
+            yield from iter_questions(total, page_size, client, max_stalled_rounds)
+        return
 
-    return question_answer_pairs
\ No newline at end of file
+    seen: Set[str] = set()
+    stalled_rounds = 0
+    while len(seen) < total and stalled_rounds < max_stalled_rounds:
+        remaining = total - len(seen)
+        pages = [(QUESTION_API_URL, {'amount': min(page_size, total)}) for _ in range(0, remaining, page_size)]
+        found = 0
+        for data in client.map_json(pages, _check_response):
+            for q_data in data['results']:
+                if len(seen) >= total or q_data['question'] in seen:
+                    continue
+                seen.add(q_data['question'])
+                found += 1
+                yield _to_pair(q_data)
+        stalled_rounds = stalled_rounds + 1 if found == 0 else 0
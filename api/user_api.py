@@ -1,17 +1,29 @@
-from typing import List
-import requests
+from typing import Dict, Iterator, List
+
+from api.client import IngestionClient
+from config.api_config import USER_API_URL, USER_PAGE_SIZE
 from model.User import User
 
 
-def fetch_users() -> List[User]:
-    response = requests.get("https://randomuser.me/api?results=4")
-    data = response.json()
-    users = []
-    for user_data in data['results']:
-        user = User(
-            first=user_data['name']['first'],
-            last=user_data['name']['last'],
-            email=user_data['email']
-        )
-        users.append(user)
-    return users
+def _to_user(user_data: Dict) -> User:
+    return User(
+        first=user_data['name']['first'],
+        last=user_data['name']['last'],
+        email=user_data['email']
+    )
+
+
+def fetch_users(results: int = 4, client: IngestionClient = None) -> List[User]:
+    return list(iter_users(results, client=client))
+
+
+def iter_users(total: int, page_size: int = USER_PAGE_SIZE, client: IngestionClient = None) -> Iterator[User]:
+    if client is None:
+        with IngestionClient() as client:
+            yield from iter_users(total, page_size, client)
+        return
+
+    pages = ((USER_API_URL, {'results': min(page_size, total - offset)}) for offset in range(0, total, page_size))
+    for data in client.map_json(pages):
+        for user_data in data['results']:
+            yield _to_user(user_data)
@@ -0,0 +1,129 @@
+import logging
+import sys
+from typing import Dict
+
+from flask import Flask, jsonify
+
+from config.server_config import (
+    WEB_HOST,
+    WEB_PORT,
+    WEB_WORKERS,
+    WEB_THREADS,
+    WEB_TIMEOUT,
+    WEB_KEEPALIVE,
+    WEB_MAX_REQUESTS,
+    WEB_PRELOAD,
+    WEB_WARM_CACHES
+)
+from controllers.answer_controller import answer_blueprint
+from controllers.game_controller import game_blueprint
+from controllers.metrics_controller import metrics_blueprint
+from controllers.question_controller import question_blueprint
+from controllers.report_controller import report_blueprint
+from controllers.user_answer_controller import user_answer_blueprint
+from controllers.user_controller import user_blueprint
+from metrics import instrument as metrics
+from metrics.collectors import register_default_collectors
+from repository.database import get_pool, get_pool_stats
+from repository.leaderboard import leaderboard
+from repository.question_repository import get_all_questions
+from repository.storage import get_backend, is_postgres
+from service.answer_writer import answer_writer
+from service.game_store import flush_open_games, game_store
+from service.timing_stats import timing_recorder, track_timings
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(config: Dict = None) -> Flask:
+    # Building the app never touches the database, so it is safe to preload in the master process
+    app = Flask(__name__)
+    app.config.update(config or {})
+    app.register_blueprint(question_blueprint)
+    app.register_blueprint(user_blueprint)
+    app.register_blueprint(answer_blueprint)
+    app.register_blueprint(user_answer_blueprint)
+    app.register_blueprint(report_blueprint)
+    app.register_blueprint(game_blueprint)
+    app.register_blueprint(metrics_blueprint)
+    metrics.init_app(app)
+    register_default_collectors()
+
+    @app.route("/health", methods=['GET'])
+    def health_route():
+        if not is_postgres():
+            return jsonify({"status": "ok", "storage": get_backend()}), 200
+        stats = get_pool_stats()
+        return jsonify({"status": "ok", "pool": {"size": stats.size, "idle": stats.idle, "in_use": stats.in_use}}), 200
+
+    return app
+
+
+def init_worker(warm_caches: bool = WEB_WARM_CACHES):
+    # Runs once per worker process: opens this process's pool and loads the question cache and leaderboard,
+    # so the first requests do not pay for it
+    if is_postgres():
+        get_pool()
+    track_timings()
+    if warm_caches:
+        get_all_questions()
+        len(leaderboard)
+
+
+def worker_count(workers: int = WEB_WORKERS) -> int:
+    # A game kept in process memory is only found by the worker that started it, so several workers would
+    # lose games between requests
+    if workers > 1 and not game_store.shared:
+        raise ValueError(f"{type(game_store).__name__} keeps games in one process and cannot serve {workers} "
+                         f"workers; set GAME_STORE=database or WEB_WORKERS=1.")
+    logger.info("Serving with %d workers and %s", workers, type(game_store).__name__)
+    return workers
+
+
+def exit_worker():
+    answer_writer.close()
+    flush_open_games()
+    timing_recorder.close()
+
+
+def serve(app_factory=create_app, options: Dict = None):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def __init__(self):
+            self.application = app_factory()
+            super().__init__()
+
+        def load_config(self):
+            settings = {
+                'bind': f"{WEB_HOST}:{WEB_PORT}",
+                'workers': WEB_WORKERS,
+                'worker_class': 'gthread',
+                'threads': WEB_THREADS,
+                'timeout': WEB_TIMEOUT,
+                'keepalive': WEB_KEEPALIVE,
+                'max_requests': WEB_MAX_REQUESTS,
+                'max_requests_jitter': WEB_MAX_REQUESTS // 10,
+                'preload_app': WEB_PRELOAD,
+                'post_worker_init': lambda worker: init_worker(),
+                'worker_exit': lambda server, worker: exit_worker(),
+                **(options or {})
+            }
+            settings['workers'] = worker_count(settings['workers'])
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    Server().run()
+
+
+app = create_app()
+
+if __name__ == '__main__':
+    if '--dev' in sys.argv:
+        init_worker()
+        app.run(host=WEB_HOST, port=WEB_PORT, threaded=True)
+    else:
+        serve()
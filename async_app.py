@@ -0,0 +1,28 @@
+from quart import Quart
+
+from controllers.async_question_controller import async_question_blueprint
+from controllers.async_user_controller import async_user_blueprint
+from repository.async_database import get_async_pool, close_async_pool
+
+
+def create_async_app() -> Quart:
+    # ASGI app served from one event loop: every request awaits the async pool instead of holding a thread
+    app = Quart(__name__)
+    app.register_blueprint(async_question_blueprint)
+    app.register_blueprint(async_user_blueprint)
+
+    @app.before_serving
+    async def open_pool():
+        await get_async_pool()
+
+    @app.after_serving
+    async def close_pool():
+        await close_async_pool()
+
+    return app
+
+
+app = create_async_app()
+
+if __name__ == '__main__':
+    app.run()
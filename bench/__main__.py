@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from bench.data import SCALES, load_synthetic_data
+from bench.harness import compare, load_baseline, save_results
+from bench.suites import SUITES, run_suite
+from repository.database import create_tables, drop_all_tables
+from repository.storage import STORAGE_BACKENDS, get_backend, use_backend
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m bench', description="Trivia game benchmark suite")
+    parser.add_argument('--scale', choices=SCALES, default='small', help="size of the synthetic data set")
+    parser.add_argument('--users', type=int, help="override the number of users for the scale")
+    parser.add_argument('--questions', type=int, help="override the number of questions for the scale")
+    parser.add_argument('--answers', type=int, help="override the number of user answers for the scale")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--storage', choices=STORAGE_BACKENDS, default=get_backend(),
+                        help="storage backend to benchmark (default: DB_BACKEND)")
+    parser.add_argument('--no-load', action='store_true', help="benchmark the data already in the database")
+    parser.add_argument('--suite', action='append', choices=SUITES, help="suites to run (default: all)")
+    parser.add_argument('--only', help="run only benchmarks whose name contains this text")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--number', type=int, help="calls per run (default: calibrated per benchmark)")
+    parser.add_argument('--output', default='bench_results.json', help="where to write the JSON results")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown before a regression")
+    args = parser.parse_args(argv)
+    use_backend(args.storage)
+
+    users, questions, answers = SCALES[args.scale]
+    users, questions, answers = args.users or users, args.questions or questions, args.answers or answers
+    metadata = {'scale': args.scale, 'storage': args.storage, 'users': users, 'questions': questions,
+                'user_answers': answers}
+    if not args.no_load:
+        drop_all_tables()
+        create_tables()
+        loaded = load_synthetic_data(users, questions, answers, args.seed)
+        metadata['load_seconds'] = loaded.seconds
+        print(f"Loaded {users} users, {questions} questions and {answers} user answers in {loaded.seconds:.2f}s")
+
+    results = []
+    for suite in args.suite or list(SUITES):
+        for result in run_suite(suite, runs=args.runs, number=args.number, only=args.only):
+            print(f"{result.name:<55} {result.per_call * 1000:>10.3f} ms/call  ({result.number} x {result.runs})")
+            results.append(result)
+    save_results(args.output, results, metadata)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, load_baseline(args.baseline), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression.name}: {regression.baseline * 1000:.3f} -> "
+                  f"{regression.current * 1000:.3f} ms/call ({regression.ratio:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
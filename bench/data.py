@@ -0,0 +1,85 @@
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterator, List, Tuple
+
+from toolz import partition_all
+
+from model.Answer import Answer
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from repository.database import get_db_connection
+from repository.user_answer_repository import create_user_answers
+from seed.seed import bulk_seed
+
+# Named sizes for the synthetic data set: (users, questions, user_answers)
+SCALES = {
+    'tiny': (100, 50, 1_000),
+    'small': (1_000, 1_000, 10_000),
+    'medium': (10_000, 5_000, 100_000),
+    'large': (100_000, 10_000, 1_000_000),
+    'huge': (1_000_000, 50_000, 10_000_000)
+}
+
+
+@dataclass
+class SyntheticData:
+    users: int
+    questions: int
+    user_answers: int
+    seconds: float
+
+
+def generate_users(count: int, seed: int = 0) -> Iterator[User]:
+    rng = random.Random(seed)
+    for idx in range(count):
+        first = f"user{idx}"
+        yield User(first=first, last=f"last{rng.randrange(count)}", email=f"{first}@bench.example")
+
+
+def generate_questions(count: int, incorrect_answers: int = 3,
+                       seed: int = 0) -> Iterator[Tuple[Question, List[Answer]]]:
+    rng = random.Random(seed)
+    for idx in range(count):
+        question = Question(question_text=f"Benchmark question {idx}?", correct_answer=f"answer {idx}")
+        answers = [Answer(question_id=None, incorrect_answer=f"wrong {idx}.{rng.randrange(1000)}")
+                   for _ in range(incorrect_answers)]
+        yield question, answers
+
+
+def generate_user_answers(count: int, user_ids: List[int], question_ids: List[int],
+                          seed: int = 0) -> Iterator[UserAnswer]:
+    # Each question gets a fixed difficulty so success rates and timings differ per question, the way real
+    # play does; answer times are log-normal around a few seconds
+    rng = random.Random(seed)
+    difficulty = {question_id: rng.random() for question_id in question_ids}
+    for _ in range(count):
+        question_id = rng.choice(question_ids)
+        is_correct = rng.random() > difficulty[question_id]
+        yield UserAnswer(
+            user_id=rng.choice(user_ids),
+            question_id=question_id,
+            answer_text="answer" if is_correct else "wrong",
+            is_correct=is_correct,
+            time_taken=timedelta(microseconds=int(rng.lognormvariate(1.2, 0.6) * 1_000_000))
+        )
+
+
+def _ids(table: str) -> List[int]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {table} ORDER BY id")
+        return [row['id'] for row in cursor.fetchall()]
+
+
+def load_synthetic_data(users: int, questions: int, user_answers: int, seed: int = 0,
+                        batch_size: int = 50_000) -> SyntheticData:
+    # Expects empty tables. user_answer rows are committed batch by batch so 10^7 rows never sit in one transaction.
+    start_time = time.perf_counter()
+    bulk_seed(generate_users(users, seed), generate_questions(questions, seed=seed), batch_size)
+    user_ids, question_ids = _ids('trivia_user'), _ids('question')
+    for batch in partition_all(batch_size, generate_user_answers(user_answers, user_ids, question_ids, seed)):
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            create_user_answers(list(batch), cursor)
+    return SyntheticData(users, questions, user_answers, time.perf_counter() - start_time)
@@ -0,0 +1,109 @@
+import gc
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List
+
+
+@dataclass
+class BenchResult:
+    name: str
+    group: str
+    runs: int
+    number: int
+    min: float
+    median: float
+    mean: float
+    p95: float
+    max: float
+
+    @property
+    def per_call(self) -> float:
+        return self.median / self.number
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float('inf')
+
+
+def _autorange(fn: Callable[[], object], min_time: float, max_number: int) -> int:
+    # Like timeit's autorange: double the call count until one run takes at least min_time
+    number = 1
+    while number < max_number:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= min_time:
+            break
+        number *= 2
+    return min(number, max_number)
+
+
+def measure(name: str, group: str, fn: Callable[[], object], runs: int = 5, number: int = None,
+            warmup: int = 1, min_time: float = 0.05, max_number: int = 1000) -> BenchResult:
+    # Times `number` calls per run (calibrated when not given); collection is disabled while timing so GC
+    # pauses do not land in a single run
+    for _ in range(warmup):
+        fn()
+    if number is None:
+        number = _autorange(fn, min_time, max_number)
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    timings.sort()
+    return BenchResult(
+        name=name,
+        group=group,
+        runs=runs,
+        number=number,
+        min=timings[0],
+        median=statistics.median(timings),
+        mean=statistics.fmean(timings),
+        p95=timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        max=timings[-1]
+    )
+
+
+def results_to_json(results: List[BenchResult], metadata: Dict = None) -> Dict:
+    return {
+        'metadata': {'python': platform.python_version(), 'platform': platform.platform(), **(metadata or {})},
+        'results': {result.name: {**asdict(result), 'per_call': result.per_call} for result in results}
+    }
+
+
+def save_results(path: str, results: List[BenchResult], metadata: Dict = None):
+    with open(path, 'w') as output:
+        json.dump(results_to_json(results, metadata), output, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    with open(path) as baseline:
+        return {name: result['per_call'] for name, result in json.load(baseline)['results'].items()}
+
+
+def compare(results: List[BenchResult], baseline: Dict[str, float], threshold: float = 0.2) -> List[Regression]:
+    # A benchmark regresses when its median per-call time is more than `threshold` slower than the baseline;
+    # benchmarks missing from the baseline are skipped
+    return [
+        Regression(result.name, baseline[result.name], result.per_call)
+        for result in results
+        if result.name in baseline and result.per_call > baseline[result.name] * (1 + threshold)
+    ]
@@ -0,0 +1,189 @@
+import importlib.util
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from bench.data import generate_users
+from bench.harness import BenchResult, measure
+from model.Answer import Answer
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from repository import analytics_repository, answer_repository, question_repository, user_answer_repository, \
+    user_repository
+from repository.leaderboard import top_between
+from repository.storage import is_postgres
+from seed.seed import bulk_seed
+from service import service, sql_service
+from service.analytics import aggregate_answers
+
+BATCH = 100
+
+
+def _consume(iterator):
+    deque(iterator, maxlen=0)
+
+
+def _first_ids() -> Dict[str, int]:
+    return {
+        'user': user_repository.get_users_page(1)[0].id,
+        'question': question_repository.get_questions_page(1)[0].id,
+        'answer': answer_repository.get_all_answers()[0].id,
+        'user_answer': user_answer_repository.get_user_answers_page(1)[0].id
+    }
+
+
+def repository_benchmarks() -> Dict[str, Callable[[], object]]:
+    ids = _first_ids()
+    user = user_repository.find_user_by_id(ids['user'])
+    question = question_repository.find_question_by_id(ids['question'])
+    answer = answer_repository.find_answer_by_id(ids['answer'])
+    user_answer = user_answer_repository.find_user_answer_by_id(ids['user_answer'])
+    question_ids = [q.id for q in question_repository.get_questions_page(BATCH)]
+
+    def new_user():
+        return User(first="bench", last="user", email="bench@bench.example")
+
+    def new_question():
+        return Question(question_text="Bench question?", correct_answer="yes")
+
+    def new_answer():
+        return Answer(question_id=question.id, incorrect_answer="no")
+
+    def new_user_answer():
+        return UserAnswer(user_id=user.id, question_id=question.id, answer_text="yes", is_correct=True,
+                          time_taken=timedelta(seconds=2))
+
+    # Reads run before writes so they see the generated data set rather than rows added by the write benchmarks
+    benchmarks = {
+        'user.get_all_users': user_repository.get_all_users,
+        'user.get_users_page': lambda: user_repository.get_users_page(BATCH),
+        'user.iter_users': lambda: _consume(user_repository.iter_users()),
+        'user.find_user_by_id': lambda: user_repository.find_user_by_id(user.id),
+        'question.get_all_questions': question_repository.get_all_questions,
+        'question.get_questions_page': lambda: question_repository.get_questions_page(BATCH),
+        'question.iter_questions': lambda: _consume(question_repository.iter_questions()),
+        'question.get_questions_with_answers': lambda: question_repository.get_questions_with_answers(question_ids),
+        'question.find_question_by_id': lambda: question_repository.find_question_by_id(question.id),
+        'answer.get_answers_by_question_id': lambda: answer_repository.get_answers_by_question_id(question.id),
+        'answer.get_answers_by_question_ids': lambda: answer_repository.get_answers_by_question_ids(question_ids),
+        'answer.find_answer_by_id': lambda: answer_repository.find_answer_by_id(answer.id),
+        'user_answer.get_all_user_answers': user_answer_repository.get_all_user_answers,
+        'user_answer.get_user_answers_page': lambda: user_answer_repository.get_user_answers_page(BATCH),
+        'user_answer.iter_user_answers': lambda: _consume(user_answer_repository.iter_user_answers()),
+        'user_answer.get_user_answer_batch': user_answer_repository.get_user_answer_batch,
+        'user_answer.find_user_answer_by_id': lambda: user_answer_repository.find_user_answer_by_id(user_answer.id),
+        'analytics.find_highest_scorer': analytics_repository.find_highest_scorer,
+        'analytics.find_fastest_answered_question': analytics_repository.find_fastest_answered_question,
+        'analytics.find_second_place_user': analytics_repository.find_second_place_user,
+        'analytics.get_average_time_per_question': analytics_repository.get_average_time_per_question,
+        'analytics.get_success_rate_per_question': analytics_repository.get_success_rate_per_question,
+        'analytics.get_users_who_answered_all_questions': analytics_repository.get_users_who_answered_all_questions,
+        'analytics.get_median_times': analytics_repository.get_median_times,
+        'leaderboard.top_between_24h': lambda: top_between(BATCH, datetime.now(timezone.utc) - timedelta(hours=24)),
+        'analytics.get_user_reports': analytics_repository.get_user_reports,
+        'user.create_user': lambda: user_repository.create_user(new_user()),
+        'user.create_users': lambda: user_repository.create_users([new_user() for _ in range(BATCH)]),
+        'user.update_user': lambda: user_repository.update_user(user.id, user),
+        'user.create_and_delete_user': lambda: user_repository.delete_user(user_repository.create_user(new_user())),
+        'question.create_question': lambda: question_repository.create_question(new_question()),
+        'question.create_questions': lambda: question_repository.create_questions(
+            [new_question() for _ in range(BATCH)]),
+        'question.update_question': lambda: question_repository.update_question(question.id, question),
+        'question.create_and_delete_question': lambda: question_repository.delete_question(
+            question_repository.create_question(new_question())),
+        'answer.create_answer': lambda: answer_repository.create_answer(new_answer()),
+        'answer.create_answers': lambda: answer_repository.create_answers([new_answer() for _ in range(BATCH)]),
+        'answer.update_answer': lambda: answer_repository.update_answer(answer.id, answer),
+        'answer.create_and_delete_answer': lambda: answer_repository.delete_answer(
+            answer_repository.create_answer(new_answer())),
+        'user_answer.create_user_answer': lambda: user_answer_repository.create_user_answer(new_user_answer()),
+        'user_answer.create_user_answers': lambda: user_answer_repository.create_user_answers(
+            [new_user_answer() for _ in range(BATCH)]),
+        'user_answer.update_user_answer': lambda: user_answer_repository.update_user_answer(user_answer.id,
+                                                                                           user_answer)
+    }
+    if not is_postgres():
+        # The analytics queries are written for Postgres
+        benchmarks = {name: fn for name, fn in benchmarks.items() if not name.startswith('analytics.')}
+    return benchmarks
+
+
+def service_benchmarks() -> Dict[str, Callable[[], object]]:
+    users, questions, user_answers = service.get_data()
+    batch = user_answer_repository.get_user_answer_batch()
+    benchmarks = {
+        'service.get_data': service.get_data,
+        'service.aggregate_answers': lambda: aggregate_answers(user_answers),
+        'service.aggregate_answers.columnar': lambda: aggregate_answers(batch),
+        'service.exercise_1': lambda: service.exercise_1(users, user_answers),
+        'service.exercise_2': lambda: service.exercise_2(questions, user_answers),
+        'service.exercise_3': lambda: service.exercise_3(users, user_answers),
+        'service.exercise_4': lambda: service.exercise_4(questions, user_answers),
+        'service.exercise_5': lambda: service.exercise_5(questions, user_answers),
+        'service.exercise_6': lambda: service.exercise_6(users, questions, user_answers),
+        'service.exercise_7': lambda: service.exercise_7(user_answers),
+        'service.exercise_8': lambda: service.exercise_8(users, questions, user_answers)
+    }
+    backends = ['python', 'columnar']
+    if is_postgres():
+        for idx in range(1, 9):
+            benchmarks[f'sql_service.exercise_{idx}'] = getattr(sql_service, f'exercise_{idx}')
+        backends.append('sql')
+    if importlib.util.find_spec('pandas') is not None:
+        backends.insert(2, 'vectorized')
+    for backend in backends:
+        benchmarks[f'service.run_exercises.{backend}'] = lambda backend=backend: service.run_exercises(backend)
+    return benchmarks
+
+
+def seed_benchmarks() -> Dict[str, Callable[[], object]]:
+    return {
+        'seed.bulk_seed_users': lambda: bulk_seed(generate_users(1_000), [])
+    }
+
+
+def route_benchmarks() -> Dict[str, Callable[[], object]]:
+    from app import create_app
+
+    client = create_app({'TESTING': True}).test_client()
+    ids = _first_ids()
+
+    def get(path: str):
+        def request():
+            response = client.get(path)
+            response.get_data()
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return request
+
+    return {
+        'route.get_users_page': get(f"/users?limit={BATCH}"),
+        'route.get_user': get(f"/users/{ids['user']}"),
+        'route.get_questions': get("/questions"),
+        'route.get_questions_page': get(f"/questions?limit={BATCH}"),
+        'route.get_question': get(f"/questions/{ids['question']}"),
+        'route.stream_questions': get("/questions?stream=ndjson"),
+        'route.get_question_answers': get(f"/questions/{ids['question']}/answers"),
+        'route.get_user_answers_page': get(f"/user-answers?limit={BATCH}"),
+        'route.get_leaderboard': get("/leaderboard?limit=10"),
+        'route.post_user': lambda: client.post("/users", json={"first": "bench", "last": "route",
+                                                               "email": "route@bench.example"})
+    }
+
+
+# Suites that write rows run last
+SUITES = {
+    'service': service_benchmarks,
+    'routes': route_benchmarks,
+    'repository': repository_benchmarks,
+    'seed': seed_benchmarks
+}
+
+
+def run_suite(name: str, runs: int = 5, number: int = None, only: str = None) -> List[BenchResult]:
+    return [
+        measure(bench_name, name, fn, runs=runs, number=number)
+        for bench_name, fn in SUITES[name]().items()
+        if only is None or only in bench_name
+    ]
@@ -0,0 +1,18 @@
+import os
+
+QUESTION_API_URL = os.getenv('QUESTION_API_URL', 'https://opentdb.com/api.php')
+USER_API_URL = os.getenv('USER_API_URL', 'https://randomuser.me/api')
+
+API_CONCURRENCY = int(os.getenv('API_CONCURRENCY', '8'))
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', '10'))
+API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '5'))
+API_BACKOFF = float(os.getenv('API_BACKOFF', '0.5'))
+API_MAX_BACKOFF = float(os.getenv('API_MAX_BACKOFF', '30'))
+
+# OpenTDB serves at most 50 questions per request, randomuser.me at most 5000 users
+QUESTION_PAGE_SIZE = int(os.getenv('QUESTION_PAGE_SIZE', '50'))
+USER_PAGE_SIZE = int(os.getenv('USER_PAGE_SIZE', '500'))
+
+SEED_USERS = int(os.getenv('SEED_USERS', '4'))
+SEED_QUESTIONS = int(os.getenv('SEED_QUESTIONS', '20'))
+SEED_BATCH_SIZE = int(os.getenv('SEED_BATCH_SIZE', '1000'))
@@ -0,0 +1,4 @@
+import os
+
+QUESTION_CACHE_SIZE = int(os.getenv('QUESTION_CACHE_SIZE', '4096'))
+QUESTION_CACHE_TTL = float(os.getenv('QUESTION_CACHE_TTL', '300'))
@@ -0,0 +1,4 @@
+import os
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+METRICS_PREFIX = os.getenv('METRICS_PREFIX', 'trivia')
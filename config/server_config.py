@@ -0,0 +1,13 @@
+import multiprocessing
+import os
+
+WEB_HOST = os.getenv('WEB_HOST', '0.0.0.0')
+WEB_PORT = int(os.getenv('WEB_PORT', '8000'))
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+WEB_THREADS = int(os.getenv('WEB_THREADS', '4'))
+WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', '30'))
+WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', '5'))
+WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', '10000'))
+WEB_PRELOAD = os.getenv('WEB_PRELOAD', 'true').lower() == 'true'
+WEB_WARM_CACHES = os.getenv('WEB_WARM_CACHES', 'true').lower() == 'true'
+WEB_MAX_BATCH = int(os.getenv('WEB_MAX_BATCH', '10000'))
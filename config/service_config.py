@@ -0,0 +1,30 @@
+import os
+
+ANALYTICS_BACKEND = os.getenv('ANALYTICS_BACKEND', 'python')
+
+GAME_FLUSH_EVERY = int(os.getenv('GAME_FLUSH_EVERY', '10'))
+
+# Exact medians keep every answer's time in memory (about 32 bytes per answer as a Python float); false switches the
+# python and columnar analytics to fixed-size quantile sketches
+ANALYTICS_EXACT_MEDIANS = os.getenv('ANALYTICS_EXACT_MEDIANS', 'true').lower() == 'true'
+TIMING_SKETCH_K = int(os.getenv('TIMING_SKETCH_K', '200'))
+QUESTION_SKETCH_K = int(os.getenv('QUESTION_SKETCH_K', '64'))
+TIMING_FLUSH_INTERVAL = float(os.getenv('TIMING_FLUSH_INTERVAL', '5'))
+
+# database keeps games in game_session, where every worker finds them; memory keeps them in the process that
+# started them and only suits a single worker
+GAME_STORE = os.getenv('GAME_STORE', 'database')
+GAME_SESSION_TTL = float(os.getenv('GAME_SESSION_TTL', '1800'))
+GAME_SESSION_MAX = int(os.getenv('GAME_SESSION_MAX', '100000'))
+# Most questions a player can pick for one round
+GAME_MAX_QUESTIONS = int(os.getenv('GAME_MAX_QUESTIONS', '100'))
+
+ANSWER_QUEUE_SIZE = int(os.getenv('ANSWER_QUEUE_SIZE', '10000'))
+ANSWER_BATCH_SIZE = int(os.getenv('ANSWER_BATCH_SIZE', '500'))
+ANSWER_FLUSH_INTERVAL = float(os.getenv('ANSWER_FLUSH_INTERVAL', '0.05'))
+ANSWER_QUEUE_TIMEOUT = float(os.getenv('ANSWER_QUEUE_TIMEOUT', '1'))
+ANSWER_RETRY_BACKOFF = float(os.getenv('ANSWER_RETRY_BACKOFF', '0.1'))
+ANSWER_MAX_BACKOFF = float(os.getenv('ANSWER_MAX_BACKOFF', '5'))
+# Tries of one batch before its answers are given up as lost
+ANSWER_MAX_ATTEMPTS = int(os.getenv('ANSWER_MAX_ATTEMPTS', '10'))
+ANSWER_SHUTDOWN_TIMEOUT = float(os.getenv('ANSWER_SHUTDOWN_TIMEOUT', '10'))
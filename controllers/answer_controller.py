@@ -0,0 +1,71 @@
+from dataclasses import asdict
+from typing import Dict, List
+from flask import Blueprint, jsonify, request
+from controllers.bulk import bulk_create, check_fields, id_field, missing_references, text_field
+from model.Answer import Answer
+from repository.answer_repository import (
+    create_answer,
+    create_answers,
+    get_all_answers,
+    find_answer_by_id,
+    update_answer,
+    delete_answer
+)
+from repository.question_repository import find_existing_question_ids
+
+answer_blueprint = Blueprint("answers", __name__)
+
+
+def answer_from_item(item) -> Answer:
+    check_fields(item, {'question_id', 'incorrect_answer'})
+    return Answer(question_id=id_field(item, 'question_id'), incorrect_answer=text_field(item, 'incorrect_answer', 255))
+
+def check_answer_questions(answers: List[Answer]) -> List[Dict]:
+    question_ids = [answer.question_id for answer in answers]
+    return missing_references(question_ids, find_existing_question_ids(question_ids), 'question_id')
+
+
+@answer_blueprint.route("/answers", methods=['GET'])
+def get_all_answers_route():
+    question_id = request.args.get('question_id')
+    if question_id is not None and not question_id.isdigit():
+        return jsonify({"error": "question_id must be a non-negative integer"}), 400
+    answers = get_all_answers(int(question_id) if question_id is not None else None)
+    return jsonify(list(map(asdict, answers))), 200
+
+@answer_blueprint.route("/questions/<int:question_id>/answers", methods=['GET'])
+def get_question_answers_route(question_id):
+    return jsonify(list(map(asdict, get_all_answers(question_id)))), 200
+
+@answer_blueprint.route("/answers/<int:answer_id>", methods=['GET'])
+def get_answer_by_id(answer_id):
+    answer = find_answer_by_id(answer_id)
+    if answer:
+        return jsonify(asdict(answer)), 200
+    return jsonify({"error": "Answer not found"}), 404
+
+@answer_blueprint.route("/answers", methods=['POST'])
+def create_answer_route():
+    answer_data = request.json
+    if isinstance(answer_data, list):
+        return bulk_create(answer_data, answer_from_item, create_answers, "answers", check_answer_questions)
+    new_answer = Answer(**answer_data)
+    try:
+        answer_id = create_answer(new_answer)
+        return jsonify({"id": answer_id, "message": "Answer created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@answer_blueprint.route("/answers/<int:answer_id>", methods=['PUT'])
+def update_answer_route(answer_id):
+    answer_data = request.json
+    updated_answer = Answer(**answer_data)
+    if update_answer(answer_id, updated_answer):
+        return jsonify({"message": "Answer updated successfully"}), 200
+    return jsonify({"error": "Answer not found"}), 404
+
+@answer_blueprint.route("/answers/<int:answer_id>", methods=['DELETE'])
+def delete_answer_route(answer_id):
+    if delete_answer(answer_id):
+        return jsonify({"message": "Answer deleted successfully"}), 200
+    return jsonify({"error": "Answer not found"}), 404
@@ -0,0 +1,44 @@
+from dataclasses import asdict
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List
+
+from quart import Response, jsonify, request
+
+from controllers.pagination import (
+    STREAM_MIMETYPES,
+    page_args,
+    page_body,
+    stream_close,
+    stream_format_arg,
+    stream_item,
+    stream_open,
+    wants_page
+)
+
+
+async def _stream(stream_format: str, items: AsyncIterable, serialize: Callable[[object], Dict]) \
+        -> AsyncIterator[str]:
+    if stream_open(stream_format):
+        yield stream_open(stream_format)
+    index = 0
+    async for item in items:
+        yield stream_item(stream_format, index, serialize(item))
+        index += 1
+    if stream_close(stream_format):
+        yield stream_close(stream_format)
+
+
+async def list_response(get_all: Callable[[], Awaitable[List]], get_page: Callable[[int, int], Awaitable[List]],
+                        iter_all: Callable[[], AsyncIterable], serialize: Callable[[object], Dict] = asdict):
+    # Same query string and responses as controllers.pagination.list_response, built from its helpers
+    try:
+        stream_format = stream_format_arg(request.args)
+        if stream_format is None and wants_page(request.args):
+            limit, after_id = page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream_format is not None:
+        return Response(_stream(stream_format, iter_all(), serialize), mimetype=STREAM_MIMETYPES[stream_format]), 200
+    if not wants_page(request.args):
+        return jsonify(list(map(serialize, await get_all()))), 200
+    return jsonify(page_body(await get_page(limit, after_id), limit, serialize)), 200
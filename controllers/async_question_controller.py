@@ -0,0 +1,50 @@
+from dataclasses import asdict
+from quart import Blueprint, jsonify, request
+from controllers.async_pagination import list_response
+from model.Question import Question
+from repository.async_question_repository import (
+    create_question,
+    get_all_questions,
+    get_questions_page,
+    iter_questions,
+    find_question_by_id,
+    update_question,
+    delete_question
+)
+
+async_question_blueprint = Blueprint("async_questions", __name__)
+
+@async_question_blueprint.route("/questions", methods=['GET'])
+async def get_all_questions_route():
+    return await list_response(get_all_questions, get_questions_page, iter_questions)
+
+@async_question_blueprint.route("/questions/<int:question_id>", methods=['GET'])
+async def get_question_by_id(question_id):
+    question = await find_question_by_id(question_id)
+    if question:
+        return jsonify(asdict(question)), 200
+    return jsonify({"error": "Question not found"}), 404
+
+@async_question_blueprint.route("/questions", methods=['POST'])
+async def create_question_route():
+    question_data = await request.get_json()
+    new_question = Question(**question_data)
+    try:
+        question_id = await create_question(new_question)
+        return jsonify({"id": question_id, "message": "Question created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@async_question_blueprint.route("/questions/<int:question_id>", methods=['PUT'])
+async def update_question_route(question_id):
+    question_data = await request.get_json()
+    updated_question = Question(**question_data)
+    if await update_question(question_id, updated_question):
+        return jsonify({"message": "Question updated successfully"}), 200
+    return jsonify({"error": "Question not found"}), 404
+
+@async_question_blueprint.route("/questions/<int:question_id>", methods=['DELETE'])
+async def delete_question_route(question_id):
+    if await delete_question(question_id):
+        return jsonify({"message": "Question deleted successfully"}), 200
+    return jsonify({"error": "Question not found"}), 404
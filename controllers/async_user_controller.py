@@ -0,0 +1,50 @@
+from dataclasses import asdict
+from quart import Blueprint, jsonify, request
+from controllers.async_pagination import list_response
+from model.User import User
+from repository.async_user_repository import (
+    get_all_users,
+    get_users_page,
+    iter_users,
+    find_user_by_id,
+    create_user,
+    update_user,
+    delete_user
+)
+
+async_user_blueprint = Blueprint("async_users", __name__)
+
+@async_user_blueprint.route("/users", methods=['GET'])
+async def get_all_users_route():
+    return await list_response(get_all_users, get_users_page, iter_users)
+
+@async_user_blueprint.route("/users/<int:user_id>", methods=['GET'])
+async def get_user_by_id(user_id):
+    user = await find_user_by_id(user_id)
+    if user:
+        return jsonify(asdict(user)), 200
+    return jsonify({"error": "User not found"}), 404
+
+@async_user_blueprint.route("/users", methods=['POST'])
+async def create_user_route():
+    user_data = await request.get_json()
+    new_user = User(**user_data)
+    try:
+        user_id = await create_user(new_user)
+        return jsonify({"id": user_id, "message": "User created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@async_user_blueprint.route("/users/<int:user_id>", methods=['PUT'])
+async def update_user_route(user_id):
+    user_data = await request.get_json()
+    updated_user = User(**user_data)
+    if await update_user(user_id, updated_user):
+        return jsonify({"message": "User updated successfully"}), 200
+    return jsonify({"error": "User not found"}), 404
+
+@async_user_blueprint.route("/users/<int:user_id>", methods=['DELETE'])
+async def delete_user_route(user_id):
+    if await delete_user(user_id):
+        return jsonify({"message": "User deleted successfully"}), 200
+    return jsonify({"error": "User not found"}), 404
@@ -0,0 +1,75 @@
+from typing import Callable, Dict, List, Set, TypeVar
+
+from flask import jsonify
+
+from config.server_config import WEB_MAX_BATCH
+from repository.database import integrity_errors
+
+T = TypeVar('T')
+
+
+def text_value(value, name: str, max_length: int = None) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{name} must be a non-empty string")
+    if max_length is not None and len(value) > max_length:
+        raise ValueError(f"{name} must be at most {max_length} characters")
+    return value
+
+def text_field(item: Dict, name: str, max_length: int = None) -> str:
+    return text_value(item.get(name), name, max_length)
+
+def _is_id(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def id_field(item: Dict, name: str) -> int:
+    value = item.get(name)
+    if not _is_id(value):
+        raise ValueError(f"{name} must be a positive integer")
+    return value
+
+def id_list_field(item: Dict, name: str, max_length: int) -> List[int]:
+    values = item.get(name)
+    if not isinstance(values, list) or not 0 < len(values) <= max_length or not all(map(_is_id, values)):
+        raise ValueError(f"{name} must be a list of 1 to {max_length} positive integers")
+    return values
+
+def check_fields(item: Dict, allowed: Set[str]):
+    if not isinstance(item, dict):
+        raise ValueError("item must be a JSON object")
+    unknown = sorted(set(item) - allowed)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+
+
+def missing_references(ids: List[int], existing: Set[int], name: str) -> List[Dict]:
+    return [{"index": index, "error": f"{name} {value} does not exist"}
+            for index, value in enumerate(ids) if value not in existing]
+
+
+def bulk_create(items, parse: Callable[[Dict], T], create: Callable[[List[T]], List[int]], noun: str,
+                check: Callable[[List[T]], List[Dict]] = None):
+    # The whole batch is validated before anything is written and one bad item rejects it. Every malformed
+    # item is reported with its index; references to other rows are checked once all items parse.
+    if not items:
+        return jsonify({"error": "The request body must be a non-empty JSON array"}), 400
+    if len(items) > WEB_MAX_BATCH:
+        return jsonify({"error": f"A batch can hold at most {WEB_MAX_BATCH} items"}), 413
+
+    parsed, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            parsed.append(parse(item))
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append({"index": index, "error": str(e)})
+    if not errors and check is not None:
+        errors = check(parsed)
+    if errors:
+        return jsonify({"error": f"{len(errors)} of {len(items)} {noun} are invalid; nothing was created",
+                        "errors": errors}), 400
+
+    try:
+        new_ids = create(parsed)
+    except integrity_errors() as e:
+        # A referenced row was deleted between the check and the insert
+        return jsonify({"error": str(e).strip()}), 409
+    return jsonify({"ids": new_ids, "message": f"{len(new_ids)} {noun} created successfully"}), 201
@@ -0,0 +1,83 @@
+from dataclasses import asdict
+from flask import Blueprint, jsonify, request
+from config.service_config import GAME_MAX_QUESTIONS
+from controllers.bulk import id_list_field
+from repository.user_repository import find_user_by_id
+from service.game_session import GameSession
+from service.game_store import game_store
+
+game_blueprint = Blueprint("games", __name__)
+
+
+def _status(game_id: str, session: GameSession) -> dict:
+    return {
+        "game_id": game_id,
+        "user_id": session.user_id,
+        "total_questions": len(session.questions),
+        "answered_questions": session.position,
+        "correct_answers": session.correct_answers,
+        "finished": session.finished
+    }
+
+@game_blueprint.route("/games", methods=['POST'])
+def start_game_route():
+    game_data = request.json or {}
+    user_id = game_data.get('user_id')
+    if not isinstance(user_id, int) or find_user_by_id(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    question_ids = None
+    if game_data.get('question_ids') is not None:
+        try:
+            question_ids = id_list_field(game_data, 'question_ids', GAME_MAX_QUESTIONS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    session = GameSession(user_id, question_ids)
+    if not session.questions:
+        session.close()
+        return jsonify({"error": "No questions found"}), 404
+    game_id = game_store.add(session)
+    return jsonify(_status(game_id, session)), 201
+
+@game_blueprint.route("/games/<game_id>", methods=['GET'])
+def get_game_route(game_id):
+    session = game_store.get(game_id)
+    if session is None:
+        return jsonify({"error": "Game not found"}), 404
+    return jsonify(_status(game_id, session)), 200
+
+@game_blueprint.route("/games/<game_id>/question", methods=['GET'])
+def next_question_route(game_id):
+    with game_store.use(game_id) as session:
+        if session is None:
+            return jsonify({"error": "Game not found"}), 404
+        round_question = session.next_question()
+    if round_question is None:
+        return jsonify(_status(game_id, session)), 200
+    return jsonify({
+        "game_id": game_id,
+        "index": session.position,
+        "question_id": round_question.question.id,
+        "question_text": round_question.question.question_text,
+        "options": round_question.options
+    }), 200
+
+@game_blueprint.route("/games/<game_id>/answer", methods=['POST'])
+def submit_answer_route(game_id):
+    option_index = (request.json or {}).get('option_index')
+    with game_store.use(game_id) as session:
+        if session is None:
+            return jsonify({"error": "Game not found"}), 404
+        if not isinstance(option_index, int):
+            return jsonify({"error": "option_index must be an integer"}), 400
+        try:
+            result = session.submit(option_index)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return jsonify(asdict(result)), 200
+
+@game_blueprint.route("/games/<game_id>", methods=['DELETE'])
+def end_game_route(game_id):
+    session = game_store.remove(game_id)
+    if session is None:
+        return jsonify({"error": "Game not found"}), 404
+    return jsonify(_status(game_id, session)), 200
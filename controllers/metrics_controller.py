@@ -0,0 +1,10 @@
+from flask import Blueprint, Response, jsonify, request
+from metrics.instrument import render_prometheus, snapshot
+
+metrics_blueprint = Blueprint("metrics", __name__)
+
+@metrics_blueprint.route("/metrics", methods=['GET'])
+def metrics_route():
+    if request.args.get('format') == 'json':
+        return jsonify(snapshot()), 200
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4'), 200
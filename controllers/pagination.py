@@ -0,0 +1,73 @@
+import json
+from dataclasses import asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from flask import Response, jsonify, request, stream_with_context
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_MIMETYPES = {'json': 'application/json', 'ndjson': 'application/x-ndjson'}
+STREAM_FORMATS = tuple(STREAM_MIMETYPES)
+
+
+# Pure helpers shared with controllers.async_pagination; they raise ValueError for a bad query string
+def stream_format_arg(args: Mapping[str, str]) -> str | None:
+    stream_format = args.get('stream')
+    if stream_format is not None and stream_format not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    return stream_format
+
+def wants_page(args: Mapping[str, str]) -> bool:
+    return 'limit' in args or 'after_id' in args
+
+def page_args(args: Mapping[str, str]) -> Tuple[int, int | None]:
+    limit = args.get('limit', str(DEFAULT_PAGE_SIZE))
+    after_id = args.get('after_id')
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be an integer between 1 and {MAX_PAGE_SIZE}")
+    if after_id is not None and not after_id.isdigit():
+        raise ValueError("after_id must be a non-negative integer")
+    return int(limit), int(after_id) if after_id is not None else None
+
+def page_body(items: List, limit: int, serialize: Callable[[object], Dict]) -> Dict:
+    return {
+        "items": list(map(serialize, items)),
+        "next_after_id": items[-1].id if len(items) == limit else None
+    }
+
+def stream_open(stream_format: str) -> str:
+    return '[' if stream_format == 'json' else ''
+
+def stream_item(stream_format: str, index: int, item: Dict) -> str:
+    if stream_format == 'ndjson':
+        return json.dumps(item) + '\n'
+    return (',' if index else '') + json.dumps(item)
+
+def stream_close(stream_format: str) -> str:
+    return ']' if stream_format == 'json' else ''
+
+
+def _stream(stream_format: str, items: Iterable, serialize: Callable[[object], Dict]) -> Iterator[str]:
+    if stream_open(stream_format):
+        yield stream_open(stream_format)
+    for index, item in enumerate(items):
+        yield stream_item(stream_format, index, serialize(item))
+    if stream_close(stream_format):
+        yield stream_close(stream_format)
+
+
+def list_response(get_all: Callable[[], List], get_page: Callable[[int, int], List],
+                  iter_all: Callable[[], Iterable], serialize: Callable[[object], Dict] = asdict):
+    try:
+        stream_format = stream_format_arg(request.args)
+        if stream_format is None and wants_page(request.args):
+            limit, after_id = page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream_format is not None:
+        chunks = _stream(stream_format, iter_all(), serialize)
+        return Response(stream_with_context(chunks), mimetype=STREAM_MIMETYPES[stream_format]), 200
+    if not wants_page(request.args):
+        return jsonify(list(map(serialize, get_all()))), 200
+    return jsonify(page_body(get_page(limit, after_id), limit, serialize)), 200
@@ -1,20 +1,43 @@
 from dataclasses import asdict
+from typing import List, Tuple
 from flask import Blueprint, jsonify, request
+from controllers.bulk import bulk_create, check_fields, text_field, text_value
+from controllers.pagination import list_response
+from model.Answer import Answer
 from model.Question import Question
 from repository.question_repository import (
     create_question,
+    create_questions_with_answers,
     get_all_questions,
+    get_questions_page,
+    iter_questions,
     find_question_by_id,
     update_question,
     delete_question
 )
+from service.sketches import question_bucket
+from service.timing_stats import load_timings, timing_summary
 
 question_blueprint = Blueprint("questions", __name__)
 
+
+def question_from_item(item) -> Tuple[Question, List[Answer]]:
+    # Incorrect answers may come along with each question and are stored with it
+    check_fields(item, {'question_text', 'correct_answer', 'incorrect_answers'})
+    question = Question(question_text=text_field(item, 'question_text'),
+                        correct_answer=text_field(item, 'correct_answer', 255))
+    incorrect_answers = item.get('incorrect_answers', [])
+    if not isinstance(incorrect_answers, list):
+        raise ValueError("incorrect_answers must be a list of strings")
+    return question, [
+        Answer(question_id=None, incorrect_answer=text_value(answer, 'incorrect_answers', 255))
+        for answer in incorrect_answers
+    ]
+
+
 @question_blueprint.route("/questions", methods=['GET'])
 def get_all_questions_route():
-    questions = list(map(asdict, get_all_questions()))
-    return jsonify(questions), 200
+    return list_response(get_all_questions, get_questions_page, iter_questions)
 
 @question_blueprint.route("/questions/<int:question_id>", methods=['GET'])
 def get_question_by_id(question_id):
@@ -23,9 +46,18 @@ def get_question_by_id(question_id):
         return jsonify(asdict(question)), 200
     return jsonify({"error": "Question not found"}), 404
 
+@question_blueprint.route("/questions/<int:question_id>/timings", methods=['GET'])
+def get_question_timings_route(question_id):
+    stats = load_timings([question_bucket(question_id)]).question(question_id)
+    if stats is None:
+        return jsonify({"error": "Question has no answers"}), 404
+    return jsonify(timing_summary(stats)), 200
+
 @question_blueprint.route("/questions", methods=['POST'])
 def create_question_route():
     question_data = request.json
+    if isinstance(question_data, list):
+        return bulk_create(question_data, question_from_item, create_questions_with_answers, "questions")
     new_question = Question(**question_data)
     try:
         question_id = create_question(new_question)
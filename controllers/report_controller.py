@@ -0,0 +1,41 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from config.service_config import ANALYTICS_BACKEND
+from controllers.window import time_window
+from service.reports import REPORT_FORMATS, iter_report_chunks
+from service.service import iter_reports
+
+report_blueprint = Blueprint("reports", __name__)
+
+REPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+REPORT_BACKENDS = ('python', 'columnar', 'vectorized', 'sql')
+GZIP_FLAGS = {'1': True, 'true': True, 'yes': True, '0': False, 'false': False, 'no': False}
+
+
+@report_blueprint.route("/reports/users", methods=['GET'])
+def export_user_reports_route():
+    report_format = request.args.get('format', 'csv')
+    backend = request.args.get('backend', ANALYTICS_BACKEND)
+    gzip_flag = request.args.get('gzip', 'false').lower()
+    if gzip_flag not in GZIP_FLAGS:
+        return jsonify({"error": f"gzip must be one of: {', '.join(GZIP_FLAGS)}"}), 400
+    compress = GZIP_FLAGS[gzip_flag]
+    if report_format not in REPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(REPORT_FORMATS)}"}), 400
+    if backend not in REPORT_BACKENDS:
+        return jsonify({"error": f"backend must be one of: {', '.join(REPORT_BACKENDS)}"}), 400
+    try:
+        since, until = time_window(request.args)
+        reports = iter_reports(backend, since, until)
+        chunks = iter_report_chunks(reports, report_format, compress)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filename = f"user_reports.{report_format}"
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), mimetype=REPORT_MIMETYPES[report_format], headers=headers), 200
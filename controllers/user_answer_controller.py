@@ -0,0 +1,142 @@
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta
+from typing import Dict, List
+from flask import Blueprint, jsonify, request
+from controllers.bulk import bulk_create, check_fields, id_field, missing_references, text_field, text_value
+from controllers.pagination import list_response
+from controllers.window import has_time_window, time_window
+from model.UserAnswer import UserAnswer
+from repository.database import integrity_errors
+from repository.leaderboard import leaderboard, top_between
+from repository.user_answer_repository import (
+    create_user_answer,
+    create_user_answers,
+    get_all_user_answers,
+    get_user_answers_page,
+    iter_user_answers,
+    find_user_answer_by_id,
+    update_user_answer,
+    delete_user_answer
+)
+from repository.question_repository import find_existing_question_ids
+from repository.user_repository import find_existing_user_ids
+from service.answer_writer import AnswerQueueFull, answer_writer
+
+user_answer_blueprint = Blueprint("user_answers", __name__)
+
+
+def user_answer_to_dict(user_answer: UserAnswer) -> Dict:
+    answered_at = user_answer.answered_at.isoformat() if user_answer.answered_at else None
+    return {**asdict(user_answer), 'time_taken': user_answer.time_taken.total_seconds(), 'answered_at': answered_at}
+
+def user_answer_from_dict(data: Dict) -> UserAnswer:
+    # time_taken travels as seconds over HTTP, answered_at as an ISO 8601 timestamp
+    answered_at = data.get('answered_at')
+    return UserAnswer(**{**data, 'time_taken': timedelta(seconds=float(data['time_taken'])),
+                         'answered_at': datetime.fromisoformat(answered_at) if answered_at else None})
+
+def user_answer_from_item(item) -> UserAnswer:
+    check_fields(item, {'user_id', 'question_id', 'answer_text', 'is_correct', 'time_taken'})
+    is_correct, time_taken = item.get('is_correct'), item.get('time_taken')
+    if not isinstance(is_correct, bool):
+        raise ValueError("is_correct must be a boolean")
+    if not isinstance(time_taken, (int, float)) or isinstance(time_taken, bool) or not 0 <= time_taken < 86400:
+        raise ValueError("time_taken must be a number of seconds between 0 and 86400")
+    return UserAnswer(user_id=id_field(item, 'user_id'), question_id=id_field(item, 'question_id'),
+                      answer_text=text_field(item, 'answer_text', 255), is_correct=is_correct,
+                      time_taken=timedelta(seconds=time_taken))
+
+def check_user_answer_references(user_answers: List[UserAnswer]) -> List[Dict]:
+    user_ids = [user_answer.user_id for user_answer in user_answers]
+    question_ids = [user_answer.question_id for user_answer in user_answers]
+    errors = missing_references(user_ids, find_existing_user_ids(user_ids), 'user_id')
+    errors += missing_references(question_ids, find_existing_question_ids(question_ids), 'question_id')
+    return sorted(errors, key=lambda error: error['index'])
+
+def queue_user_answer(data, idempotency_key: str | None):
+    # Write-behind: the answer is validated and queued, and the response does not wait for the insert
+    try:
+        if isinstance(data, dict):
+            data = dict(data)
+            idempotency_key = idempotency_key or data.pop('idempotency_key', None)
+        if idempotency_key is not None:
+            text_value(idempotency_key, 'idempotency_key', 64)
+        user_answer = replace(user_answer_from_item(data), idempotency_key=idempotency_key)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        idempotency_key = answer_writer.submit(user_answer)
+    except AnswerQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {'Retry-After': '1'}
+    return jsonify({"idempotency_key": idempotency_key, "message": "User answer queued"}), 202
+
+
+@user_answer_blueprint.route("/user-answers", methods=['GET'])
+def get_all_user_answers_route():
+    try:
+        since, until = time_window(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return list_response(lambda: get_all_user_answers(since, until),
+                         lambda limit, after_id: get_user_answers_page(limit, after_id, since, until),
+                         lambda: iter_user_answers(since=since, until=until), user_answer_to_dict)
+
+@user_answer_blueprint.route("/user-answers/<int:user_answer_id>", methods=['GET'])
+def get_user_answer_by_id(user_answer_id):
+    user_answer = find_user_answer_by_id(user_answer_id)
+    if user_answer:
+        return jsonify(user_answer_to_dict(user_answer)), 200
+    return jsonify({"error": "User answer not found"}), 404
+
+@user_answer_blueprint.route("/user-answers", methods=['POST'])
+def create_user_answer_route():
+    if isinstance(request.json, list):
+        return bulk_create(request.json, user_answer_from_item, create_user_answers, "user answers",
+                           check_user_answer_references)
+    if request.args.get('async', 'false').lower() in ('1', 'true', 'yes'):
+        return queue_user_answer(request.json, request.headers.get('Idempotency-Key'))
+    try:
+        new_user_answer = user_answer_from_dict(request.json)
+        user_answer_id = create_user_answer(new_user_answer)
+        return jsonify({"id": user_answer_id, "message": "User answer created successfully"}), 201
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except integrity_errors() as e:
+        # The idempotency key was used before, or the user or question does not exist
+        return jsonify({"error": str(e).strip()}), 409
+
+@user_answer_blueprint.route("/user-answers/<int:user_answer_id>", methods=['PUT'])
+def update_user_answer_route(user_answer_id):
+    try:
+        updated_user_answer = user_answer_from_dict(request.json)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if update_user_answer(user_answer_id, updated_user_answer):
+        return jsonify({"message": "User answer updated successfully"}), 200
+    return jsonify({"error": "User answer not found"}), 404
+
+@user_answer_blueprint.route("/user-answers/<int:user_answer_id>", methods=['DELETE'])
+def delete_user_answer_route(user_answer_id):
+    if delete_user_answer(user_answer_id):
+        return jsonify({"message": "User answer deleted successfully"}), 200
+    return jsonify({"error": "User answer not found"}), 404
+
+@user_answer_blueprint.route("/leaderboard", methods=['GET'])
+def get_leaderboard_route():
+    limit = request.args.get('limit', '10')
+    if not limit.isdigit() or not 1 <= int(limit) <= 1000:
+        return jsonify({"error": "limit must be an integer between 1 and 1000"}), 400
+    if has_time_window(request.args):
+        try:
+            since, until = time_window(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(list(map(asdict, top_between(int(limit), since, until)))), 200
+    return jsonify(list(map(asdict, leaderboard.top(int(limit))))), 200
+
+@user_answer_blueprint.route("/leaderboard/<int:user_id>", methods=['GET'])
+def get_leaderboard_rank_route(user_id):
+    rank = leaderboard.rank_of(user_id)
+    if rank is None:
+        return jsonify({"error": "User has no answers"}), 404
+    return jsonify({"user_id": user_id, "rank": rank}), 200
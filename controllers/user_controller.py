@@ -1,20 +1,31 @@
 from dataclasses import asdict
 from flask import Blueprint, jsonify, request
+from controllers.bulk import bulk_create, check_fields, text_field
+from controllers.pagination import list_response
 from model.User import User
 from repository.user_repository import (
     get_all_users,
+    get_users_page,
+    iter_users,
     find_user_by_id,
     create_user,
+    create_users,
     update_user,
     delete_user
 )
 
 user_blueprint = Blueprint("users", __name__)
 
+
+def user_from_item(item) -> User:
+    check_fields(item, {'first', 'last', 'email'})
+    return User(first=text_field(item, 'first', 100), last=text_field(item, 'last', 100),
+                email=text_field(item, 'email', 100))
+
+
 @user_blueprint.route("/users", methods=['GET'])
 def get_all_users_route():
-    users = list(map(asdict, get_all_users()))
-    return jsonify(users), 200
+    return list_response(get_all_users, get_users_page, iter_users)
 
 @user_blueprint.route("/users/<int:user_id>", methods=['GET'])
 def get_user_by_id(user_id):
@@ -26,6 +37,8 @@ def get_user_by_id(user_id):
 @user_blueprint.route("/users", methods=['POST'])
 def create_user_route():
     user_data = request.json
+    if isinstance(user_data, list):
+        return bulk_create(user_data, user_from_item, create_users, "users")
     new_user = User(**user_data)
     try:
         user_id = create_user(new_user)
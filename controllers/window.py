@@ -0,0 +1,32 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+_DURATION = re.compile(r'^(\d+)([smhd])$')
+_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def timestamp_arg(args: Dict, name: str) -> datetime | None:
+    value = args.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp")
+
+def time_window(args: Dict) -> Tuple[datetime | None, datetime | None]:
+    # ?window=24h means the last 24 hours (units s, m, h, d); ?since= and ?until= take ISO 8601 timestamps
+    since, until = timestamp_arg(args, 'since'), timestamp_arg(args, 'until')
+    window = args.get('window')
+    if window is not None:
+        if since is not None:
+            raise ValueError("window and since cannot be combined")
+        match = _DURATION.match(window)
+        if match is None:
+            raise ValueError("window must be a duration such as 30m, 24h or 7d")
+        since = datetime.now(timezone.utc) - timedelta(**{_UNITS[match[2]]: int(match[1])})
+    return since, until
+
+def has_time_window(args: Dict) -> bool:
+    return any(name in args for name in ('window', 'since', 'until'))
@@ -1,17 +1,12 @@
-import time
-import random
 from toolz import pipe
 from toolz.curried import partial
 
-from model.Question import Question
 from model.User import User
-from model.UserAnswer import UserAnswer
 from repository.database import drop_all_tables
 from repository.user_repository import create_user, find_user_by_id
-from repository.question_repository import get_all_questions, find_question_by_id
-from repository.answer_repository import get_all_answers
-from repository.user_answer_repository import create_user_answer
 from seed.seed import seed
+from service.game_session import GameSession
+from service.timing_stats import track_timings
 
 menu_options = {
     '1': ('Create new user', 'create_new_user'),
@@ -30,33 +25,18 @@ def create_new_user():
     return user_id
 
 
-def ask_question(user_id: int, question: Question):
-    print(f"\nQuestion: {question.question_text}")
-    correct_answer = question.correct_answer
-    incorrect_answers = get_all_answers(question.id)
-    all_answers = [correct_answer] + [answer.incorrect_answer for answer in incorrect_answers]
-    random.shuffle(all_answers)
-    for idx, answer in enumerate(all_answers, start=1):
+def ask_question(session: GameSession):
+    round_question = session.next_question()
+    print(f"\nQuestion: {round_question.question.question_text}")
+    for idx, answer in enumerate(round_question.options, start=1):
         print(f"{idx}. {answer}")
-    start_time = time.time()
     user_answer_index = int(input("\nYour answer (enter the number): ")) - 1
-    end_time = time.time()
-    time_taken = end_time - start_time
-    user_answer_text = all_answers[user_answer_index]
-    is_correct = user_answer_text == correct_answer
-    user_answer = UserAnswer(
-        user_id=user_id,
-        question_id=question.id,
-        answer_text=user_answer_text,
-        is_correct=is_correct,
-        time_taken=time_taken
-    )
-    create_user_answer(user_answer)
-    if is_correct:
+    result = session.submit(user_answer_index)
+    if result.is_correct:
         print("Correct!")
     else:
-        print(f"Wrong! The correct answer was: {correct_answer}")
-    return is_correct
+        print(f"Wrong! The correct answer was: {result.correct_answer}")
+    return result.is_correct
 
 
 def start_game():
@@ -66,22 +46,18 @@ def start_game():
         print("User not found. Please create a new user first.")
         return
 
-    questions = get_all_questions()
-    if not questions:
-        print("No questions found. Exiting the game.")
-        return
-
-    print(f"\nWelcome, {user.first} {user.last}!")
-    print("Let's start the game. You'll answer all questions in order.")
+    with GameSession(user_id) as session:
+        if not session.questions:
+            print("No questions found. Exiting the game.")
+            return
 
-    correct_answers = 0
-    total_questions = len(questions)
+        print(f"\nWelcome, {user.first} {user.last}!")
+        print("Let's start the game. You'll answer all questions in order.")
 
-    for question in questions:
-        if ask_question(user_id, question):
-            correct_answers += 1
+        while not session.finished:
+            ask_question(session)
 
-    print(f"\nGame Over! You got {correct_answers} out of {total_questions} questions correct.")
+    print(f"\nGame Over! You got {session.correct_answers} out of {len(session.questions)} questions correct.")
 
 
 def display_menu():
@@ -108,6 +84,7 @@ def handle_menu_choice(choice):
 
 
 if __name__ == '__main__':
+    track_timings()
     seed()
     while True:
         display_menu()
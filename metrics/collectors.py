@@ -0,0 +1,83 @@
+from typing import Iterable
+
+from config.metrics_config import METRICS_PREFIX
+from metrics.instrument import add_collector
+from metrics.registry import Family
+
+_registered = False
+
+
+def _pool_metrics() -> Iterable[Family]:
+    from repository.database import get_pool_stats
+    from repository.storage import is_postgres
+
+    if not is_postgres():
+        return
+    stats = get_pool_stats()
+    yield f"{METRICS_PREFIX}_db_connections_opened_total", 'counter', "Connections opened by the pool.", \
+        [({}, stats.created)]
+    yield f"{METRICS_PREFIX}_db_connections_closed_total", 'counter', "Connections closed by the pool.", \
+        [({}, stats.closed)]
+    yield f"{METRICS_PREFIX}_db_pool_checkouts_total", 'counter', "Connections handed out by the pool.", \
+        [({}, stats.checkouts)]
+    yield f"{METRICS_PREFIX}_db_pool_timeouts_total", 'counter', "Checkouts that timed out.", \
+        [({}, stats.timeouts)]
+    yield f"{METRICS_PREFIX}_db_pool_wait_seconds_total", 'counter', "Time spent waiting for a connection.", \
+        [({}, stats.total_wait_time)]
+    yield f"{METRICS_PREFIX}_db_pool_connections", 'gauge', "Pool connections by state.", \
+        [({'state': 'idle'}, stats.idle), ({'state': 'in_use'}, stats.in_use)]
+
+def _cache_metrics() -> Iterable[Family]:
+    from repository.question_cache import get_question_cache_stats
+
+    stats = get_question_cache_stats()
+    yield f"{METRICS_PREFIX}_question_cache_entries", 'gauge', "Entries in the question cache.", [({}, stats.size)]
+    yield f"{METRICS_PREFIX}_question_cache_requests_total", 'counter', "Question cache lookups by result.", \
+        [({'result': 'hit'}, stats.hits), ({'result': 'miss'}, stats.misses)]
+    yield f"{METRICS_PREFIX}_question_cache_removals_total", 'counter', "Question cache entries removed by cause.", \
+        [({'cause': 'eviction'}, stats.evictions), ({'cause': 'expiration'}, stats.expirations),
+         ({'cause': 'invalidation'}, stats.invalidations)]
+
+def _game_metrics() -> Iterable[Family]:
+    from service.game_store import game_store
+
+    yield f"{METRICS_PREFIX}_game_sessions", 'gauge', "Open game sessions.", [({}, len(game_store))]
+
+def _answer_writer_metrics() -> Iterable[Family]:
+    from service.answer_writer import answer_writer
+
+    stats = answer_writer.stats()
+    yield f"{METRICS_PREFIX}_answer_queue_depth", 'gauge', "User answers waiting to be written.", \
+        [({}, stats.depth)]
+    yield f"{METRICS_PREFIX}_answer_queue_capacity", 'gauge', "Maximum user answers the queue holds.", \
+        [({}, stats.capacity)]
+    yield f"{METRICS_PREFIX}_answer_queue_in_flight", 'gauge', "User answers in the batch being written.", \
+        [({}, stats.in_flight)]
+    yield f"{METRICS_PREFIX}_answer_queue_answers_total", 'counter', "Queued user answers by outcome.", \
+        [({'outcome': 'enqueued'}, stats.enqueued), ({'outcome': 'written'}, stats.written),
+         ({'outcome': 'duplicate'}, stats.duplicates), ({'outcome': 'rejected'}, stats.rejected),
+         ({'outcome': 'dropped'}, stats.dropped), ({'outcome': 'lost'}, stats.lost)]
+    yield f"{METRICS_PREFIX}_answer_queue_batches_total", 'counter', "Batches written by the answer queue.", \
+        [({}, stats.batches)]
+    yield f"{METRICS_PREFIX}_answer_queue_failed_attempts_total", 'counter', "Batch inserts that failed and were retried.", \
+        [({}, stats.failed_attempts)]
+
+def _timing_metrics() -> Iterable[Family]:
+    from service.timing_stats import timing_recorder
+
+    stats = timing_recorder.stats()
+    yield f"{METRICS_PREFIX}_timing_stats_pending_buckets", 'gauge', "Timing buckets waiting to be merged.", \
+        [({}, stats.pending_buckets)]
+    yield f"{METRICS_PREFIX}_timing_stats_flushes_total", 'counter', "Timing stats merges by outcome.", \
+        [({'outcome': 'merged'}, stats.flushes), ({'outcome': 'failed'}, stats.failed_flushes)]
+
+
+def register_default_collectors():
+    global _registered
+    if not _registered:
+        _registered = True
+        add_collector(_pool_metrics)
+        add_collector(_cache_metrics)
+        add_collector(_game_metrics)
+        add_collector(_answer_writer_metrics)
+        add_collector(_timing_metrics)
@@ -0,0 +1,173 @@
+import contextvars
+import functools
+import inspect
+import re
+import time
+from typing import Callable, Iterable
+
+from config.metrics_config import METRICS_ENABLED, METRICS_PREFIX
+from metrics.registry import Family, Registry, SIZE_BUCKETS
+
+registry = Registry()
+
+REPOSITORY_LATENCY = registry.histogram(
+    f"{METRICS_PREFIX}_repository_call_seconds", "Latency of repository calls.", ('function',))
+REPOSITORY_ERRORS = registry.counter(
+    f"{METRICS_PREFIX}_repository_errors_total", "Repository calls that raised.", ('function',))
+SQL_LATENCY = registry.histogram(
+    f"{METRICS_PREFIX}_sql_statement_seconds", "Latency of SQL statements sent through the pool.", ('statement',))
+ROUTE_LATENCY = registry.histogram(
+    f"{METRICS_PREFIX}_http_request_seconds", "Latency of HTTP routes.", ('method', 'route', 'status'))
+ROUTE_PAYLOAD = registry.histogram(
+    f"{METRICS_PREFIX}_http_response_bytes", "Size of non-streamed HTTP responses.", ('method', 'route'), SIZE_BUCKETS)
+
+_enabled = METRICS_ENABLED
+# Repository functions that call themselves (create_users(users) -> create_users(users, cursor)) count once
+_active = contextvars.ContextVar('metrics_active', default=())
+_WHITESPACE = re.compile(r'\s+')
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset():
+    registry.reset()
+
+def snapshot():
+    return registry.snapshot()
+
+def render_prometheus() -> str:
+    return registry.render()
+
+def add_collector(collector: Callable[[], Iterable[Family]]):
+    registry.add_collector(collector)
+
+
+def _enter(label: str):
+    active = _active.get()
+    if label in active:
+        return None
+    return _active.set(active + (label,))
+
+def _observe(label: str, started: float, failed: bool):
+    REPOSITORY_LATENCY.observe(time.perf_counter() - started, label)
+    if failed:
+        REPOSITORY_ERRORS.inc(label)
+
+def _finish(label: str, token, started: float, failed: bool):
+    _active.reset(token)
+    _observe(label, started, failed)
+
+def _timed_iter(iterator, label: str):
+    started, failed = time.perf_counter(), False
+    try:
+        yield from iterator
+    except GeneratorExit:
+        raise
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _observe(label, started, failed)
+
+async def _timed_async_iter(iterator, label: str):
+    started, failed = time.perf_counter(), False
+    try:
+        async for item in iterator:
+            yield item
+    except GeneratorExit:
+        raise
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _observe(label, started, failed)
+
+async def _timed_coroutine(fn, label: str, args, kwargs):
+    token = _enter(label)
+    if token is None:
+        return await fn(*args, **kwargs)
+    started, failed = time.perf_counter(), False
+    try:
+        return await fn(*args, **kwargs)
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _finish(label, token, started, failed)
+
+def _timed_call(fn, label: str, args, kwargs):
+    token = _enter(label)
+    if token is None:
+        return fn(*args, **kwargs)
+    started, failed = time.perf_counter(), False
+    try:
+        return fn(*args, **kwargs)
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _finish(label, token, started, failed)
+
+
+def timed(fn):
+    # Records call latency per repository function. While metrics are disabled the wrapper only checks a flag
+    # and calls straight through; generators are timed until they are exhausted or closed.
+    label = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            iterator = fn(*args, **kwargs)
+            return _timed_async_iter(iterator, label) if _enabled else iterator
+    elif inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return _timed_coroutine(fn, label, args, kwargs) if _enabled else fn(*args, **kwargs)
+    elif inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            iterator = fn(*args, **kwargs)
+            return _timed_iter(iterator, label) if _enabled else iterator
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return _timed_call(fn, label, args, kwargs) if _enabled else fn(*args, **kwargs)
+    return wrapper
+
+
+@functools.lru_cache(maxsize=1024)
+def _statement_label(query: str) -> str:
+    statement = _WHITESPACE.sub(' ', query).strip()
+    return statement if len(statement) <= 120 else statement[:117] + '...'
+
+def observe_sql(query, seconds: float):
+    SQL_LATENCY.observe(seconds, _statement_label(query if isinstance(query, str) else repr(query)))
+
+
+def init_app(app):
+    # Route latency is measured until the view returns, so a streamed body is not included
+    from flask import g, request
+
+    @app.before_request
+    def start_timer():
+        if _enabled:
+            g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            ROUTE_LATENCY.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+            if not response.is_streamed and response.content_length is not None:
+                ROUTE_PAYLOAD.observe(response.content_length, request.method, route)
+        return response
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 
 @dataclass
@@ -10,3 +10,7 @@ class UserAnswer:
    is_correct: bool
    time_taken: timedelta
    id: int = None
+   # Set by clients that may retry a write; a key is stored at most once
+   idempotency_key: str = None
+   # When the answer was given; left unset, it is stamped when the answer is written
+   answered_at: datetime = None
@@ -0,0 +1,56 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List
+
+from model.UserAnswer import UserAnswer
+
+
+@dataclass
+class UserAnswerBatch:
+   ids: array = field(default_factory=lambda: array('q'))
+   user_ids: array = field(default_factory=lambda: array('q'))
+   question_ids: array = field(default_factory=lambda: array('q'))
+   is_correct: array = field(default_factory=lambda: array('b'))
+   seconds: array = field(default_factory=lambda: array('d'))
+   answer_codes: array = field(default_factory=lambda: array('I'))
+   answer_texts: List[str] = field(default_factory=list)
+   _answer_index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+   def append_values(self, user_id: int, question_id: int, answer_text: str, is_correct: bool, seconds: float,
+                     id: int = None):
+      code = self._answer_index.get(answer_text)
+      if code is None:
+         code = self._answer_index[answer_text] = len(self.answer_texts)
+         self.answer_texts.append(answer_text)
+      self.ids.append(id if id is not None else -1)
+      self.user_ids.append(user_id)
+      self.question_ids.append(question_id)
+      self.is_correct.append(1 if is_correct else 0)
+      self.seconds.append(seconds)
+      self.answer_codes.append(code)
+
+   def append(self, user_answer: UserAnswer):
+      self.append_values(user_answer.user_id, user_answer.question_id, user_answer.answer_text,
+                         user_answer.is_correct, user_answer.time_taken.total_seconds(), user_answer.id)
+
+   @classmethod
+   def from_user_answers(cls, user_answers: Iterable[UserAnswer]) -> 'UserAnswerBatch':
+      batch = cls()
+      for user_answer in user_answers:
+         batch.append(user_answer)
+      return batch
+
+   def __len__(self) -> int:
+      return len(self.user_ids)
+
+   def __iter__(self) -> Iterator[UserAnswer]:
+      for idx in range(len(self)):
+         yield UserAnswer(
+            user_id=self.user_ids[idx],
+            question_id=self.question_ids[idx],
+            answer_text=self.answer_texts[self.answer_codes[idx]],
+            is_correct=bool(self.is_correct[idx]),
+            time_taken=timedelta(seconds=self.seconds[idx]),
+            id=self.ids[idx] if self.ids[idx] != -1 else None
+         )
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from config.sql_config import DB_ITERSIZE
+from model.Question import Question
+from model.User import User
+from repository.database import get_db_connection
+from repository.partitions import answered_between
+from metrics.instrument import timed
+
+
+def _seconds(value) -> float:
+    return float('inf') if value is None else float(value)
+
+def _user_from_row(row) -> User | None:
+    if row is None or row['id'] is None:
+        return None
+    return User(first=row['first'], last=row['last'], email=row['email'], id=row['id'])
+
+
+@timed
+def find_highest_scorer(since: datetime = None, until: datetime = None) -> Tuple[User | None, int]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT u.id, u.first, u.last, u.email, s.score
+            FROM (
+                SELECT user_id, COUNT(*) FILTER (WHERE is_correct) AS score, MIN(id) AS first_answer_id
+                FROM user_answer
+                WHERE {window}
+                GROUP BY user_id
+                ORDER BY score DESC, first_answer_id
+                LIMIT 1
+            ) s
+            LEFT JOIN trivia_user u ON u.id = s.user_id
+        """, params)
+        result = cursor.fetchone()
+        if result is None:
+            return None, 0
+        return _user_from_row(result), result['score']
+
+@timed
+def find_fastest_answered_question(since: datetime = None, until: datetime = None) -> Tuple[Question | None, float]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT q.id, q.question_text, q.correct_answer,
+                   MIN(EXTRACT(EPOCH FROM ua.time_taken)) FILTER (WHERE ua.is_correct) AS fastest
+            FROM question q
+            LEFT JOIN user_answer ua ON ua.question_id = q.id AND {window}
+            GROUP BY q.id
+            ORDER BY fastest ASC NULLS LAST, q.id
+            LIMIT 1
+        """, params)
+        result = cursor.fetchone()
+        if result is None:
+            return None, 0
+        question = Question(question_text=result['question_text'], correct_answer=result['correct_answer'],
+                            id=result['id'])
+        return question, _seconds(result['fastest'])
+
+@timed
+def find_second_place_user(since: datetime = None, until: datetime = None) -> Tuple[User | None, float]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT id, first, last, email, fastest
+            FROM (
+                SELECT u.id, u.first, u.last, u.email,
+                       MIN(EXTRACT(EPOCH FROM ua.time_taken)) AS fastest,
+                       ROW_NUMBER() OVER (
+                           ORDER BY COUNT(ua.id) FILTER (WHERE ua.is_correct) DESC,
+                                    MIN(EXTRACT(EPOCH FROM ua.time_taken)) ASC NULLS LAST,
+                                    u.id
+                       ) AS place
+                FROM trivia_user u
+                LEFT JOIN user_answer ua ON ua.user_id = u.id AND {window}
+                GROUP BY u.id
+            ) ranked
+            WHERE place = 2
+        """, params)
+        result = cursor.fetchone()
+        if result is None:
+            return None, 0
+        return _user_from_row(result), _seconds(result['fastest'])
+
+@timed
+def get_average_time_per_question(since: datetime = None, until: datetime = None) -> Dict[int, float]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT q.id, COALESCE(AVG(EXTRACT(EPOCH FROM ua.time_taken)), 0) AS avg_time
+            FROM question q
+            LEFT JOIN user_answer ua ON ua.question_id = q.id AND {window}
+            GROUP BY q.id
+            ORDER BY q.id
+        """, params)
+        return {row['id']: float(row['avg_time']) for row in cursor.fetchall()}
+
+@timed
+def get_success_rate_per_question(since: datetime = None, until: datetime = None) -> Dict[int, float]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT q.id,
+                   COALESCE(COUNT(ua.id) FILTER (WHERE ua.is_correct)::float / NULLIF(COUNT(ua.id), 0), 0)
+                       AS success_rate
+            FROM question q
+            LEFT JOIN user_answer ua ON ua.question_id = q.id AND {window}
+            GROUP BY q.id
+            ORDER BY q.id
+        """, params)
+        return {row['id']: row['success_rate'] for row in cursor.fetchall()}
+
+@timed
+def get_users_who_answered_all_questions(since: datetime = None, until: datetime = None) -> List[User]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT u.id, u.first, u.last, u.email
+            FROM trivia_user u
+            LEFT JOIN user_answer ua ON ua.user_id = u.id AND {window}
+            GROUP BY u.id
+            HAVING COUNT(DISTINCT ua.question_id) = (SELECT COUNT(*) FROM question)
+            ORDER BY u.id
+        """, params)
+        return [User(**row) for row in cursor.fetchall()]
+
+@timed
+def get_median_times(since: datetime = None, until: datetime = None) -> Tuple[float, float]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM time_taken))
+                    FILTER (WHERE is_correct) AS correct_median,
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM time_taken))
+                    FILTER (WHERE NOT is_correct) AS incorrect_median
+            FROM user_answer
+            WHERE {window}
+        """, params)
+        result = cursor.fetchone()
+        return result['correct_median'] or 0, result['incorrect_median'] or 0
+
+_USER_REPORTS_QUERY = """
+    SELECT u.id AS user_id,
+           u.first || ' ' || u.last AS name,
+           t.total_questions,
+           COUNT(DISTINCT ua.question_id) AS answered_questions,
+           COUNT(ua.id) FILTER (WHERE ua.is_correct) AS correct_answers,
+           COALESCE(AVG(EXTRACT(EPOCH FROM ua.time_taken)), 0) AS avg_time,
+           COALESCE(MIN(EXTRACT(EPOCH FROM ua.time_taken)), 0) AS fastest_answer,
+           COALESCE(MAX(EXTRACT(EPOCH FROM ua.time_taken)), 0) AS slowest_answer,
+           t.total_questions - COUNT(DISTINCT ua.question_id) AS unanswered_questions
+    FROM trivia_user u
+    CROSS JOIN (SELECT COUNT(*) AS total_questions FROM question) t
+    LEFT JOIN user_answer ua ON ua.user_id = u.id AND {window}
+    GROUP BY u.id, t.total_questions
+    ORDER BY u.id
+"""
+
+def _report_from_row(row) -> Dict:
+    return {
+        **row,
+        'avg_time': float(row['avg_time']),
+        'fastest_answer': float(row['fastest_answer']),
+        'slowest_answer': float(row['slowest_answer'])
+    }
+
+@timed
+def get_user_reports(since: datetime = None, until: datetime = None) -> List[Dict]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(_USER_REPORTS_QUERY.format(window=window), params)
+        return [_report_from_row(row) for row in cursor.fetchall()]
+
+@timed
+def iter_user_reports(itersize: int = DB_ITERSIZE, since: datetime = None,
+                      until: datetime = None) -> Iterator[Dict]:
+    window, params = answered_between(since, until, 'ua.answered_at')
+    with get_db_connection() as connection, connection.cursor(name='iter_user_reports') as cursor:
+        cursor.itersize = itersize
+        cursor.execute(_USER_REPORTS_QUERY.format(window=window), params)
+        for row in cursor:
+            yield _report_from_row(row)
@@ -1,9 +1,14 @@
-from typing import List
+from typing import Dict, List
 
 from model.Answer import Answer
-from repository.database import get_db_connection
+from repository.database import get_db_connection, reserve_ids, copy_rows
+from repository.question_cache import question_cache, answers_key, invalidate_answers
+from repository.storage import backend_function
+from metrics.instrument import timed
 
 
+@timed
+@backend_function
 def create_answer(answer: Answer) -> int:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute(
@@ -15,36 +20,104 @@ def create_answer(answer: Answer) -> int:
             raise ValueError("No ID returned after answer creation.")
         new_id = result.get('id')
         connection.commit()
+        invalidate_answers(answer.question_id)
         return new_id
 
-def get_all_answers(question_id:int) -> List[Answer]:
+@timed
+@backend_function
+def create_answers(answers: List[Answer], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            new_ids = create_answers(answers, cursor)
+        invalidate_answers(*{answer.question_id for answer in answers})
+        return new_ids
+    new_ids = reserve_ids(cursor, 'answer', len(answers))
+    copy_rows(cursor, 'answer', ('id', 'question_id', 'incorrect_answer'), (
+        (new_id, answer.question_id, answer.incorrect_answer)
+        for new_id, answer in zip(new_ids, answers)
+    ))
+    return new_ids
+
+@timed
+@backend_function
+def get_all_answers(question_id: int = None) -> List[Answer]:
+    if question_id is not None:
+        return get_answers_by_question_id(question_id)
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("SELECT * FROM answer")
         res = cursor.fetchall()
-        answers = [Answer(**f) for f in res]
-        return list(filter(lambda ans: ans.question_id == question_id,answers))
+        return [Answer(**f) for f in res]
+
+@timed
+@backend_function
+def get_answers_by_question_id(question_id: int) -> List[Answer]:
+    return list(question_cache.get_or_load(answers_key(question_id), lambda: _load_answers(question_id)))
+
+def _load_answers(question_id: int) -> List[Answer]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM answer WHERE question_id = %s ORDER BY id", (question_id,))
+        res = cursor.fetchall()
+        return [Answer(**f) for f in res]
 
+@timed
+@backend_function
+def get_answers_by_question_ids(question_ids: List[int]) -> Dict[int, List[Answer]]:
+    answers_by_question = {}
+    missing = []
+    for question_id in question_ids:
+        cached = question_cache.get(answers_key(question_id))
+        if cached is None:
+            missing.append(question_id)
+        answers_by_question[question_id] = list(cached or [])
+    if not missing:
+        return answers_by_question
+    version = question_cache.version
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT * FROM answer WHERE question_id = ANY(%s) ORDER BY question_id, id",
+            (missing,)
+        )
+        for row in cursor.fetchall():
+            answers_by_question[row['question_id']].append(Answer(**row))
+    for question_id in missing:
+        question_cache.put(answers_key(question_id), list(answers_by_question[question_id]), version)
+    return answers_by_question
+
+@timed
+@backend_function
 def find_answer_by_id(answer_id: int) -> Answer:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("SELECT * FROM answer WHERE id = %s", (answer_id,))
         result = cursor.fetchone()
         return Answer(**result) if result else None
 
+@timed
+@backend_function
 def update_answer(answer_id: int, updated_answer: Answer) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("""
             UPDATE answer
             SET question_id = %s, 
             incorrect_answer = %s
-            WHERE id = %s
+            FROM (SELECT id, question_id FROM answer WHERE id = %s FOR UPDATE) previous
+            WHERE answer.id = previous.id
+            RETURNING previous.question_id
         """,
         (updated_answer.question_id, updated_answer.incorrect_answer, answer_id)
         )
+        result = cursor.fetchone()
         connection.commit()
+        if result is not None:
+            invalidate_answers(result['question_id'], updated_answer.question_id)
         return cursor.rowcount > 0
 
+@timed
+@backend_function
 def delete_answer(answer_id: int) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute("DELETE FROM answer WHERE id = %s", (answer_id,))
+        cursor.execute("DELETE FROM answer WHERE id = %s RETURNING question_id", (answer_id,))
+        result = cursor.fetchone()
         connection.commit()
+        if result is not None:
+            invalidate_answers(result['question_id'])
         return cursor.rowcount > 0
@@ -0,0 +1,107 @@
+from typing import Dict, List
+
+from model.Answer import Answer
+from repository.async_database import get_async_connection, reserve_ids_async, copy_rows_async
+from repository.question_cache import question_cache, answers_key, invalidate_answers
+from metrics.instrument import timed
+
+
+@timed
+async def create_answer(answer: Answer) -> int:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(
+            "INSERT INTO answer (question_id, incorrect_answer) VALUES (%s, %s) RETURNING id",
+            (answer.question_id, answer.incorrect_answer)
+        )
+        result = await cursor.fetchone()
+        if result is None:
+            raise ValueError("No ID returned after answer creation.")
+    invalidate_answers(answer.question_id)
+    return result['id']
+
+@timed
+async def create_answers(answers: List[Answer], cursor=None) -> List[int]:
+    if cursor is None:
+        async with get_async_connection() as connection, connection.cursor() as cursor:
+            new_ids = await create_answers(answers, cursor)
+        invalidate_answers(*{answer.question_id for answer in answers})
+        return new_ids
+    new_ids = await reserve_ids_async(cursor, 'answer', len(answers))
+    await copy_rows_async(cursor, 'answer', ('id', 'question_id', 'incorrect_answer'), (
+        (new_id, answer.question_id, answer.incorrect_answer)
+        for new_id, answer in zip(new_ids, answers)
+    ))
+    return new_ids
+
+@timed
+async def get_all_answers(question_id: int = None) -> List[Answer]:
+    if question_id is not None:
+        return await get_answers_by_question_id(question_id)
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM answer")
+        return [Answer(**row) for row in await cursor.fetchall()]
+
+@timed
+async def get_answers_by_question_id(question_id: int) -> List[Answer]:
+    return list(await question_cache.get_or_load_async(answers_key(question_id), lambda: _load_answers(question_id)))
+
+async def _load_answers(question_id: int) -> List[Answer]:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM answer WHERE question_id = %s ORDER BY id", (question_id,))
+        return [Answer(**row) for row in await cursor.fetchall()]
+
+@timed
+async def get_answers_by_question_ids(question_ids: List[int]) -> Dict[int, List[Answer]]:
+    answers_by_question = {}
+    missing = []
+    for question_id in question_ids:
+        cached = question_cache.get(answers_key(question_id))
+        if cached is None:
+            missing.append(question_id)
+        answers_by_question[question_id] = list(cached or [])
+    if not missing:
+        return answers_by_question
+    version = question_cache.version
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(
+            "SELECT * FROM answer WHERE question_id = ANY(%s) ORDER BY question_id, id",
+            (missing,)
+        )
+        for row in await cursor.fetchall():
+            answers_by_question[row['question_id']].append(Answer(**row))
+    for question_id in missing:
+        question_cache.put(answers_key(question_id), list(answers_by_question[question_id]), version)
+    return answers_by_question
+
+@timed
+async def find_answer_by_id(answer_id: int) -> Answer | None:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM answer WHERE id = %s", (answer_id,))
+        result = await cursor.fetchone()
+        return Answer(**result) if result else None
+
+@timed
+async def update_answer(answer_id: int, updated_answer: Answer) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE answer
+            SET question_id = %s, incorrect_answer = %s
+            FROM (SELECT id, question_id FROM answer WHERE id = %s FOR UPDATE) previous
+            WHERE answer.id = previous.id
+            RETURNING previous.question_id
+        """, (updated_answer.question_id, updated_answer.incorrect_answer, answer_id))
+        result = await cursor.fetchone()
+    if result is None:
+        return False
+    invalidate_answers(result['question_id'], updated_answer.question_id)
+    return True
+
+@timed
+async def delete_answer(answer_id: int) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("DELETE FROM answer WHERE id = %s RETURNING question_id", (answer_id,))
+        result = await cursor.fetchone()
+    if result is None:
+        return False
+    invalidate_answers(result['question_id'])
+    return True
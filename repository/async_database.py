@@ -0,0 +1,94 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Sequence
+
+from psycopg import AsyncConnection, AsyncCursor
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from config.sql_config import SQL_URI, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_STATEMENT_CACHE_SIZE
+from repository.database import on_schema_change
+
+_async_pool: AsyncConnectionPool | None = None
+_async_pool_lock: asyncio.Lock | None = None
+_schema_generation = 0
+_connection_generations = weakref.WeakKeyDictionary()
+
+
+def _invalidate_statements():
+    # psycopg prepares statements that run often; after DDL those plans are stale, so connections
+    # checked out before the change are replaced instead of reused
+    global _schema_generation
+    _schema_generation += 1
+
+on_schema_change(_invalidate_statements)
+
+
+async def _configure(connection: AsyncConnection):
+    connection.prepared_max = DB_STATEMENT_CACHE_SIZE
+
+async def get_async_pool() -> AsyncConnectionPool:
+    global _async_pool, _async_pool_lock
+    if _async_pool is None:
+        if _async_pool_lock is None:
+            _async_pool_lock = asyncio.Lock()
+        async with _async_pool_lock:
+            if _async_pool is None:
+                pool = AsyncConnectionPool(
+                    SQL_URI,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    kwargs={'row_factory': dict_row},
+                    configure=_configure,
+                    open=False
+                )
+                await pool.open()
+                _async_pool = pool
+    return _async_pool
+
+async def close_async_pool():
+    global _async_pool, _async_pool_lock
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+        _async_pool_lock = None
+
+async def _checkout(pool: AsyncConnectionPool) -> AsyncConnection:
+    while True:
+        connection = await pool.getconn()
+        if _connection_generations.get(connection, _schema_generation) == _schema_generation:
+            _connection_generations[connection] = _schema_generation
+            return connection
+        await connection.close()
+        await pool.putconn(connection)
+
+@asynccontextmanager
+async def get_async_connection() -> AsyncIterator[AsyncConnection]:
+    # Commits when the block succeeds, rolls back when it raises, and always returns the connection
+    pool = await get_async_pool()
+    connection = await _checkout(pool)
+    try:
+        yield connection
+        await connection.commit()
+    except BaseException:
+        if not connection.closed:
+            await connection.rollback()
+        raise
+    finally:
+        await pool.putconn(connection)
+
+async def reserve_ids_async(cursor: AsyncCursor, table: str, count: int) -> List[int]:
+    if count == 0:
+        return []
+    await cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) AS id FROM generate_series(1, %s)",
+        (table, count)
+    )
+    return [row['id'] for row in await cursor.fetchall()]
+
+async def copy_rows_async(cursor: AsyncCursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]):
+    async with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            await copy.write_row(row)
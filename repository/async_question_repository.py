@@ -0,0 +1,117 @@
+from typing import AsyncIterator, List, Tuple
+
+from config.sql_config import DB_ITERSIZE
+from model.Answer import Answer
+from model.Question import Question
+from repository.async_database import get_async_connection, reserve_ids_async, copy_rows_async
+from repository.question_cache import question_cache, question_key, invalidate_question, ALL_QUESTIONS_KEY
+from metrics.instrument import timed
+
+
+@timed
+async def create_question(question: Question) -> int:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(
+            "INSERT INTO question (question_text, correct_answer) VALUES (%s, %s) RETURNING id",
+            (question.question_text, question.correct_answer)
+        )
+        result = await cursor.fetchone()
+        if result is None:
+            raise ValueError("No ID returned after question creation.")
+    invalidate_question()
+    return result['id']
+
+@timed
+async def create_questions(questions: List[Question], cursor=None) -> List[int]:
+    if cursor is None:
+        async with get_async_connection() as connection, connection.cursor() as cursor:
+            new_ids = await create_questions(questions, cursor)
+        invalidate_question()
+        return new_ids
+    new_ids = await reserve_ids_async(cursor, 'question', len(questions))
+    await copy_rows_async(cursor, 'question', ('id', 'question_text', 'correct_answer'), (
+        (new_id, question.question_text, question.correct_answer)
+        for new_id, question in zip(new_ids, questions)
+    ))
+    return new_ids
+
+@timed
+async def get_all_questions() -> List[Question]:
+    return list(await question_cache.get_or_load_async(ALL_QUESTIONS_KEY, _load_all_questions))
+
+async def _load_all_questions() -> List[Question]:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM question")
+        return [Question(**row) for row in await cursor.fetchall()]
+
+@timed
+async def get_questions_page(limit: int, after_id: int = None) -> List[Question]:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(
+            "SELECT * FROM question WHERE id > %s ORDER BY id LIMIT %s",
+            (after_id if after_id is not None else 0, limit)
+        )
+        return [Question(**row) for row in await cursor.fetchall()]
+
+@timed
+async def iter_questions(itersize: int = DB_ITERSIZE) -> AsyncIterator[Question]:
+    async with get_async_connection() as connection, connection.cursor(name='iter_questions') as cursor:
+        cursor.itersize = itersize
+        await cursor.execute("SELECT * FROM question ORDER BY id")
+        async for row in cursor:
+            yield Question(**row)
+
+@timed
+async def get_questions_with_answers(question_ids: List[int] = None) -> List[Tuple[Question, List[Answer]]]:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("""
+            SELECT q.id, q.question_text, q.correct_answer,
+                   COALESCE(array_agg(a.incorrect_answer ORDER BY a.id) FILTER (WHERE a.id IS NOT NULL), '{}')
+                       AS incorrect_answers,
+                   COALESCE(array_agg(a.id ORDER BY a.id) FILTER (WHERE a.id IS NOT NULL), '{}') AS answer_ids
+            FROM question q
+            LEFT JOIN answer a ON a.question_id = q.id
+            WHERE %s::int[] IS NULL OR q.id = ANY(%s::int[])
+            GROUP BY q.id
+            ORDER BY q.id
+        """, (question_ids, question_ids))
+        return [
+            (
+                Question(question_text=row['question_text'], correct_answer=row['correct_answer'], id=row['id']),
+                [
+                    Answer(question_id=row['id'], incorrect_answer=incorrect_answer, id=answer_id)
+                    for answer_id, incorrect_answer in zip(row['answer_ids'], row['incorrect_answers'])
+                ]
+            )
+            for row in await cursor.fetchall()
+        ]
+
+@timed
+async def find_question_by_id(question_id: int) -> Question | None:
+    return await question_cache.get_or_load_async(question_key(question_id), lambda: _load_question(question_id))
+
+async def _load_question(question_id: int) -> Question | None:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM question WHERE id = %s", (question_id,))
+        result = await cursor.fetchone()
+        return Question(**result) if result else None
+
+@timed
+async def update_question(question_id: int, updated_question: Question) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE question
+            SET question_text = %s, correct_answer = %s
+            WHERE id = %s
+        """, (updated_question.question_text, updated_question.correct_answer, question_id))
+        updated = cursor.rowcount > 0
+    invalidate_question(question_id)
+    return updated
+
+@timed
+async def delete_question(question_id: int) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("DELETE FROM question WHERE id = %s", (question_id,))
+        deleted = cursor.rowcount > 0
+    invalidate_question(question_id)
+    return deleted
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import AsyncIterator, List
+
+from config.sql_config import DB_ITERSIZE
+from model.UserAnswer import UserAnswer
+from repository.async_database import get_async_connection, reserve_ids_async, copy_rows_async
+from repository.leaderboard import refresh_users
+from repository.partitions import answer_partitions, answered_between, as_utc
+from repository.user_answer_repository import user_answers_written
+from metrics.instrument import timed
+
+
+async def _answered_at(user_answers: List[UserAnswer]) -> List[datetime]:
+    now = datetime.now(timezone.utc)
+    answered_at = [as_utc(user_answer.answered_at) if user_answer.answered_at else now for user_answer in user_answers]
+    # Partitions are nearly always known already; creating one goes through the blocking pool off the event loop
+    if answer_partitions.missing(answered_at):
+        await asyncio.to_thread(answer_partitions.ensure, answered_at)
+    return answered_at
+
+@timed
+async def create_user_answer(user_answer: UserAnswer) -> int:
+    answered_at, = await _answered_at([user_answer])
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        if user_answer.idempotency_key is not None:
+            await cursor.execute("INSERT INTO user_answer_key (idempotency_key, answered_at) VALUES (%s, %s)",
+                                 (user_answer.idempotency_key, answered_at))
+        await cursor.execute(
+            "INSERT INTO user_answer (user_id, question_id, answer_text, is_correct, time_taken, answered_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
+            (user_answer.user_id, user_answer.question_id, user_answer.answer_text, user_answer.is_correct,
+             user_answer.time_taken, answered_at)
+        )
+        result = await cursor.fetchone()
+        if result is None:
+            raise ValueError("No ID returned after user answer creation.")
+    await asyncio.to_thread(user_answers_written, [result['id']], [user_answer])
+    return result['id']
+
+@timed
+async def create_user_answers(user_answers: List[UserAnswer], cursor=None) -> List[int]:
+    if cursor is None:
+        async with get_async_connection() as connection, connection.cursor() as cursor:
+            new_ids = await create_user_answers(user_answers, cursor)
+        await asyncio.to_thread(user_answers_written, new_ids, user_answers)
+        return new_ids
+    answered_at = await _answered_at(user_answers)
+    new_ids = await reserve_ids_async(cursor, 'user_answer', len(user_answers))
+    keys = [(user_answer.idempotency_key, moment) for user_answer, moment in zip(user_answers, answered_at)
+            if user_answer.idempotency_key is not None]
+    if keys:
+        await copy_rows_async(cursor, 'user_answer_key', ('idempotency_key', 'answered_at'), keys)
+    await copy_rows_async(
+        cursor, 'user_answer',
+        ('id', 'user_id', 'question_id', 'answer_text', 'is_correct', 'time_taken', 'answered_at'), (
+            (new_id, user_answer.user_id, user_answer.question_id, user_answer.answer_text, user_answer.is_correct,
+             user_answer.time_taken, moment)
+            for new_id, user_answer, moment in zip(new_ids, user_answers, answered_at)
+        ))
+    return new_ids
+
+@timed
+async def get_all_user_answers(since: datetime = None, until: datetime = None) -> List[UserAnswer]:
+    window, params = answered_between(since, until)
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(f"SELECT * FROM user_answer WHERE {window}", params)
+        return [UserAnswer(**row) for row in await cursor.fetchall()]
+
+@timed
+async def iter_user_answers(itersize: int = DB_ITERSIZE, since: datetime = None,
+                            until: datetime = None) -> AsyncIterator[UserAnswer]:
+    window, params = answered_between(since, until)
+    async with get_async_connection() as connection, connection.cursor(name='iter_user_answers') as cursor:
+        cursor.itersize = itersize
+        await cursor.execute(f"SELECT * FROM user_answer WHERE {window} ORDER BY id", params)
+        async for row in cursor:
+            yield UserAnswer(**row)
+
+@timed
+async def find_user_answer_by_id(user_answer_id: int) -> UserAnswer | None:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM user_answer WHERE id = %s", (user_answer_id,))
+        result = await cursor.fetchone()
+        return UserAnswer(**result) if result else None
+
+@timed
+async def update_user_answer(user_answer_id: int, updated_user_answer: UserAnswer) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE user_answer
+            SET user_id = %s, question_id = %s, answer_text = %s, is_correct = %s, time_taken = %s
+            FROM (SELECT id, user_id FROM user_answer WHERE id = %s FOR UPDATE) previous
+            WHERE user_answer.id = previous.id
+            RETURNING previous.user_id
+        """, (updated_user_answer.user_id, updated_user_answer.question_id, updated_user_answer.answer_text,
+              updated_user_answer.is_correct, updated_user_answer.time_taken, user_answer_id))
+        result = await cursor.fetchone()
+    if result is None:
+        return False
+    # The leaderboard re-reads these users through the blocking pool, so it runs off the event loop
+    await asyncio.to_thread(refresh_users, result['user_id'], updated_user_answer.user_id)
+    return True
+
+@timed
+async def delete_user_answer(user_answer_id: int) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("DELETE FROM user_answer WHERE id = %s RETURNING user_id", (user_answer_id,))
+        result = await cursor.fetchone()
+    if result is None:
+        return False
+    await asyncio.to_thread(refresh_users, result['user_id'])
+    return True
@@ -0,0 +1,77 @@
+from typing import AsyncIterator, List
+
+from config.sql_config import DB_ITERSIZE
+from model.User import User
+from repository.async_database import get_async_connection, reserve_ids_async, copy_rows_async
+from metrics.instrument import timed
+
+
+@timed
+async def create_user(user: User) -> int:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(
+            "INSERT INTO trivia_user (first, last, email) VALUES (%s, %s, %s) RETURNING id",
+            (user.first, user.last, user.email)
+        )
+        result = await cursor.fetchone()
+        if result is None:
+            raise ValueError("No ID returned after user creation.")
+        return result['id']
+
+@timed
+async def create_users(users: List[User], cursor=None) -> List[int]:
+    if cursor is None:
+        async with get_async_connection() as connection, connection.cursor() as cursor:
+            return await create_users(users, cursor)
+    new_ids = await reserve_ids_async(cursor, 'trivia_user', len(users))
+    await copy_rows_async(cursor, 'trivia_user', ('id', 'first', 'last', 'email'), (
+        (new_id, user.first, user.last, user.email)
+        for new_id, user in zip(new_ids, users)
+    ))
+    return new_ids
+
+@timed
+async def get_all_users() -> List[User]:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM trivia_user")
+        return [User(**row) for row in await cursor.fetchall()]
+
+@timed
+async def get_users_page(limit: int, after_id: int = None) -> List[User]:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute(
+            "SELECT * FROM trivia_user WHERE id > %s ORDER BY id LIMIT %s",
+            (after_id if after_id is not None else 0, limit)
+        )
+        return [User(**row) for row in await cursor.fetchall()]
+
+@timed
+async def iter_users(itersize: int = DB_ITERSIZE) -> AsyncIterator[User]:
+    async with get_async_connection() as connection, connection.cursor(name='iter_users') as cursor:
+        cursor.itersize = itersize
+        await cursor.execute("SELECT * FROM trivia_user ORDER BY id")
+        async for row in cursor:
+            yield User(**row)
+
+@timed
+async def find_user_by_id(user_id: int) -> User | None:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("SELECT * FROM trivia_user WHERE id = %s", (user_id,))
+        result = await cursor.fetchone()
+        return User(**result) if result else None
+
+@timed
+async def update_user(user_id: int, updated_user: User) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE trivia_user
+            SET first = %s, last = %s, email = %s
+            WHERE id = %s
+        """, (updated_user.first, updated_user.last, updated_user.email, user_id))
+        return cursor.rowcount > 0
+
+@timed
+async def delete_user(user_id: int) -> bool:
+    async with get_async_connection() as connection, connection.cursor() as cursor:
+        await cursor.execute("DELETE FROM trivia_user WHERE id = %s", (user_id,))
+        return cursor.rowcount > 0
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Tuple
+
+
+@dataclass
+class CacheStats:
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class TTLCache:
+    # Bounded LRU map whose entries also expire ttl seconds after they were stored.
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value, version: int = None):
+        with self._lock:
+            # A write that raced with an invalidation would re-cache stale data, so it is dropped
+            if version is not None and version != self._version:
+                return
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _begin_load(self, key: Hashable) -> Tuple[bool, object, int | None]:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._hits += 1
+                return True, entry[0], None
+            self._misses += 1
+            return False, None, self._version
+
+    def _finish_load(self, key: Hashable, value, version: int):
+        if value is not None and self.max_size > 0:
+            self.put(key, value, version)
+        return value
+
+    def get_or_load(self, key: Hashable, loader: Callable):
+        hit, value, version = self._begin_load(key)
+        return value if hit else self._finish_load(key, loader(), version)
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable]):
+        hit, value, version = self._begin_load(key)
+        return value if hit else self._finish_load(key, await loader(), version)
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            self._version += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._entries),
+                max_size=self.max_size,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations
+            )
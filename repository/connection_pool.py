@@ -0,0 +1,345 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+import psycopg2
+from psycopg2.extensions import connection as PgConnection, STATUS_READY
+from psycopg2.extras import RealDictCursor
+
+from metrics import instrument as metrics
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class PoolClosedError(Exception):
+    pass
+
+
+@dataclass
+class PoolStats:
+    min_size: int
+    max_size: int
+    size: int
+    idle: int
+    in_use: int
+    created: int
+    closed: int
+    checkouts: int
+    timeouts: int
+    total_wait_time: float
+    max_wait_time: float
+
+
+_CACHEABLE_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+_PLACEHOLDER = re.compile(r'%s')
+
+
+def _is_cacheable(query, params) -> bool:
+    if not isinstance(query, str) or params is not None and not isinstance(params, (tuple, list)):
+        return False
+    statement = query.strip().rstrip(';')
+    if ';' in statement or not statement.split(None, 1)[0].upper() in _CACHEABLE_STATEMENTS:
+        return False
+    placeholders = len(_PLACEHOLDER.findall(statement))
+    if statement.count('%') != placeholders:
+        return False
+    return placeholders == len(params or ())
+
+
+class StatementCachingCursor(RealDictCursor):
+    # Runs plain DML/SELECT statements through a per-connection PREPARE/EXECUTE cache,
+    # so Postgres parses and plans each repository statement once per connection.
+    def execute(self, query, vars=None):
+        if not metrics.is_enabled():
+            return self._execute(query, vars)
+        started = time.perf_counter()
+        try:
+            return self._execute(query, vars)
+        finally:
+            metrics.observe_sql(query, time.perf_counter() - started)
+
+    def _execute(self, query, vars=None):
+        cache = getattr(self.connection, 'statement_cache', None)
+        if self.name is not None or cache is None or not _is_cacheable(query, vars):
+            return super().execute(query, vars)
+        name = cache.get(query)
+        if name is None:
+            name = cache.add(query, self)
+        params = tuple(vars or ())
+        if not params:
+            return super().execute(f"EXECUTE {name}")
+        return super().execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
+
+class StatementCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.generation = 0
+        self._statements = OrderedDict()
+        self._counter = 0
+
+    def get(self, query: str):
+        name = self._statements.get(query)
+        if name is not None:
+            self._statements.move_to_end(query)
+        return name
+
+    def add(self, query: str, cursor) -> str:
+        if len(self._statements) >= self.max_size:
+            _, evicted = self._statements.popitem(last=False)
+            RealDictCursor.execute(cursor, f"DEALLOCATE {evicted}")
+        self._counter += 1
+        name = f"stmt_{self._counter}"
+        position = iter(range(1, len(_PLACEHOLDER.findall(query)) + 1))
+        statement = _PLACEHOLDER.sub(lambda _: f"${next(position)}", query.strip().rstrip(';'))
+        RealDictCursor.execute(cursor, f"PREPARE {name} AS {statement}")
+        self._statements[query] = name
+        return name
+
+    def clear(self, cursor=None):
+        if cursor is not None and self._statements:
+            RealDictCursor.execute(cursor, "DEALLOCATE ALL")
+        self._statements.clear()
+
+    def __len__(self):
+        return len(self._statements)
+
+
+class PooledPgConnection(PgConnection):
+    statement_cache = None
+    last_used = 0.0
+
+
+class PooledConnection:
+    # Proxy handed out by the pool. Used as a context manager it commits or rolls back like a
+    # psycopg2 connection and then returns itself to the pool; close() also returns it.
+    def __init__(self, pool, connection: PooledPgConnection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise PoolClosedError("Connection has already been returned to the pool.")
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        connection = self._connection
+        if connection is None:
+            return
+        try:
+            if not connection.closed:
+                if exc_type is None:
+                    connection.commit()
+                else:
+                    connection.rollback()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(connection)
+
+    @property
+    def closed(self):
+        return 1 if self._connection is None else self._connection.closed
+
+
+class ConnectionPool:
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10, timeout: float = 30.0,
+                 health_check_interval: float = 30.0, statement_cache_size: int = 100):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.statement_cache_size = statement_cache_size
+        self._idle = deque()
+        self._inherited = []
+        self._size = 0
+        self._in_use = 0
+        self._created = 0
+        self._closed_count = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._generation = 0
+        self._closed = False
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append(self._connect())
+            self._size += 1
+            self._created += 1
+
+    def _connect(self) -> PooledPgConnection:
+        # Called without the lock held; the caller has already counted the connection in _size
+        connection = psycopg2.connect(self.dsn, connection_factory=PooledPgConnection,
+                                      cursor_factory=StatementCachingCursor)
+        if self.statement_cache_size > 0:
+            connection.statement_cache = StatementCache(self.statement_cache_size)
+            connection.statement_cache.generation = self._generation
+        connection.last_used = time.monotonic()
+        return connection
+
+    def _discard(self, connection: PooledPgConnection):
+        self._size -= 1
+        self._closed_count += 1
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def _is_healthy(self, connection: PooledPgConnection) -> bool:
+        if connection.closed:
+            return False
+        if time.monotonic() - connection.last_used < self.health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                RealDictCursor.execute(cursor, "SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _prepare_for_checkout(self, connection: PooledPgConnection):
+        cache = connection.statement_cache
+        if cache is not None and cache.generation != self._generation:
+            with connection.cursor() as cursor:
+                cache.clear(cursor)
+            connection.commit()
+            cache.generation = self._generation
+
+    def _reset_after_fork(self):
+        # Connections must never be shared across processes; a forked worker starts a fresh pool.
+        # Inherited connections are kept referenced so garbage collection never closes the parent's sockets.
+        self._inherited.extend(self._idle)
+        self._idle.clear()
+        self._size = 0
+        self._in_use = 0
+        self._pid = os.getpid()
+
+    def _reserve(self, deadline: float) -> PooledPgConnection | None:
+        # Takes a slot under the lock: an idle connection, or None once room for a new connection has been
+        # counted in _size. The slot counts as in use until it is handed out or given back.
+        with self._condition:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed.")
+                if self._idle:
+                    self._in_use += 1
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(f"Timed out after {self.timeout}s waiting for a database connection.")
+                self._condition.wait(remaining)
+
+    def _give_back(self, connection: PooledPgConnection = None):
+        # Frees a reserved slot whose connection failed its health check or could not be opened
+        if connection is not None:
+            try:
+                connection.close()
+            except psycopg2.Error:
+                pass
+        with self._condition:
+            self._size -= 1
+            self._in_use -= 1
+            if connection is not None:
+                self._closed_count += 1
+            self._condition.notify()
+
+    def getconn(self) -> PooledConnection:
+        # The lock is held only to take a slot and to record the checkout; connecting and health checks,
+        # which wait on the network, run without it so they never hold up other threads
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            connection = self._reserve(deadline)
+            created = connection is None
+            if created:
+                try:
+                    connection = self._connect()
+                except BaseException:
+                    self._give_back()
+                    raise
+                break
+            if self._is_healthy(connection):
+                break
+            self._give_back(connection)
+        with self._condition:
+            if created:
+                self._created += 1
+            self._checkouts += 1
+            waited = time.monotonic() - started
+            self._total_wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        try:
+            self._prepare_for_checkout(connection)
+        except psycopg2.Error:
+            self.release(connection)
+            raise
+        return PooledConnection(self, connection)
+
+    def release(self, connection: PooledPgConnection):
+        with self._condition:
+            if self._pid != os.getpid():
+                return
+            self._in_use -= 1
+            if not connection.closed and connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    pass
+            if self._closed or connection.closed or connection.status != STATUS_READY:
+                self._discard(connection)
+            else:
+                connection.last_used = time.monotonic()
+                self._idle.append(connection)
+            self._condition.notify()
+
+    def invalidate_statements(self):
+        # Called after DDL: every connection drops its prepared statements on next checkout.
+        with self._condition:
+            self._generation += 1
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return PoolStats(
+                min_size=self.min_size,
+                max_size=self.max_size,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._in_use,
+                created=self._created,
+                closed=self._closed_count,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                total_wait_time=self._total_wait_time,
+                max_wait_time=self._max_wait_time
+            )
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._condition.notify_all()
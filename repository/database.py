@@ -1,85 +1,114 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from config.sql_config import SQL_URI
+import csv
+import io
+import threading
+from typing import Callable, Iterable, List, Sequence, Tuple
 
+from psycopg2 import DataError, IntegrityError, InterfaceError, OperationalError
 
+from config.sql_config import (
+    SQL_URI,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_STATEMENT_CACHE_SIZE
+)
+from repository.connection_pool import ConnectionPool, PoolStats, PoolTimeoutError
+from repository.storage import backend_function
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_schema_change_listeners: List[Callable[[], None]] = []
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    SQL_URI,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+                    statement_cache_size=DB_STATEMENT_CACHE_SIZE
+                )
+    return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def get_pool_stats() -> PoolStats:
+    return get_pool().stats()
+
+def on_schema_change(listener: Callable[[], None]):
+    _schema_change_listeners.append(listener)
+
+def _notify_schema_change():
+    # Without a pool nothing has been prepared yet, and the embedded backend never opens one
+    if _pool is not None:
+        _pool.invalidate_statements()
+    for listener in _schema_change_listeners:
+        listener()
+
+@backend_function
 def get_db_connection():
-    return psycopg2.connect(SQL_URI, cursor_factory=RealDictCursor)
+    return get_pool().getconn()
 
-def create_tables():
-    _create_table_trivia_user()
-    _create_table_question()
-    _create_table_answer()
-    _create_table_user_answer()
+@backend_function
+def integrity_errors() -> Tuple[type, ...]:
+    # A foreign key or unique constraint was violated
+    return IntegrityError,
 
-def _create_table_trivia_user():
-    with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS trivia_user (
-            id SERIAL PRIMARY KEY,
-            first VARCHAR(100) NOT NULL,
-            last VARCHAR(100) NOT NULL,
-            email VARCHAR(100) NOT NULL
-        )
-        ''')
-        connection.commit()
-
-def _create_table_question():
-    with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS question (
-            id SERIAL PRIMARY KEY,
-            question_text TEXT NOT NULL,
-            correct_answer VARCHAR(255) NOT NULL
-        )
-        ''')
-        connection.commit()
-
-def _create_table_answer():
-    with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS answer (
-            id SERIAL PRIMARY KEY,
-            question_id INTEGER NOT NULL,
-            incorrect_answer VARCHAR(255) NOT NULL,
-            FOREIGN KEY (question_id) REFERENCES question(id) ON DELETE CASCADE
-        )
-        ''')
-        connection.commit()
-
-def _create_table_user_answer():
-    with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_answer (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            question_id INTEGER NOT NULL,
-            answer_text VARCHAR(255) NOT NULL,
-            is_correct BOOLEAN NOT NULL,
-            time_taken INTERVAL NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES trivia_user(id) ON DELETE CASCADE,
-            FOREIGN KEY (question_id) REFERENCES question(id) ON DELETE CASCADE
-        )
-        ''')
-        connection.commit()
+@backend_function
+def refused_errors() -> Tuple[type, ...]:
+    # Errors caused by the rows themselves (a missing reference, a value out of range): retrying cannot help
+    return IntegrityError, DataError
+
+@backend_function
+def transient_errors() -> Tuple[type, ...]:
+    # A lost connection or a busy database or pool: the same statement can succeed when retried
+    return OperationalError, InterfaceError, PoolTimeoutError
+
+def reserve_ids(cursor, table: str, count: int) -> List[int]:
+    if count == 0:
+        return []
+    cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) AS id FROM generate_series(1, %s)",
+        (table, count)
+    )
+    return [row['id'] for row in cursor.fetchall()]
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+@backend_function
+def create_tables():
+    # The schema lives in versioned migrations; imported here since migrations builds on this module
+    from repository.migrations import migrate
+    migrate()
 
 
+@backend_function
 def is_tables_exists() -> bool:
     table_names = ['trivia_user', 'question', 'answer', 'user_answer']
-    existing_tables = []
 
     with get_db_connection() as connection, connection.cursor() as cursor:
-        for table_name in table_names:
-            cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = %s
-                );
-            """, (table_name,))
-
-            if cursor.fetchone()['exists']:
-                existing_tables.append(table_name)
+        cursor.execute("""
+            SELECT COALESCE(array_agg(relname::text), '{}') AS existing
+            FROM pg_class
+            WHERE relnamespace = 'public'::regnamespace AND relkind IN ('r', 'p') AND relname = ANY(%s)
+        """, (table_names,))
+        existing = cursor.fetchone()['existing']
+    existing_tables = [name for name in table_names if name in existing]
     print("The following tables exist:", ", ".join(existing_tables))
     if set(existing_tables) == set(table_names):
         print("All tables have been created successfully.")
@@ -89,18 +118,23 @@ def is_tables_exists() -> bool:
         return False
 
 
+@backend_function
 def drop_all_tables():
     connection = get_db_connection()
     cursor = connection.cursor()
 
     cursor.execute('''
+        DROP TABLE IF EXISTS game_session;
+        DROP TABLE IF EXISTS timing_stats;
         DROP TABLE IF EXISTS user_answer;
+        DROP TABLE IF EXISTS user_answer_key;
         DROP TABLE IF EXISTS answer;
         DROP TABLE IF EXISTS question;
         DROP TABLE IF EXISTS trivia_user;
+        DROP TABLE IF EXISTS schema_migrations;
     ''')
 
     connection.commit()
     cursor.close()
     connection.close()
-    
\ No newline at end of file
+    _notify_schema_change()
@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+from psycopg2.extras import Json
+
+from repository.database import get_db_connection
+from repository.storage import backend_function
+from metrics.instrument import timed
+
+
+@timed
+@backend_function
+def create_game_session(game_id: str, state: Dict, ttl: float):
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO game_session (id, state, expires_at) VALUES (%s, %s, now() + %s * interval '1 second')",
+            (game_id, Json(state), ttl)
+        )
+        connection.commit()
+
+@timed
+@backend_function
+def get_game_session(game_id: str, ttl: float) -> Dict | None:
+    # Reading a game counts as using it, so its expiry moves ttl seconds ahead
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE game_session SET expires_at = now() + %s * interval '1 second'
+            WHERE id = %s AND expires_at > now()
+            RETURNING state
+        """, (ttl, game_id))
+        row = cursor.fetchone()
+        connection.commit()
+        return row['state'] if row else None
+
+@backend_function
+@contextmanager
+def locked_game_session(game_id: str, ttl: float) -> Iterator[Tuple[object, Dict | None]]:
+    # Yields a cursor and the game's state, holding the row lock for the block, so two workers never play the
+    # same game at once. The state dict, changed in place, is written back when the block exits cleanly, and
+    # whatever else was written on the cursor commits with it.
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT state FROM game_session WHERE id = %s AND expires_at > now() FOR UPDATE", (game_id,))
+        row = cursor.fetchone()
+        state = row['state'] if row else None
+        yield cursor, state
+        if state is not None:
+            cursor.execute(
+                "UPDATE game_session SET state = %s, expires_at = now() + %s * interval '1 second' WHERE id = %s",
+                (Json(state), ttl, game_id)
+            )
+        connection.commit()
+
+@timed
+@backend_function
+def delete_game_session(game_id: str) -> Dict | None:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM game_session WHERE id = %s AND expires_at > now() RETURNING state", (game_id,))
+        row = cursor.fetchone()
+        connection.commit()
+        return row['state'] if row else None
+
+@timed
+@backend_function
+def delete_expired_game_sessions() -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM game_session WHERE expires_at <= now()")
+        deleted = cursor.rowcount
+        connection.commit()
+        return deleted
+
+@timed
+@backend_function
+def count_game_sessions() -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) AS count FROM game_session WHERE expires_at > now()")
+        return cursor.fetchone()['count']
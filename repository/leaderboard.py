@@ -0,0 +1,271 @@
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from model.UserAnswer import UserAnswer
+from repository.database import get_db_connection, on_schema_change
+from repository.partitions import answered_between
+from repository.storage import backend_function
+
+
+@dataclass
+class LeaderboardEntry:
+    user_id: int
+    correct: int
+    answered: int
+    fastest: float
+
+    @property
+    def key(self) -> Tuple[int, float, int]:
+        # Most correct answers first, then the fastest single answer, then the lowest user id
+        return -self.correct, self.fastest, self.user_id
+
+
+class _Node:
+    __slots__ = ('key', 'priority', 'left', 'right', 'size')
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = 1
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+def _resize(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+def _split(node, key):
+    # Returns (keys < key, keys >= key)
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return _resize(node), right
+    left, node.left = _split(node.left, key)
+    return left, _resize(node)
+
+def _merge(left, right):
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _resize(left)
+    right.left = _merge(left, right.left)
+    return _resize(right)
+
+def _pop_first(node):
+    if node.left is None:
+        return node.right
+    node.left = _pop_first(node.left)
+    return _resize(node)
+
+
+class RankedSet:
+    # Size-augmented treap: insert, remove, rank and select are O(log n) expected.
+    def __init__(self):
+        self._root = None
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def add(self, key):
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+
+    def remove(self, key):
+        left, right = _split(self._root, key)
+        if right is not None:
+            node = right
+            while node.left is not None:
+                node = node.left
+            if node.key == key:
+                right = _pop_first(right)
+        self._root = _merge(left, right)
+
+    def rank(self, key) -> int:
+        rank, node = 0, self._root
+        while node is not None:
+            if node.key < key:
+                rank += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def select(self, index: int):
+        node = self._root
+        while node is not None:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.key
+            else:
+                index -= left_size + 1
+                node = node.right
+        raise IndexError("RankedSet index out of range")
+
+    def first(self, count: int) -> List:
+        keys, stack, node = [], [], self._root
+        while (stack or node is not None) and len(keys) < count:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                keys.append(node.key)
+                node = node.right
+        return keys
+
+
+class Leaderboard:
+    # All-time ranking kept in memory and updated as answers are written. It is per process: each copy loads
+    # from the database once and then only sees the writes made through its own process, so the ranking is
+    # right for a single process only (app.serve runs one worker). Other processes' answers appear after a
+    # reset, and top_between reads the database directly.
+    def __init__(self):
+        self._entries: Dict[int, LeaderboardEntry] = {}
+        self._ranking = RankedSet()
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._loaded_through_id = 0
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            totals, self._loaded_through_id = load_user_totals()
+            for user_id, correct, answered, fastest in totals:
+                self._set(LeaderboardEntry(user_id, correct, answered, fastest))
+            self._loaded = True
+
+    def _set(self, entry: LeaderboardEntry):
+        previous = self._entries.pop(entry.user_id, None)
+        if previous is not None:
+            self._ranking.remove(previous.key)
+        if entry.answered > 0:
+            self._entries[entry.user_id] = entry
+            self._ranking.add(entry.key)
+
+    def record(self, answer_id: int, user_id: int, is_correct: bool, seconds: float) -> bool:
+        # Returns False for an answer whose id is not above the loaded id. It may or may not be part of the
+        # loaded totals: ids are handed out in order but can commit out of order, so a transaction holding a
+        # lower id can commit after the load. Such users are re-read with refresh instead of counted here.
+        with self._lock:
+            if not self._loaded:
+                return True
+            if answer_id <= self._loaded_through_id:
+                return False
+            entry = self._entries.get(user_id) or LeaderboardEntry(user_id, 0, 0, float('inf'))
+            self._set(LeaderboardEntry(
+                user_id=user_id,
+                correct=entry.correct + (1 if is_correct else 0),
+                answered=entry.answered + 1,
+                fastest=min(entry.fastest, seconds)
+            ))
+            return True
+
+    def refresh(self, user_ids: Iterable[int]):
+        # Deletes and updates can remove a user's fastest answer, so those users are re-read from the database
+        with self._lock:
+            if not self._loaded:
+                return
+            user_ids = set(user_ids)
+            totals = {row[0]: row for row in load_user_totals(list(user_ids))[0]}
+            for user_id in user_ids:
+                _, correct, answered, fastest = totals.get(user_id, (user_id, 0, 0, float('inf')))
+                self._set(LeaderboardEntry(user_id, correct, answered, fastest))
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._ranking = RankedSet()
+            self._loaded = False
+            self._loaded_through_id = 0
+
+    def top(self, count: int) -> List[LeaderboardEntry]:
+        with self._lock:
+            self._ensure_loaded()
+            return [self._entries[key[2]] for key in self._ranking.first(count)]
+
+    def rank_of(self, user_id: int) -> int | None:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(user_id)
+            return self._ranking.rank(entry.key) + 1 if entry else None
+
+    def nth(self, place: int) -> LeaderboardEntry | None:
+        with self._lock:
+            self._ensure_loaded()
+            if not 1 <= place <= len(self._ranking):
+                return None
+            return self._entries[self._ranking.select(place - 1)[2]]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._ranking)
+
+
+@backend_function
+def load_user_totals(user_ids: List[int] = None) -> Tuple[List[Tuple[int, int, int, float]], int]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM user_answer")
+        max_id = cursor.fetchone()['max_id']
+        cursor.execute("""
+            SELECT user_id,
+                   COUNT(*) FILTER (WHERE is_correct) AS correct,
+                   COUNT(*) AS answered,
+                   MIN(EXTRACT(EPOCH FROM time_taken))::float8 AS fastest
+            FROM user_answer
+            WHERE %s::int[] IS NULL OR user_id = ANY(%s::int[])
+            GROUP BY user_id
+        """, (user_ids, user_ids))
+        totals = [(row['user_id'], row['correct'], row['answered'], row['fastest']) for row in cursor.fetchall()]
+        return totals, max_id
+
+
+@backend_function
+def top_between(count: int, since: datetime = None, until: datetime = None) -> List[LeaderboardEntry]:
+    # Ranked in SQL from the answers in the window rather than from the all-time ranking kept in memory,
+    # so only the partitions the window overlaps are read
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT user_id,
+                   COUNT(*) FILTER (WHERE is_correct) AS correct,
+                   COUNT(*) AS answered,
+                   MIN(EXTRACT(EPOCH FROM time_taken))::float8 AS fastest
+            FROM user_answer
+            WHERE {window}
+            GROUP BY user_id
+            ORDER BY correct DESC, fastest, user_id
+            LIMIT %s
+        """, (*params, count))
+        return [LeaderboardEntry(row['user_id'], row['correct'], row['answered'], row['fastest'])
+                for row in cursor.fetchall()]
+
+
+def _seconds(time_taken) -> float:
+    return time_taken.total_seconds() if isinstance(time_taken, timedelta) else float(time_taken)
+
+
+leaderboard = Leaderboard()
+on_schema_change(leaderboard.reset)
+
+
+def record_user_answers(answer_ids: Iterable[int], user_answers: Iterable[UserAnswer]):
+    unsure = {user_answer.user_id for answer_id, user_answer in zip(answer_ids, user_answers)
+              if not leaderboard.record(answer_id, user_answer.user_id, user_answer.is_correct,
+                                        _seconds(user_answer.time_taken))}
+    if unsure:
+        leaderboard.refresh(unsure)
+
+def refresh_users(*user_ids: int):
+    leaderboard.refresh(user_ids)
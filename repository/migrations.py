@@ -0,0 +1,320 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Set, Tuple
+
+import psycopg2
+
+from config.sql_config import SQL_URI, DB_CONCURRENT_INDEX_ROWS
+from repository.database import get_db_connection, _notify_schema_change
+from repository.partitions import answer_partitions
+
+# Key for the advisory locks that keep workers starting at the same time from migrating twice
+_MIGRATION_LOCK = 7_201_815
+
+
+@dataclass(frozen=True)
+class Index:
+    name: str
+    table: str
+    columns: str
+    unique: bool = False
+
+    def create_sql(self, concurrently: bool = False) -> str:
+        return (f"CREATE {'UNIQUE ' if self.unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+                f"IF NOT EXISTS {self.name} ON {self.table} ({self.columns})")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: Tuple[str, ...] = ()
+    indexes: Tuple[Index, ...] = ()
+    tables: Tuple[str, ...] = ()
+    partitioned: Tuple[str, ...] = ()
+    # Indexes of earlier migrations that this one removes
+    supersedes: Tuple[str, ...] = ()
+    # Steps that need more than a fixed statement; run after the statements and before the indexes
+    apply: Callable[[object], None] = None
+
+
+def _partition_user_answer(cursor):
+    # Rebuilds an unpartitioned user_answer as a table range-partitioned on answered_at. The old table never
+    # recorded when an answer was given, so its rows are stamped with the time of the migration. A partitioned
+    # table can only enforce uniqueness together with answered_at, so idempotency keys move to user_answer_key.
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('user_answer')")
+    if cursor.fetchone()['relkind'] == 'p':
+        return
+    cursor.execute("ALTER TABLE user_answer RENAME TO user_answer_unpartitioned")
+    cursor.execute("ALTER INDEX user_answer_pkey RENAME TO user_answer_unpartitioned_pkey")
+    cursor.execute("DROP INDEX IF EXISTS idx_user_answer_user_id, idx_user_answer_question_id, "
+                   "idx_user_answer_idempotency_key")
+    cursor.execute('''
+        CREATE TABLE user_answer (
+            id INTEGER NOT NULL DEFAULT nextval('user_answer_id_seq'),
+            user_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer_text VARCHAR(255) NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            time_taken INTERVAL NOT NULL,
+            answered_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, answered_at),
+            FOREIGN KEY (user_id) REFERENCES trivia_user(id) ON DELETE CASCADE,
+            FOREIGN KEY (question_id) REFERENCES question(id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (answered_at)
+    ''')
+    cursor.execute("ALTER SEQUENCE user_answer_id_seq OWNED BY user_answer.id")
+    answer_partitions.create_partitions(cursor)
+    cursor.execute('''
+        INSERT INTO user_answer (id, user_id, question_id, answer_text, is_correct, time_taken, answered_at)
+        SELECT id, user_id, question_id, answer_text, is_correct, time_taken, now()
+        FROM user_answer_unpartitioned
+    ''')
+    cursor.execute('''
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'user_answer_unpartitioned'::regclass AND attname = 'idempotency_key' AND NOT attisdropped
+    ''')
+    if cursor.fetchone() is not None:
+        cursor.execute('''
+            INSERT INTO user_answer_key (idempotency_key, answered_at)
+            SELECT idempotency_key, now() FROM user_answer_unpartitioned WHERE idempotency_key IS NOT NULL
+            ON CONFLICT (idempotency_key) DO NOTHING
+        ''')
+    cursor.execute("DROP TABLE user_answer_unpartitioned")
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, 'create tables', statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS trivia_user (
+            id SERIAL PRIMARY KEY,
+            first VARCHAR(100) NOT NULL,
+            last VARCHAR(100) NOT NULL,
+            email VARCHAR(100) NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS question (
+            id SERIAL PRIMARY KEY,
+            question_text TEXT NOT NULL,
+            correct_answer VARCHAR(255) NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS answer (
+            id SERIAL PRIMARY KEY,
+            question_id INTEGER NOT NULL,
+            incorrect_answer VARCHAR(255) NOT NULL,
+            FOREIGN KEY (question_id) REFERENCES question(id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_answer (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer_text VARCHAR(255) NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            time_taken INTERVAL NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES trivia_user(id) ON DELETE CASCADE,
+            FOREIGN KEY (question_id) REFERENCES question(id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS timing_stats (
+            bucket VARCHAR(64) PRIMARY KEY,
+            stats JSONB NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        '''
+    ), tables=('trivia_user', 'question', 'answer', 'user_answer', 'timing_stats')),
+    Migration(2, 'add user answer idempotency keys', statements=(
+        "ALTER TABLE user_answer ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(64)",
+    ), indexes=(
+        Index('idx_user_answer_idempotency_key', 'user_answer', 'idempotency_key', unique=True),
+    )),
+    Migration(3, 'index foreign keys', indexes=(
+        Index('idx_answer_question_id', 'answer', 'question_id'),
+        Index('idx_user_answer_user_id', 'user_answer', 'user_id'),
+        Index('idx_user_answer_question_id', 'user_answer', 'question_id')
+    )),
+    Migration(4, 'partition user answers by answered_at', statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS user_answer_key (
+            idempotency_key VARCHAR(64) PRIMARY KEY,
+            answered_at TIMESTAMPTZ NOT NULL
+        )
+        ''',
+    ), apply=_partition_user_answer, indexes=(
+        Index('idx_user_answer_user_id', 'user_answer', 'user_id'),
+        Index('idx_user_answer_question_id', 'user_answer', 'question_id'),
+        Index('idx_user_answer_answered_at', 'user_answer', 'answered_at'),
+        Index('idx_user_answer_key_answered_at', 'user_answer_key', 'answered_at')
+    ), tables=('user_answer_key',), partitioned=('user_answer',), supersedes=('idx_user_answer_idempotency_key',)),
+    Migration(5, 'store game sessions', statements=(
+        '''
+        CREATE TABLE IF NOT EXISTS game_session (
+            id VARCHAR(32) PRIMARY KEY,
+            state JSONB NOT NULL,
+            expires_at TIMESTAMPTZ NOT NULL
+        )
+        ''',
+    ), indexes=(
+        Index('idx_game_session_expires_at', 'game_session', 'expires_at'),
+    ), tables=('game_session',))
+)
+# Indexes a later migration has removed no longer count towards an earlier migration being applied
+_SUPERSEDED = {name for migration in MIGRATIONS for name in migration.supersedes}
+
+
+@dataclass
+class SchemaState:
+    tables: Set[str]
+    partitioned: Set[str]
+    # Index name -> whether it is valid; a failed concurrent build leaves an invalid index behind
+    indexes: Dict[str, bool]
+    row_estimates: Dict[str, float]
+    versions: Set[int]
+
+    def is_applied(self, migration: Migration) -> bool:
+        # A recorded migration whose tables or indexes have since been dropped is applied again;
+        # every statement is idempotent, so this only repairs what is missing
+        return (migration.version in self.versions
+                and self.tables.issuperset(migration.tables)
+                and self.partitioned.issuperset(migration.partitioned)
+                and all(self.indexes.get(index.name) for index in migration.indexes if index.name not in _SUPERSEDED))
+
+
+_SCHEMA_STATE_QUERY = """
+    SELECT
+        (SELECT COALESCE(json_agg(c.relname), '[]')
+         FROM pg_class c
+         WHERE c.relnamespace = to_regnamespace(current_schema()) AND c.relkind IN ('r', 'p') AND NOT c.relispartition) AS tables,
+        (SELECT COALESCE(json_agg(c.relname), '[]')
+         FROM pg_class c
+         WHERE c.relnamespace = to_regnamespace(current_schema()) AND c.relkind = 'p') AS partitioned,
+        (SELECT COALESCE(json_object_agg(c.relname, i.indisvalid), '{}')
+         FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+         WHERE c.relnamespace = to_regnamespace(current_schema())) AS indexes,
+        (SELECT COALESCE(json_object_agg(c.relname, GREATEST(c.reltuples, 0)), '{}')
+         FROM pg_class c
+         WHERE c.relnamespace = to_regnamespace(current_schema()) AND c.relkind IN ('r', 'p') AND NOT c.relispartition) AS row_estimates,
+        (SELECT COALESCE(json_agg(version), '[]') FROM schema_migrations) AS versions
+"""
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+def _read_state(cursor) -> SchemaState:
+    cursor.execute(_SCHEMA_STATE_QUERY)
+    row = cursor.fetchone()
+    return SchemaState(
+        tables=set(row['tables']),
+        partitioned=set(row['partitioned']),
+        indexes=row['indexes'],
+        row_estimates=row['row_estimates'],
+        versions=set(row['versions'])
+    )
+
+def _record(cursor, migration: Migration):
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s) ON CONFLICT (version) DO NOTHING",
+        (migration.version, migration.name)
+    )
+
+
+def schema_state() -> SchemaState:
+    # Tables, indexes, row estimates and applied versions in a single round trip
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        _ensure_version_table(cursor)
+        return _read_state(cursor)
+
+
+def _build_concurrently(deferred: List[Tuple[Migration, List[Index]]]):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction block, so it gets its own autocommit connection.
+    # A session advisory lock keeps two workers from building, or dropping, the same index at once.
+    connection = psycopg2.connect(SQL_URI)
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (_MIGRATION_LOCK,))
+            try:
+                cursor.execute(_SCHEMA_STATE_QUERY)
+                indexes = cursor.fetchone()[2]
+                for migration, migration_indexes in deferred:
+                    for index in migration_indexes:
+                        if indexes.get(index.name) is False:
+                            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+                        cursor.execute(index.create_sql(concurrently=True))
+                    _record(cursor, migration)
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (_MIGRATION_LOCK,))
+    finally:
+        connection.close()
+
+
+def migrate(target: int = None, concurrent_rows: int = DB_CONCURRENT_INDEX_ROWS) -> List[int]:
+    # Applies every pending migration up to target in one transaction and records it in schema_migrations.
+    # Indexes on tables estimated to hold at least concurrent_rows rows are built afterwards with
+    # CREATE INDEX CONCURRENTLY, so a live table keeps taking writes; their migration is recorded once
+    # those indexes exist. Returns the versions applied by this call.
+    planned = [migration for migration in MIGRATIONS if target is None or migration.version <= target]
+    applied, deferred = [], []
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_MIGRATION_LOCK,))
+        _ensure_version_table(cursor)
+        state = _read_state(cursor)
+        for position, migration in enumerate(planned):
+            if state.is_applied(migration):
+                continue
+            # An index that a later migration in the plan removes is not built at all
+            superseded = {name for later in planned[position + 1:] for name in later.supersedes}
+            for statement in migration.statements:
+                cursor.execute(statement)
+            if migration.apply is not None:
+                migration.apply(cursor)
+                state = _read_state(cursor)
+            large = []
+            for index in migration.indexes:
+                if index.name in superseded:
+                    continue
+                valid = state.indexes.get(index.name)
+                if not valid and state.row_estimates.get(index.table, 0) >= concurrent_rows:
+                    large.append(index)
+                    continue
+                if valid is False:
+                    cursor.execute(f"DROP INDEX IF EXISTS {index.name}")
+                cursor.execute(index.create_sql())
+            deferred.append((migration, large))
+            applied.append(migration.version)
+        # Deferrals are settled once the whole plan has run: a later migration may have partitioned the
+        # table, and CONCURRENTLY is not supported on a partitioned table, whose indexes are built partition
+        # by partition. Those indexes are built here, and migrations left with nothing to build concurrently
+        # are recorded in this transaction.
+        state = _read_state(cursor)
+        concurrent = []
+        for migration, large in deferred:
+            remaining = []
+            for index in large:
+                if index.table not in state.partitioned:
+                    remaining.append(index)
+                elif not state.indexes.get(index.name):
+                    cursor.execute(f"DROP INDEX IF EXISTS {index.name}")
+                    cursor.execute(index.create_sql())
+            if remaining:
+                concurrent.append((migration, remaining))
+            else:
+                _record(cursor, migration)
+    if concurrent:
+        _build_concurrently(concurrent)
+    _notify_schema_change()
+    return applied
+
+
+if __name__ == '__main__':
+    print(f"Applied migrations: {migrate() or 'none'}")
@@ -0,0 +1,157 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Set, Tuple
+
+from config.sql_config import DB_PARTITION_INTERVAL, DB_PARTITION_PREMAKE, DB_ANSWER_RETENTION_DAYS
+from repository.database import get_db_connection, on_schema_change, _notify_schema_change
+
+PARTITION_INTERVALS = ('day', 'week', 'month')
+# Key for the advisory lock that serialises partition creation and retention across processes
+_PARTITION_LOCK = 7_201_816
+
+_PARTITIONS_QUERY = r"""
+    SELECT c.relname AS name,
+           substring(pg_get_expr(c.relpartbound, c.oid) FROM 'FROM \(''([^'']+)''\)')::timestamptz AS lower_bound,
+           substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::timestamptz AS upper_bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass('user_answer')
+    ORDER BY lower_bound NULLS FIRST
+"""
+
+
+def as_utc(moment: datetime) -> datetime:
+    # Naive datetimes are taken to be UTC, like the partition bounds
+    return moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def period_start(moment: datetime, interval: str = DB_PARTITION_INTERVAL) -> datetime:
+    start = as_utc(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == 'week':
+        return start - timedelta(days=start.weekday())
+    if interval == 'month':
+        return start.replace(day=1)
+    return start
+
+def next_period(start: datetime, interval: str = DB_PARTITION_INTERVAL) -> datetime:
+    if interval == 'month':
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start + timedelta(days=7 if interval == 'week' else 1)
+
+def partition_name(start: datetime) -> str:
+    return f"user_answer_p{start:%Y%m%d}"
+
+def answered_between(since: datetime = None, until: datetime = None, column: str = 'answered_at') \
+        -> Tuple[str, List[datetime]]:
+    # SQL condition and parameters for since <= answered_at < until. Only the bounds that are given appear in
+    # the condition, so the planner can prune partitions outside the window.
+    conditions, params = [], []
+    if since is not None:
+        conditions.append(f"{column} >= %s")
+        params.append(as_utc(since))
+    if until is not None:
+        conditions.append(f"{column} < %s")
+        params.append(as_utc(until))
+    return ' AND '.join(conditions) or 'TRUE', params
+
+
+def _covers(ranges: List[Tuple[datetime | None, datetime | None]], moment: datetime) -> bool:
+    return any((lower is None or lower <= moment) and (upper is None or moment < upper) for lower, upper in ranges)
+
+
+class AnswerPartitions:
+    # user_answer is range-partitioned on answered_at, one partition per day, week or month (UTC). Rows can
+    # only be inserted into an existing partition, so writers call ensure() with the times they are about to
+    # write. The current period and the next `premake` periods always exist, which keeps partition creation,
+    # and the brief exclusive lock it takes on user_answer, off the path of ordinary inserts.
+    def __init__(self, interval: str = DB_PARTITION_INTERVAL, premake: int = DB_PARTITION_PREMAKE,
+                 clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        if interval not in PARTITION_INTERVALS:
+            raise ValueError(f"Partition interval must be one of: {', '.join(PARTITION_INTERVALS)}")
+        self.interval = interval
+        self.premake = premake
+        self._clock = clock
+        self._ranges = None
+        self._lock = threading.Lock()
+
+    def _needed(self, moments: Iterable[datetime | None]) -> Set[datetime]:
+        start = period_start(self._clock(), self.interval)
+        starts = set()
+        for _ in range(self.premake + 1):
+            starts.add(start)
+            start = next_period(start, self.interval)
+        starts.update(period_start(moment, self.interval) for moment in set(moments) if moment is not None)
+        return starts
+
+    def missing(self, moments: Iterable[datetime | None] = ()) -> List[datetime]:
+        # Period starts this process does not know a partition for; answered without a query
+        with self._lock:
+            ranges = self._ranges
+        needed = self._needed(moments)
+        if ranges is None:
+            return sorted(needed)
+        return sorted(start for start in needed if not _covers(ranges, start))
+
+    def create_partitions(self, cursor, moments: Iterable[datetime | None] = ()) -> List[str]:
+        # Creates whatever partitions are missing inside the caller's transaction
+        return self._create(cursor, moments)[1]
+
+    def _create(self, cursor, moments: Iterable[datetime | None]) -> Tuple[List[Tuple], List[str]]:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_PARTITION_LOCK,))
+        cursor.execute(_PARTITIONS_QUERY)
+        ranges = [(row['lower_bound'], row['upper_bound']) for row in cursor.fetchall()]
+        created = []
+        for start in sorted(self._needed(moments)):
+            if not _covers(ranges, start):
+                end = next_period(start, self.interval)
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF user_answer "
+                               f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+                ranges.append((start, end))
+                created.append(partition_name(start))
+        return ranges, created
+
+    def ensure(self, moments: Iterable[datetime | None] = ()) -> List[str]:
+        moments = list(moments)
+        if not self.missing(moments):
+            return []
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            ranges, created = self._create(cursor, moments)
+        with self._lock:
+            self._ranges = ranges
+        return created
+
+    def drop_before(self, cutoff: datetime) -> List[str]:
+        # Retention: partitions that end at or before cutoff are dropped whole instead of deleting their rows.
+        # Idempotency keys of the dropped answers go too, since there is nothing left for them to protect.
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_PARTITION_LOCK,))
+            cursor.execute(_PARTITIONS_QUERY)
+            expired = [row for row in cursor.fetchall()
+                       if row['upper_bound'] is not None and row['upper_bound'] <= as_utc(cutoff)]
+            for row in expired:
+                cursor.execute(f"DROP TABLE {row['name']}")
+            if expired:
+                cursor.execute("DELETE FROM user_answer_key WHERE answered_at < %s",
+                               (max(row['upper_bound'] for row in expired),))
+        if expired:
+            _notify_schema_change()
+        return [row['name'] for row in expired]
+
+    def reset(self):
+        with self._lock:
+            self._ranges = None
+
+
+answer_partitions = AnswerPartitions()
+on_schema_change(answer_partitions.reset)
+
+
+def apply_retention(days: int = DB_ANSWER_RETENTION_DAYS) -> List[str]:
+    # Keeps at least `days` days of answers; 0 keeps everything
+    if days <= 0:
+        return []
+    return answer_partitions.drop_before(datetime.now(timezone.utc) - timedelta(days=days))
+
+
+if __name__ == '__main__':
+    print(f"Created partitions: {answer_partitions.ensure() or 'none'}")
+    print(f"Dropped partitions: {apply_retention() or 'none'}")
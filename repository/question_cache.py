@@ -0,0 +1,30 @@
+from config.cache_config import QUESTION_CACHE_SIZE, QUESTION_CACHE_TTL
+from repository.cache import TTLCache, CacheStats
+from repository.database import on_schema_change
+
+ALL_QUESTIONS_KEY = ('questions',)
+
+# Writes invalidate entries once they have committed. Writes made on a caller's cursor leave that to the caller,
+# after its own commit. The cache lives in each process, so other worker processes only see a write once their
+# copy of an entry expires, up to QUESTION_CACHE_TTL seconds later.
+question_cache = TTLCache(max_size=QUESTION_CACHE_SIZE, ttl=QUESTION_CACHE_TTL)
+on_schema_change(question_cache.clear)
+
+
+def question_key(question_id: int) -> tuple:
+    return 'question', question_id
+
+def answers_key(question_id: int) -> tuple:
+    return 'answers', question_id
+
+def invalidate_question(question_id: int = None):
+    if question_id is None:
+        question_cache.invalidate(ALL_QUESTIONS_KEY)
+    else:
+        question_cache.invalidate(ALL_QUESTIONS_KEY, question_key(question_id), answers_key(question_id))
+
+def invalidate_answers(*question_ids: int):
+    question_cache.invalidate(*(answers_key(question_id) for question_id in question_ids))
+
+def get_question_cache_stats() -> CacheStats:
+    return question_cache.stats()
@@ -1,8 +1,17 @@
-from typing import List
+from typing import Iterable, Iterator, List, Set, Tuple
+from model.Answer import Answer
 from model.Question import Question
-from repository.database import get_db_connection
+from config.sql_config import DB_ITERSIZE
+from repository.answer_repository import create_answers
+from repository.database import get_db_connection, reserve_ids, copy_rows
+from repository.question_cache import question_cache, question_key, invalidate_question, invalidate_answers, \
+    ALL_QUESTIONS_KEY
+from repository.storage import backend_function
+from metrics.instrument import timed
 
 
+@timed
+@backend_function
 def create_question(question: Question) -> int:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute(
@@ -15,16 +24,106 @@ def create_question(question: Question) -> int:
 
         new_id = result.get('id')
         connection.commit()
+        invalidate_question()
         return new_id
 
+@timed
+@backend_function
+def create_questions(questions: List[Question], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            new_ids = create_questions(questions, cursor)
+        invalidate_question()
+        return new_ids
+    new_ids = reserve_ids(cursor, 'question', len(questions))
+    copy_rows(cursor, 'question', ('id', 'question_text', 'correct_answer'), (
+        (new_id, question.question_text, question.correct_answer)
+        for new_id, question in zip(new_ids, questions)
+    ))
+    return new_ids
+
+@timed
+@backend_function
+def create_questions_with_answers(pairs: List[Tuple[Question, List[Answer]]], cursor=None) -> List[int]:
+    # Questions and their incorrect answers go in together, in one transaction when no cursor is given
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            question_ids = create_questions_with_answers(pairs, cursor)
+        invalidate_question()
+        invalidate_answers(*question_ids)
+        return question_ids
+    question_ids = create_questions([question for question, _ in pairs], cursor)
+    create_answers([
+        Answer(question_id=question_id, incorrect_answer=answer.incorrect_answer)
+        for question_id, (_, incorrect_answers) in zip(question_ids, pairs)
+        for answer in incorrect_answers
+    ], cursor)
+    return question_ids
+
+@timed
+@backend_function
 def get_all_questions() -> List[Question]:
+    return list(question_cache.get_or_load(ALL_QUESTIONS_KEY, _load_all_questions))
+
+def _load_all_questions() -> List[Question]:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("""SELECT * FROM question""")
         res = cursor.fetchall()
         questions = [Question(**f) for f in res]
         return questions
 
+@timed
+@backend_function
+def get_questions_page(limit: int, after_id: int = None) -> List[Question]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT * FROM question WHERE id > %s ORDER BY id LIMIT %s",
+            (after_id if after_id is not None else 0, limit)
+        )
+        res = cursor.fetchall()
+        return [Question(**f) for f in res]
+
+@timed
+@backend_function
+def iter_questions(itersize: int = DB_ITERSIZE) -> Iterator[Question]:
+    with get_db_connection() as connection, connection.cursor(name='iter_questions') as cursor:
+        cursor.itersize = itersize
+        cursor.execute("SELECT * FROM question ORDER BY id")
+        for row in cursor:
+            yield Question(**row)
+
+@timed
+@backend_function
+def get_questions_with_answers(question_ids: List[int] = None) -> List[Tuple[Question, List[Answer]]]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT q.id, q.question_text, q.correct_answer,
+                   COALESCE(array_agg(a.incorrect_answer ORDER BY a.id) FILTER (WHERE a.id IS NOT NULL), '{}')
+                       AS incorrect_answers,
+                   COALESCE(array_agg(a.id ORDER BY a.id) FILTER (WHERE a.id IS NOT NULL), '{}') AS answer_ids
+            FROM question q
+            LEFT JOIN answer a ON a.question_id = q.id
+            WHERE %s::int[] IS NULL OR q.id = ANY(%s::int[])
+            GROUP BY q.id
+            ORDER BY q.id
+        """, (question_ids, question_ids))
+        return [
+            (
+                Question(question_text=row['question_text'], correct_answer=row['correct_answer'], id=row['id']),
+                [
+                    Answer(question_id=row['id'], incorrect_answer=incorrect_answer, id=answer_id)
+                    for answer_id, incorrect_answer in zip(row['answer_ids'], row['incorrect_answers'])
+                ]
+            )
+            for row in cursor.fetchall()
+        ]
+
+@timed
+@backend_function
 def find_question_by_id(question_id: int) -> Question | None:
+    return question_cache.get_or_load(question_key(question_id), lambda: _load_question(question_id))
+
+def _load_question(question_id: int) -> Question | None:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("SELECT * FROM question WHERE id = %s", (question_id,))
         result = cursor.fetchone()
@@ -32,6 +131,15 @@ def find_question_by_id(question_id: int) -> Question | None:
             return None
         return Question(**result)
 
+@timed
+@backend_function
+def find_existing_question_ids(question_ids: Iterable[int]) -> Set[int]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM question WHERE id = ANY(%s)", (list(set(question_ids)),))
+        return {row['id'] for row in cursor.fetchall()}
+
+@timed
+@backend_function
 def update_question(question_id: int, updated_question: Question) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("""
@@ -41,10 +149,14 @@ def update_question(question_id: int, updated_question: Question) -> bool:
         """, (updated_question.question_text, updated_question.correct_answer, question_id))
 
         connection.commit()
+        invalidate_question(question_id)
         return cursor.rowcount > 0
 
+@timed
+@backend_function
 def delete_question(question_id: int) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("DELETE FROM question WHERE id = %s", (question_id,))
         connection.commit()
+        invalidate_question(question_id)
         return cursor.rowcount > 0
@@ -0,0 +1,91 @@
+import json
+from typing import Dict, List
+
+from model.Answer import Answer
+from repository.question_cache import question_cache, answers_key, invalidate_answers
+from repository.sqlite_database import get_db_connection
+
+
+def create_answer(answer: Answer) -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("INSERT INTO answer (question_id, incorrect_answer) VALUES (?, ?)",
+                       (answer.question_id, answer.incorrect_answer))
+        new_id = cursor.lastrowid
+    invalidate_answers(answer.question_id)
+    return new_id
+
+def create_answers(answers: List[Answer], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            new_ids = create_answers(answers, cursor)
+        invalidate_answers(*{answer.question_id for answer in answers})
+        return new_ids
+    new_ids = []
+    for answer in answers:
+        cursor.execute("INSERT INTO answer (question_id, incorrect_answer) VALUES (?, ?)",
+                       (answer.question_id, answer.incorrect_answer))
+        new_ids.append(cursor.lastrowid)
+    return new_ids
+
+def get_all_answers(question_id: int = None) -> List[Answer]:
+    if question_id is not None:
+        return get_answers_by_question_id(question_id)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM answer")
+        return [Answer(**row) for row in cursor.fetchall()]
+
+def get_answers_by_question_id(question_id: int) -> List[Answer]:
+    return list(question_cache.get_or_load(answers_key(question_id), lambda: _load_answers(question_id)))
+
+def _load_answers(question_id: int) -> List[Answer]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM answer WHERE question_id = ? ORDER BY id", (question_id,))
+        return [Answer(**row) for row in cursor.fetchall()]
+
+def get_answers_by_question_ids(question_ids: List[int]) -> Dict[int, List[Answer]]:
+    answers_by_question = {}
+    missing = []
+    for question_id in question_ids:
+        cached = question_cache.get(answers_key(question_id))
+        if cached is None:
+            missing.append(question_id)
+        answers_by_question[question_id] = list(cached or [])
+    if not missing:
+        return answers_by_question
+    version = question_cache.version
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT * FROM answer WHERE question_id IN (SELECT value FROM json_each(?)) ORDER BY question_id, id",
+            (json.dumps(missing),)
+        )
+        for row in cursor.fetchall():
+            answers_by_question[row['question_id']].append(Answer(**row))
+    for question_id in missing:
+        question_cache.put(answers_key(question_id), list(answers_by_question[question_id]), version)
+    return answers_by_question
+
+def find_answer_by_id(answer_id: int) -> Answer:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM answer WHERE id = ?", (answer_id,))
+        result = cursor.fetchone()
+        return Answer(**result) if result else None
+
+def update_answer(answer_id: int, updated_answer: Answer) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT question_id FROM answer WHERE id = ?", (answer_id,))
+        previous = cursor.fetchone()
+        if previous is None:
+            return False
+        cursor.execute("UPDATE answer SET question_id = ?, incorrect_answer = ? WHERE id = ?",
+                       (updated_answer.question_id, updated_answer.incorrect_answer, answer_id))
+    invalidate_answers(previous['question_id'], updated_answer.question_id)
+    return True
+
+def delete_answer(answer_id: int) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM answer WHERE id = ? RETURNING question_id", (answer_id,))
+        result = cursor.fetchone()
+    if result is None:
+        return False
+    invalidate_answers(result['question_id'])
+    return True
@@ -0,0 +1,204 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Sequence, Tuple
+
+from config.sql_config import DB_ITERSIZE, SQLITE_PATH
+from repository.database import _notify_schema_change
+from repository.partitions import answered_between as _answered_between, as_utc
+
+# The embedded schema mirrors the Postgres migrations. time_taken is stored as REAL seconds and timestamps as
+# UTC text in one fixed-width format, so comparing the text orders them by time.
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS trivia_user (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first VARCHAR(100) NOT NULL,
+        last VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS question (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question_text TEXT NOT NULL,
+        correct_answer VARCHAR(255) NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS answer (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question_id INTEGER NOT NULL REFERENCES question(id) ON DELETE CASCADE,
+        incorrect_answer VARCHAR(255) NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS user_answer (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL REFERENCES trivia_user(id) ON DELETE CASCADE,
+        question_id INTEGER NOT NULL REFERENCES question(id) ON DELETE CASCADE,
+        answer_text VARCHAR(255) NOT NULL,
+        is_correct BOOLEAN NOT NULL,
+        time_taken REAL NOT NULL,
+        answered_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS user_answer_key (
+        idempotency_key VARCHAR(64) PRIMARY KEY,
+        answered_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS timing_stats (
+        bucket VARCHAR(64) PRIMARY KEY,
+        stats TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS game_session (
+        id VARCHAR(32) PRIMARY KEY,
+        state TEXT NOT NULL,
+        expires_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_answer_question_id ON answer (question_id);
+    CREATE INDEX IF NOT EXISTS idx_user_answer_user_id ON user_answer (user_id);
+    CREATE INDEX IF NOT EXISTS idx_user_answer_question_id ON user_answer (question_id);
+    CREATE INDEX IF NOT EXISTS idx_user_answer_answered_at ON user_answer (answered_at);
+    CREATE INDEX IF NOT EXISTS idx_user_answer_key_answered_at ON user_answer_key (answered_at);
+    CREATE INDEX IF NOT EXISTS idx_game_session_expires_at ON game_session (expires_at);
+'''
+
+_connection: sqlite3.Connection | None = None
+# One connection serves the whole process; holding the lock for a transaction stands in for a pool checkout
+_lock = threading.RLock()
+
+
+def _dict_row(cursor, row) -> dict:
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    with _lock:
+        if _connection is None:
+            _connection = sqlite3.connect(SQLITE_PATH, check_same_thread=False)
+            _connection.row_factory = _dict_row
+            _connection.execute("PRAGMA foreign_keys = ON")
+            if SQLITE_PATH != ':memory:':
+                _connection.execute("PRAGMA journal_mode = WAL")
+                _connection.execute("PRAGMA synchronous = NORMAL")
+        return _connection
+
+def close_sqlite():
+    # An in-memory database goes with its connection
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+
+class SqliteCursor(sqlite3.Cursor):
+    def __enter__(self) -> 'SqliteCursor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SqliteConnection:
+    # Used like a pooled connection: `with get_db_connection() as connection, connection.cursor() as cursor`
+    # commits on success and rolls back on error
+    def __init__(self):
+        self._connection = None
+
+    def __enter__(self) -> 'SqliteConnection':
+        _lock.acquire()
+        try:
+            self._connection = _connect()
+        except Exception:
+            _lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._connection.commit()
+            else:
+                self._connection.rollback()
+        finally:
+            _lock.release()
+
+    def cursor(self) -> SqliteCursor:
+        return self._connection.cursor(SqliteCursor)
+
+    def executescript(self, script: str):
+        self._connection.executescript(script)
+
+    def commit(self):
+        self._connection.commit()
+
+def get_db_connection() -> SqliteConnection:
+    return SqliteConnection()
+
+def integrity_errors() -> Tuple[type, ...]:
+    return sqlite3.IntegrityError,
+
+def refused_errors() -> Tuple[type, ...]:
+    return sqlite3.IntegrityError, sqlite3.DataError
+
+def transient_errors() -> Tuple[type, ...]:
+    # Raised for a locked database file among other things; it is the closest sqlite3 has to a transient error
+    return sqlite3.OperationalError,
+
+
+def iter_pages(table: str, columns: str = '*', condition: str = 'TRUE', params: Sequence = (),
+               itersize: int = DB_ITERSIZE) -> Iterator[List[dict]]:
+    # Rows in id order, itersize at a time. Each page is read in its own transaction and the lock is released
+    # before it is handed out, so a slow consumer never holds up other threads. columns must include id.
+    after_id = 0
+    while True:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT {columns} FROM {table} WHERE id > ? AND {condition} ORDER BY id LIMIT ?",
+                           (after_id, *params, itersize))
+            rows = cursor.fetchall()
+        if rows:
+            yield rows
+        if len(rows) < itersize:
+            return
+        after_id = rows[-1]['id']
+
+
+def to_timestamp(moment: datetime) -> str:
+    return as_utc(moment).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def from_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+def to_seconds(time_taken) -> float:
+    return time_taken.total_seconds() if isinstance(time_taken, timedelta) else float(time_taken)
+
+def answered_between(since: datetime = None, until: datetime = None, column: str = 'answered_at') \
+        -> Tuple[str, List[str]]:
+    condition, params = _answered_between(since, until, column)
+    return condition.replace('%s', '?'), [to_timestamp(moment) for moment in params]
+
+
+def create_tables():
+    with get_db_connection() as connection:
+        connection.executescript(_SCHEMA)
+    _notify_schema_change()
+
+
+def is_tables_exists() -> bool:
+    table_names = ['trivia_user', 'question', 'answer', 'user_answer']
+
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existing = {row['name'] for row in cursor.fetchall()}
+    existing_tables = [name for name in table_names if name in existing]
+    print("The following tables exist:", ", ".join(existing_tables))
+    if set(existing_tables) == set(table_names):
+        print("All tables have been created successfully.")
+        return True
+    else:
+        print("Missing tables:", ", ".join(set(table_names) - set(existing_tables)))
+        return False
+
+
+def drop_all_tables():
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        # Children first, so no foreign key is left pointing at a dropped table
+        for table in ('game_session', 'timing_stats', 'user_answer', 'user_answer_key', 'answer', 'question',
+                      'trivia_user'):
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    _notify_schema_change()
@@ -0,0 +1,55 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Tuple
+
+from repository.sqlite_database import get_db_connection, to_timestamp
+
+
+def _now() -> str:
+    return to_timestamp(datetime.now(timezone.utc))
+
+def _expires_at(ttl: float) -> str:
+    return to_timestamp(datetime.now(timezone.utc) + timedelta(seconds=ttl))
+
+
+def create_game_session(game_id: str, state: Dict, ttl: float):
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("INSERT INTO game_session (id, state, expires_at) VALUES (?, ?, ?)",
+                       (game_id, json.dumps(state), _expires_at(ttl)))
+
+def get_game_session(game_id: str, ttl: float) -> Dict | None:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("UPDATE game_session SET expires_at = ? WHERE id = ? AND expires_at > ? RETURNING state",
+                       (_expires_at(ttl), game_id, _now()))
+        row = cursor.fetchone()
+        return json.loads(row['state']) if row else None
+
+@contextmanager
+def locked_game_session(game_id: str, ttl: float) -> Iterator[Tuple[object, Dict | None]]:
+    # BEGIN IMMEDIATE takes the write lock before the read, so processes sharing a database file take turns
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT state FROM game_session WHERE id = ? AND expires_at > ?", (game_id, _now()))
+        row = cursor.fetchone()
+        state = json.loads(row['state']) if row else None
+        yield cursor, state
+        if state is not None:
+            cursor.execute("UPDATE game_session SET state = ?, expires_at = ? WHERE id = ?",
+                           (json.dumps(state), _expires_at(ttl), game_id))
+
+def delete_game_session(game_id: str) -> Dict | None:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM game_session WHERE id = ? AND expires_at > ? RETURNING state", (game_id, _now()))
+        row = cursor.fetchone()
+        return json.loads(row['state']) if row else None
+
+def delete_expired_game_sessions() -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM game_session WHERE expires_at <= ?", (_now(),))
+        return cursor.rowcount
+
+def count_game_sessions() -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) AS count FROM game_session WHERE expires_at > ?", (_now(),))
+        return cursor.fetchone()['count']
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import List, Tuple
+
+from repository.leaderboard import LeaderboardEntry
+from repository.sqlite_database import get_db_connection, answered_between
+
+_TOTALS = """
+    SELECT user_id,
+           SUM(is_correct) AS correct,
+           COUNT(*) AS answered,
+           MIN(time_taken) AS fastest
+    FROM user_answer
+"""
+
+
+def load_user_totals(user_ids: List[int] = None) -> Tuple[List[Tuple[int, int, int, float]], int]:
+    # One connection and its lock make the two reads consistent without a snapshot isolation level
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM user_answer")
+        max_id = cursor.fetchone()['max_id']
+        users = '' if user_ids is None else f"WHERE user_id IN ({', '.join('?' * len(user_ids))})"
+        cursor.execute(f"{_TOTALS} {users} GROUP BY user_id", user_ids or ())
+        totals = [(row['user_id'], row['correct'], row['answered'], row['fastest']) for row in cursor.fetchall()]
+        return totals, max_id
+
+def top_between(count: int, since: datetime = None, until: datetime = None) -> List[LeaderboardEntry]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"{_TOTALS} WHERE {window} GROUP BY user_id ORDER BY correct DESC, fastest, user_id LIMIT ?",
+                       (*params, count))
+        return [LeaderboardEntry(row['user_id'], row['correct'], row['answered'], row['fastest'])
+                for row in cursor.fetchall()]
@@ -0,0 +1,119 @@
+import json
+from typing import Iterable, Iterator, List, Set, Tuple
+
+from model.Answer import Answer
+from model.Question import Question
+from config.sql_config import DB_ITERSIZE
+from repository.question_cache import question_cache, question_key, invalidate_question, invalidate_answers, \
+    ALL_QUESTIONS_KEY
+from repository.sqlite_answer_repository import create_answers
+from repository.sqlite_database import get_db_connection, iter_pages
+
+
+def create_question(question: Question) -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("INSERT INTO question (question_text, correct_answer) VALUES (?, ?)",
+                       (question.question_text, question.correct_answer))
+        new_id = cursor.lastrowid
+    invalidate_question()
+    return new_id
+
+def create_questions(questions: List[Question], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            new_ids = create_questions(questions, cursor)
+        invalidate_question()
+        return new_ids
+    new_ids = []
+    for question in questions:
+        cursor.execute("INSERT INTO question (question_text, correct_answer) VALUES (?, ?)",
+                       (question.question_text, question.correct_answer))
+        new_ids.append(cursor.lastrowid)
+    return new_ids
+
+def create_questions_with_answers(pairs: List[Tuple[Question, List[Answer]]], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            question_ids = create_questions_with_answers(pairs, cursor)
+        invalidate_question()
+        invalidate_answers(*question_ids)
+        return question_ids
+    question_ids = create_questions([question for question, _ in pairs], cursor)
+    create_answers([
+        Answer(question_id=question_id, incorrect_answer=answer.incorrect_answer)
+        for question_id, (_, incorrect_answers) in zip(question_ids, pairs)
+        for answer in incorrect_answers
+    ], cursor)
+    return question_ids
+
+def get_all_questions() -> List[Question]:
+    return list(question_cache.get_or_load(ALL_QUESTIONS_KEY, _load_all_questions))
+
+def _load_all_questions() -> List[Question]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM question")
+        return [Question(**row) for row in cursor.fetchall()]
+
+def get_questions_page(limit: int, after_id: int = None) -> List[Question]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT * FROM question WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id if after_id is not None else 0, limit)
+        )
+        return [Question(**row) for row in cursor.fetchall()]
+
+def iter_questions(itersize: int = DB_ITERSIZE) -> Iterator[Question]:
+    for rows in iter_pages('question', itersize=itersize):
+        yield from (Question(**row) for row in rows)
+
+def get_questions_with_answers(question_ids: List[int] = None) -> List[Tuple[Question, List[Answer]]]:
+    # Answers come back as one JSON array per question, in id order, like the array_agg on Postgres
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT q.id, q.question_text, q.correct_answer,
+                   (SELECT json_group_array(json_array(a.id, a.incorrect_answer))
+                    FROM (SELECT id, incorrect_answer FROM answer WHERE question_id = q.id ORDER BY id) a) AS answers
+            FROM question q
+            WHERE ? IS NULL OR q.id IN (SELECT value FROM json_each(?))
+            ORDER BY q.id
+        """, (None if question_ids is None else json.dumps(question_ids),) * 2)
+        return [
+            (
+                Question(question_text=row['question_text'], correct_answer=row['correct_answer'], id=row['id']),
+                [
+                    Answer(question_id=row['id'], incorrect_answer=incorrect_answer, id=answer_id)
+                    for answer_id, incorrect_answer in json.loads(row['answers'])
+                ]
+            )
+            for row in cursor.fetchall()
+        ]
+
+def find_question_by_id(question_id: int) -> Question | None:
+    return question_cache.get_or_load(question_key(question_id), lambda: _load_question(question_id))
+
+def _load_question(question_id: int) -> Question | None:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM question WHERE id = ?", (question_id,))
+        result = cursor.fetchone()
+        return Question(**result) if result else None
+
+def find_existing_question_ids(question_ids: Iterable[int]) -> Set[int]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM question WHERE id IN (SELECT value FROM json_each(?))",
+                       (json.dumps(list(set(question_ids))),))
+        return {row['id'] for row in cursor.fetchall()}
+
+def update_question(question_id: int, updated_question: Question) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("UPDATE question SET question_text = ?, correct_answer = ? WHERE id = ?",
+                       (updated_question.question_text, updated_question.correct_answer, question_id))
+        updated = cursor.rowcount > 0
+    invalidate_question(question_id)
+    return updated
+
+def delete_question(question_id: int) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM question WHERE id = ?", (question_id,))
+        deleted = cursor.rowcount > 0
+    invalidate_question(question_id)
+    return deleted
@@ -0,0 +1,34 @@
+import json
+from typing import Callable, Dict, List
+
+from repository.sqlite_database import get_db_connection
+
+
+def get_timing_stats(buckets: List[str] = None) -> Dict[str, Dict]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT bucket, stats FROM timing_stats WHERE ? IS NULL OR bucket IN (SELECT value FROM json_each(?))",
+            (None if buckets is None else json.dumps(buckets),) * 2
+        )
+        return {row['bucket']: json.loads(row['stats']) for row in cursor.fetchall()}
+
+def update_timing_stats(buckets: List[str], updater: Callable[[Dict[str, Dict]], Dict[str, Dict]]):
+    # BEGIN IMMEDIATE takes the write lock before the read, so processes sharing a database file never lose
+    # each other's merges
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT bucket, stats FROM timing_stats WHERE bucket IN (SELECT value FROM json_each(?))",
+                       (json.dumps(buckets),))
+        updated = updater({row['bucket']: json.loads(row['stats']) for row in cursor.fetchall()})
+        for bucket, stats in updated.items():
+            cursor.execute("""
+                INSERT INTO timing_stats (bucket, stats, updated_at) VALUES (?, ?, datetime('now'))
+                ON CONFLICT (bucket) DO UPDATE SET stats = excluded.stats, updated_at = excluded.updated_at
+            """, (bucket, json.dumps(stats)))
+
+def replace_timing_stats(stats: Dict[str, Dict]):
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM timing_stats")
+        for bucket, bucket_stats in stats.items():
+            cursor.execute("INSERT INTO timing_stats (bucket, stats, updated_at) VALUES (?, ?, datetime('now'))",
+                           (bucket, json.dumps(bucket_stats)))
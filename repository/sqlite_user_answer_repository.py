@@ -0,0 +1,153 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+from typing import IO, Dict, Iterator, List
+
+from config.sql_config import DB_ITERSIZE
+from model.UserAnswer import UserAnswer
+from model.UserAnswerBatch import UserAnswerBatch
+from repository.leaderboard import refresh_users
+from repository.sqlite_database import get_db_connection, iter_pages, answered_between, to_timestamp, \
+    from_timestamp, to_seconds
+from repository.user_answer_repository import user_answers_written
+
+_INSERT = ("INSERT INTO user_answer (user_id, question_id, answer_text, is_correct, time_taken, answered_at) "
+           "VALUES (?, ?, ?, ?, ?, ?)")
+
+
+def _answered_at(user_answers: List[UserAnswer]) -> List[str]:
+    now = datetime.now(timezone.utc)
+    return [to_timestamp(user_answer.answered_at or now) for user_answer in user_answers]
+
+def _values(user_answer: UserAnswer, answered_at: str) -> tuple:
+    return (user_answer.user_id, user_answer.question_id, user_answer.answer_text, user_answer.is_correct,
+            to_seconds(user_answer.time_taken), answered_at)
+
+def _user_answer(row: Dict) -> UserAnswer:
+    return UserAnswer(
+        user_id=row['user_id'],
+        question_id=row['question_id'],
+        answer_text=row['answer_text'],
+        is_correct=bool(row['is_correct']),
+        time_taken=timedelta(seconds=row['time_taken']),
+        id=row['id'],
+        answered_at=from_timestamp(row['answered_at'])
+    )
+
+
+def create_user_answer(user_answer: UserAnswer) -> int:
+    answered_at, = _answered_at([user_answer])
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        if user_answer.idempotency_key is not None:
+            cursor.execute("INSERT INTO user_answer_key (idempotency_key, answered_at) VALUES (?, ?)",
+                           (user_answer.idempotency_key, answered_at))
+        cursor.execute(_INSERT, _values(user_answer, answered_at))
+        new_id = cursor.lastrowid
+    user_answers_written([new_id], [user_answer])
+    return new_id
+
+def create_user_answers(user_answers: List[UserAnswer], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            new_ids = create_user_answers(user_answers, cursor)
+        user_answers_written(new_ids, user_answers)
+        return new_ids
+    new_ids = []
+    for user_answer, answered_at in zip(user_answers, _answered_at(user_answers)):
+        if user_answer.idempotency_key is not None:
+            cursor.execute("INSERT INTO user_answer_key (idempotency_key, answered_at) VALUES (?, ?)",
+                           (user_answer.idempotency_key, answered_at))
+        cursor.execute(_INSERT, _values(user_answer, answered_at))
+        new_ids.append(cursor.lastrowid)
+    return new_ids
+
+def insert_user_answers(user_answers: List[UserAnswer]) -> List[int | None]:
+    # Same contract as on Postgres: an answer is written only if its key can be claimed in user_answer_key,
+    # and answers whose key is already stored, or repeated in the batch, come back as None
+    new_ids = []
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        for user_answer, answered_at in zip(user_answers, _answered_at(user_answers)):
+            if user_answer.idempotency_key is not None:
+                cursor.execute("INSERT INTO user_answer_key (idempotency_key, answered_at) VALUES (?, ?) "
+                               "ON CONFLICT (idempotency_key) DO NOTHING", (user_answer.idempotency_key, answered_at))
+                if cursor.rowcount == 0:
+                    new_ids.append(None)
+                    continue
+            cursor.execute(_INSERT, _values(user_answer, answered_at))
+            new_ids.append(cursor.lastrowid)
+    user_answers_written(new_ids, user_answers)
+    return new_ids
+
+def get_all_user_answers(since: datetime = None, until: datetime = None) -> List[UserAnswer]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(f"SELECT * FROM user_answer WHERE {window}", params)
+        return [_user_answer(row) for row in cursor.fetchall()]
+
+def get_user_answers_page(limit: int, after_id: int = None, since: datetime = None,
+                          until: datetime = None) -> List[UserAnswer]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT * FROM user_answer WHERE id > ? AND {window} ORDER BY id LIMIT ?",
+            (after_id if after_id is not None else 0, *params, limit)
+        )
+        return [_user_answer(row) for row in cursor.fetchall()]
+
+def iter_user_answers(itersize: int = DB_ITERSIZE, since: datetime = None,
+                      until: datetime = None) -> Iterator[UserAnswer]:
+    window, params = answered_between(since, until)
+    for rows in iter_pages('user_answer', '*', window, params, itersize):
+        yield from (_user_answer(row) for row in rows)
+
+def get_user_answer_batch(itersize: int = DB_ITERSIZE, since: datetime = None,
+                          until: datetime = None) -> UserAnswerBatch:
+    batch = UserAnswerBatch()
+    window, params = answered_between(since, until)
+    for rows in iter_pages('user_answer', 'id, user_id, question_id, answer_text, is_correct, time_taken', window,
+                           params, itersize):
+        for row in rows:
+            batch.append_values(row['user_id'], row['question_id'], row['answer_text'], bool(row['is_correct']),
+                                row['time_taken'], row['id'])
+    return batch
+
+def copy_user_answer_columns(output: IO[bytes], since: datetime = None, until: datetime = None):
+    # The same CSV as the COPY on Postgres: (user_id, question_id, is_correct as 0/1, seconds) in id order
+    window, params = answered_between(since, until)
+    for rows in iter_pages('user_answer', 'id, user_id, question_id, is_correct, time_taken', window, params):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            (row['user_id'], row['question_id'], int(row['is_correct']), repr(float(row['time_taken'])))
+            for row in rows
+        )
+        output.write(buffer.getvalue().encode())
+
+def find_user_answer_by_id(user_answer_id: int) -> UserAnswer | None:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM user_answer WHERE id = ?", (user_answer_id,))
+        result = cursor.fetchone()
+        return _user_answer(result) if result else None
+
+def update_user_answer(user_answer_id: int, updated_user_answer: UserAnswer) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT user_id FROM user_answer WHERE id = ?", (user_answer_id,))
+        previous = cursor.fetchone()
+        if previous is None:
+            return False
+        cursor.execute("""
+            UPDATE user_answer
+            SET user_id = ?, question_id = ?, answer_text = ?, is_correct = ?, time_taken = ?
+            WHERE id = ?
+        """, (updated_user_answer.user_id, updated_user_answer.question_id, updated_user_answer.answer_text,
+              updated_user_answer.is_correct, to_seconds(updated_user_answer.time_taken), user_answer_id))
+    refresh_users(previous['user_id'], updated_user_answer.user_id)
+    return True
+
+def delete_user_answer(user_answer_id: int) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM user_answer WHERE id = ? RETURNING user_id", (user_answer_id,))
+        result = cursor.fetchone()
+    if result is None:
+        return False
+    refresh_users(result['user_id'])
+    return True
@@ -0,0 +1,68 @@
+import json
+from typing import Iterable, Iterator, List, Set
+
+from model.User import User
+from config.sql_config import DB_ITERSIZE
+from repository.sqlite_database import get_db_connection, iter_pages
+
+
+def create_user(user: User) -> int:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO trivia_user (first, last, email) VALUES (?, ?, ?)",
+            (user.first, user.last, user.email)
+        )
+        return cursor.lastrowid
+
+def create_users(users: List[User], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            return create_users(users, cursor)
+    new_ids = []
+    for user in users:
+        cursor.execute("INSERT INTO trivia_user (first, last, email) VALUES (?, ?, ?)",
+                       (user.first, user.last, user.email))
+        new_ids.append(cursor.lastrowid)
+    return new_ids
+
+def get_all_users() -> List[User]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM trivia_user")
+        return [User(**row) for row in cursor.fetchall()]
+
+def get_users_page(limit: int, after_id: int = None) -> List[User]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT * FROM trivia_user WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id if after_id is not None else 0, limit)
+        )
+        return [User(**row) for row in cursor.fetchall()]
+
+def iter_users(itersize: int = DB_ITERSIZE) -> Iterator[User]:
+    for rows in iter_pages('trivia_user', itersize=itersize):
+        yield from (User(**row) for row in rows)
+
+def find_user_by_id(user_id: int) -> User | None:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM trivia_user WHERE id = ?", (user_id,))
+        result = cursor.fetchone()
+        return User(**result) if result else None
+
+def find_existing_user_ids(user_ids: Iterable[int]) -> Set[int]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM trivia_user WHERE id IN (SELECT value FROM json_each(?))",
+                       (json.dumps(list(set(user_ids))),))
+        return {row['id'] for row in cursor.fetchall()}
+
+def update_user(user_id: int, updated_user: User) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE trivia_user SET first = ?, last = ?, email = ? WHERE id = ?",
+            (updated_user.first, updated_user.last, updated_user.email, user_id)
+        )
+        return cursor.rowcount > 0
+
+def delete_user(user_id: int) -> bool:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM trivia_user WHERE id = ?", (user_id,))
+        return cursor.rowcount > 0
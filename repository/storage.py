@@ -0,0 +1,41 @@
+import functools
+import importlib
+from typing import Callable
+
+from config.sql_config import DB_BACKEND
+
+STORAGE_BACKENDS = ('postgres', 'sqlite')
+
+_backend = DB_BACKEND
+
+
+def get_backend() -> str:
+    return _backend
+
+def use_backend(name: str):
+    global _backend
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Storage backend must be one of: {', '.join(STORAGE_BACKENDS)}")
+    _backend = name
+    # Caches filled from one backend must not answer for the other
+    from repository.database import _notify_schema_change
+    _notify_schema_change()
+
+def is_postgres() -> bool:
+    return _backend == 'postgres'
+
+
+def backend_function(function: Callable) -> Callable:
+    # The decorated function is the Postgres implementation. With another backend selected, calls go to the
+    # function of the same name in that backend's module: repository.user_repository.create_user becomes
+    # repository.sqlite_user_repository.create_user.
+    package, module = function.__module__.rsplit('.', 1)
+
+    @functools.wraps(function)
+    def dispatch(*args, **kwargs):
+        if _backend == 'postgres':
+            return function(*args, **kwargs)
+        implementation = importlib.import_module(f"{package}.{_backend}_{module}")
+        return getattr(implementation, function.__name__)(*args, **kwargs)
+
+    return dispatch
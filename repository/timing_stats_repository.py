@@ -0,0 +1,52 @@
+from typing import Callable, Dict, List
+
+from psycopg2.extras import Json
+
+from repository.database import get_db_connection
+from repository.storage import backend_function
+from metrics.instrument import timed
+
+
+@timed
+@backend_function
+def get_timing_stats(buckets: List[str] = None) -> Dict[str, Dict]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT bucket, stats FROM timing_stats WHERE %s::varchar[] IS NULL OR bucket = ANY(%s::varchar[])",
+            (buckets, buckets)
+        )
+        return {row['bucket']: row['stats'] for row in cursor.fetchall()}
+
+@timed
+@backend_function
+def update_timing_stats(buckets: List[str], updater: Callable[[Dict[str, Dict]], Dict[str, Dict]]):
+    # Read-modify-write holding row locks on just these buckets, taken in bucket order so two merges never wait
+    # on each other crosswise. A new bucket gets a JSON null placeholder first, so it has a row to lock; nobody
+    # else sees the placeholder, since the same transaction replaces it.
+    buckets = sorted(buckets)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO timing_stats (bucket, stats)
+            SELECT bucket, 'null'::jsonb FROM unnest(%s::varchar[]) AS bucket ORDER BY bucket
+            ON CONFLICT (bucket) DO NOTHING
+        """, (buckets,))
+        cursor.execute(
+            "SELECT bucket, stats FROM timing_stats WHERE bucket = ANY(%s::varchar[]) ORDER BY bucket FOR UPDATE",
+            (buckets,)
+        )
+        updated = updater({row['bucket']: row['stats'] for row in cursor.fetchall() if row['stats'] is not None})
+        for bucket, stats in updated.items():
+            cursor.execute("""
+                INSERT INTO timing_stats (bucket, stats) VALUES (%s, %s)
+                ON CONFLICT (bucket) DO UPDATE SET stats = EXCLUDED.stats, updated_at = now()
+            """, (bucket, Json(stats)))
+        connection.commit()
+
+@timed
+@backend_function
+def replace_timing_stats(stats: Dict[str, Dict]):
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM timing_stats")
+        for bucket, bucket_stats in stats.items():
+            cursor.execute("INSERT INTO timing_stats (bucket, stats) VALUES (%s, %s)", (bucket, Json(bucket_stats)))
+        connection.commit()
@@ -1,17 +1,55 @@
-from datetime import timedelta
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import IO, Callable, Iterator, List
+from config.sql_config import DB_ITERSIZE
 from model.UserAnswer import UserAnswer
-from repository.database import get_db_connection
+from model.UserAnswerBatch import UserAnswerBatch
+from repository.database import get_db_connection, reserve_ids, copy_rows
+from repository.leaderboard import record_user_answers, refresh_users
+from repository.partitions import answer_partitions, answered_between, as_utc
+from repository.storage import backend_function
+from metrics.instrument import timed
 
+_write_listeners: List[Callable[[List[UserAnswer]], None]] = []
 
+
+def on_user_answers_written(listener: Callable[[List[UserAnswer]], None]):
+    _write_listeners.append(listener)
+
+def user_answers_written(new_ids: List[int | None], user_answers: List[UserAnswer]):
+    # Every backend reports the answers it committed here. Writes made on a caller's cursor are reported by
+    # nobody, since only the caller knows when they commit.
+    written = [(new_id, user_answer) for new_id, user_answer in zip(new_ids, user_answers) if new_id is not None]
+    record_user_answers([new_id for new_id, _ in written], [user_answer for _, user_answer in written])
+    for listener in _write_listeners:
+        listener([user_answer for _, user_answer in written])
+
+
+def _answered_at(user_answers: List[UserAnswer], cursor=None) -> List[datetime]:
+    # Answers without a time are stamped now, and the partitions for every time are created before the insert.
+    # Inside a caller's transaction they are created on its cursor: creating a partition locks user_answer,
+    # which a second connection could not do while that transaction has used the table.
+    now = datetime.now(timezone.utc)
+    answered_at = [as_utc(user_answer.answered_at) if user_answer.answered_at else now for user_answer in user_answers]
+    if cursor is None:
+        answer_partitions.ensure(answered_at)
+    elif answer_partitions.missing(answered_at):
+        answer_partitions.create_partitions(cursor, answered_at)
+    return answered_at
+
+@timed
+@backend_function
 def create_user_answer(user_answer: UserAnswer) -> int:
     time_taken_str = str(user_answer.time_taken)
+    answered_at, = _answered_at([user_answer])
     with get_db_connection() as connection, connection.cursor() as cursor:
+        if user_answer.idempotency_key is not None:
+            cursor.execute("INSERT INTO user_answer_key (idempotency_key, answered_at) VALUES (%s, %s)",
+                           (user_answer.idempotency_key, answered_at))
         cursor.execute(
-            "INSERT INTO user_answer (user_id, question_id, answer_text, is_correct, time_taken) "
-            "VALUES (%s, %s, %s, %s, %s) RETURNING id",
+            "INSERT INTO user_answer (user_id, question_id, answer_text, is_correct, time_taken, answered_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
             (user_answer.user_id, user_answer.question_id, user_answer.answer_text, user_answer.is_correct,
-             time_taken_str)
+             time_taken_str, answered_at)
         )
         result = cursor.fetchone()
         if result is None:
@@ -19,15 +57,153 @@ def create_user_answer(user_answer: UserAnswer) -> int:
 
         new_id = result.get('id')
         connection.commit()
+        user_answers_written([new_id], [user_answer])
         return new_id
 
-def get_all_user_answers() -> List[UserAnswer]:
+@timed
+@backend_function
+def create_user_answers(user_answers: List[UserAnswer], cursor=None) -> List[int]:
+    if cursor is None:
+        answer_partitions.ensure(user_answer.answered_at for user_answer in user_answers)
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            new_ids = create_user_answers(user_answers, cursor)
+        user_answers_written(new_ids, user_answers)
+        return new_ids
+    answered_at = _answered_at(user_answers, cursor)
+    new_ids = reserve_ids(cursor, 'user_answer', len(user_answers))
+    keys = [(user_answer.idempotency_key, moment) for user_answer, moment in zip(user_answers, answered_at)
+            if user_answer.idempotency_key is not None]
+    if keys:
+        copy_rows(cursor, 'user_answer_key', ('idempotency_key', 'answered_at'), keys)
+    copy_rows(cursor, 'user_answer',
+              ('id', 'user_id', 'question_id', 'answer_text', 'is_correct', 'time_taken', 'answered_at'), (
+        (new_id, user_answer.user_id, user_answer.question_id, user_answer.answer_text, user_answer.is_correct,
+         str(user_answer.time_taken), moment.isoformat())
+        for new_id, user_answer, moment in zip(new_ids, user_answers, answered_at)
+    ))
+    return new_ids
+
+@timed
+@backend_function
+def insert_user_answers(user_answers: List[UserAnswer]) -> List[int | None]:
+    # One statement for a batch of keyed answers. A row is written only if its idempotency key can be claimed
+    # in user_answer_key, so a batch can be retried after a failure; rows whose key is already stored, here
+    # or earlier in the same batch, come back as None instead of an id.
+    if not user_answers:
+        return []
+    first = {}
+    for position, user_answer in enumerate(user_answers):
+        # Only the first answer with a given key is sent; unkeyed answers are all kept
+        first.setdefault(user_answer.idempotency_key or position, position)
+    rows = [user_answers[position] for position in first.values()]
+    answered_at = _answered_at(rows)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("""
+            WITH batch AS (
+                SELECT nextval(pg_get_serial_sequence('user_answer', 'id'))::int AS id, b.*
+                FROM unnest(%s::int[], %s::int[], %s::text[], %s::bool[], %s::interval[], %s::text[],
+                            %s::timestamptz[])
+                    WITH ORDINALITY AS b(user_id, question_id, answer_text, is_correct, time_taken, idempotency_key,
+                                         answered_at, position)
+            ), claimed AS (
+                INSERT INTO user_answer_key (idempotency_key, answered_at)
+                SELECT idempotency_key, answered_at FROM batch WHERE idempotency_key IS NOT NULL
+                ON CONFLICT (idempotency_key) DO NOTHING
+                RETURNING idempotency_key
+            ), inserted AS (
+                INSERT INTO user_answer (id, user_id, question_id, answer_text, is_correct, time_taken, answered_at)
+                SELECT id, user_id, question_id, answer_text, is_correct, time_taken, answered_at
+                FROM batch
+                WHERE idempotency_key IS NULL OR idempotency_key IN (SELECT idempotency_key FROM claimed)
+                RETURNING id
+            )
+            SELECT batch.position, inserted.id FROM batch JOIN inserted USING (id)
+        """, (
+            [user_answer.user_id for user_answer in rows],
+            [user_answer.question_id for user_answer in rows],
+            [user_answer.answer_text for user_answer in rows],
+            [user_answer.is_correct for user_answer in rows],
+            [user_answer.time_taken for user_answer in rows],
+            [user_answer.idempotency_key for user_answer in rows],
+            answered_at
+        ))
+        inserted = {row['position'] - 1: row['id'] for row in cursor.fetchall()}
+    new_ids = [None] * len(user_answers)
+    for row_position, position in enumerate(first.values()):
+        new_ids[position] = inserted.get(row_position)
+    user_answers_written(new_ids, user_answers)
+    return new_ids
+
+@timed
+@backend_function
+def get_all_user_answers(since: datetime = None, until: datetime = None) -> List[UserAnswer]:
+    window, params = answered_between(since, until)
     with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute("SELECT * FROM user_answer")
+        cursor.execute(f"SELECT * FROM user_answer WHERE {window}", params)
         res = cursor.fetchall()
         user_answers = [UserAnswer(**f) for f in res]
         return user_answers
 
+@timed
+@backend_function
+def get_user_answers_page(limit: int, after_id: int = None, since: datetime = None,
+                          until: datetime = None) -> List[UserAnswer]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT * FROM user_answer WHERE id > %s AND {window} ORDER BY id LIMIT %s",
+            (after_id if after_id is not None else 0, *params, limit)
+        )
+        return [UserAnswer(**row) for row in cursor.fetchall()]
+
+@timed
+@backend_function
+def iter_user_answers(itersize: int = DB_ITERSIZE, since: datetime = None,
+                      until: datetime = None) -> Iterator[UserAnswer]:
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor(name='iter_user_answers') as cursor:
+        cursor.itersize = itersize
+        cursor.execute(f"SELECT * FROM user_answer WHERE {window} ORDER BY id", params)
+        for row in cursor:
+            yield UserAnswer(**row)
+
+@timed
+@backend_function
+def get_user_answer_batch(itersize: int = DB_ITERSIZE, since: datetime = None,
+                          until: datetime = None) -> UserAnswerBatch:
+    batch = UserAnswerBatch()
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor(name='user_answer_batch') as cursor:
+        cursor.itersize = itersize
+        cursor.execute(f"""
+            SELECT id, user_id, question_id, answer_text, is_correct, EXTRACT(EPOCH FROM time_taken)::float8 AS seconds
+            FROM user_answer
+            WHERE {window}
+            ORDER BY id
+        """, params)
+        for row in cursor:
+            batch.append_values(row['user_id'], row['question_id'], row['answer_text'], row['is_correct'],
+                                row['seconds'], row['id'])
+    return batch
+
+@timed
+@backend_function
+def copy_user_answer_columns(output: IO[bytes], since: datetime = None, until: datetime = None):
+    # CSV of (user_id, question_id, is_correct as 0/1, seconds) in id order, for loaders that parse whole columns
+    window, params = answered_between(since, until)
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        # COPY takes no parameters, so the window bounds are bound client-side
+        cursor.copy_expert(cursor.mogrify(f"""
+            COPY (
+                SELECT user_id, question_id, is_correct::int, EXTRACT(EPOCH FROM time_taken)::float8
+                FROM user_answer
+                WHERE {window}
+                ORDER BY id
+            ) TO STDOUT WITH (FORMAT csv)
+        """, params).decode(), output)
+
+@timed
+@backend_function
 def find_user_answer_by_id(user_answer_id: int) -> UserAnswer | None:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("SELECT * FROM user_answer WHERE id = %s", (user_answer_id,))
@@ -40,24 +216,39 @@ def find_user_answer_by_id(user_answer_id: int) -> UserAnswer | None:
                 answer_text=result['answer_text'],
                 is_correct=result['is_correct'],
                 time_taken=time_taken,
-                id=result['id']
+                id=result['id'],
+                answered_at=result['answered_at']
             )
         return None
 
+@timed
+@backend_function
 def update_user_answer(user_answer_id: int, updated_user_answer: UserAnswer) -> bool:
     time_taken_str = str(updated_user_answer.time_taken)
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("""
             UPDATE user_answer
             SET user_id = %s, question_id = %s, answer_text = %s, is_correct = %s, time_taken = %s
-            WHERE id = %s
+            FROM (SELECT id, user_id FROM user_answer WHERE id = %s FOR UPDATE) previous
+            WHERE user_answer.id = previous.id
+            RETURNING previous.user_id
         """, (updated_user_answer.user_id, updated_user_answer.question_id, updated_user_answer.answer_text,
               updated_user_answer.is_correct, time_taken_str, user_answer_id))
+        result = cursor.fetchone()
         connection.commit()
-        return cursor.rowcount > 0
+    if result is None:
+        return False
+    refresh_users(result['user_id'], updated_user_answer.user_id)
+    return True
 
+@timed
+@backend_function
 def delete_user_answer(user_answer_id: int) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
-        cursor.execute("DELETE FROM user_answer WHERE id = %s", (user_answer_id,))
+        cursor.execute("DELETE FROM user_answer WHERE id = %s RETURNING user_id", (user_answer_id,))
+        result = cursor.fetchone()
         connection.commit()
-        return cursor.rowcount > 0
+    if result is None:
+        return False
+    refresh_users(result['user_id'])
+    return True
@@ -1,15 +1,19 @@
-from typing import List
+from typing import Iterable, Iterator, List, Set
 
 from api.user_api import fetch_users
 from model.User import User
-from repository.database import get_db_connection
+from config.sql_config import DB_ITERSIZE
+from repository.database import get_db_connection, reserve_ids, copy_rows
+from repository.storage import backend_function
+from metrics.instrument import timed
 
-def load_users():
-    users = fetch_users()
-    for user in users:
-        create_user(user)
+@timed
+def load_users() -> List[int]:
+    return create_users(fetch_users())
 
 # create
+@timed
+@backend_function
 def create_user(user: User) -> int:
     with get_db_connection() as connection, connection.cursor() as cursor:
             cursor.execute(
@@ -23,7 +27,23 @@ def create_user(user: User) -> int:
             connection.commit()
             return new_id
 
+# create many
+@timed
+@backend_function
+def create_users(users: List[User], cursor=None) -> List[int]:
+    if cursor is None:
+        with get_db_connection() as connection, connection.cursor() as cursor:
+            return create_users(users, cursor)
+    new_ids = reserve_ids(cursor, 'trivia_user', len(users))
+    copy_rows(cursor, 'trivia_user', ('id', 'first', 'last', 'email'), (
+        (new_id, user.first, user.last, user.email)
+        for new_id, user in zip(new_ids, users)
+    ))
+    return new_ids
+
 # getAll
+@timed
+@backend_function
 def get_all_users() -> List[User]:
     with get_db_connection() as connection, connection.cursor() as cursor:
             cursor.execute("""SELECT * FROM trivia_user""")
@@ -31,7 +51,31 @@ def get_all_users() -> List[User]:
             users = [User(**f) for f in res]
             return users
 
+# getPage
+@timed
+@backend_function
+def get_users_page(limit: int, after_id: int = None) -> List[User]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT * FROM trivia_user WHERE id > %s ORDER BY id LIMIT %s",
+            (after_id if after_id is not None else 0, limit)
+        )
+        res = cursor.fetchall()
+        return [User(**f) for f in res]
+
+# iterate
+@timed
+@backend_function
+def iter_users(itersize: int = DB_ITERSIZE) -> Iterator[User]:
+    with get_db_connection() as connection, connection.cursor(name='iter_users') as cursor:
+        cursor.itersize = itersize
+        cursor.execute("SELECT * FROM trivia_user ORDER BY id")
+        for row in cursor:
+            yield User(**row)
+
 # findById
+@timed
+@backend_function
 def find_user_by_id(user_id: int) -> User | None:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("SELECT * FROM trivia_user WHERE id = %s", (user_id,))
@@ -40,7 +84,17 @@ def find_user_by_id(user_id: int) -> User | None:
             return None
         return User(**result)
 
+# findExisting
+@timed
+@backend_function
+def find_existing_user_ids(user_ids: Iterable[int]) -> Set[int]:
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM trivia_user WHERE id = ANY(%s)", (list(set(user_ids)),))
+        return {row['id'] for row in cursor.fetchall()}
+
 # update
+@timed
+@backend_function
 def update_user(user_id: int, updated_user: User) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("""
@@ -52,6 +106,8 @@ def update_user(user_id: int, updated_user: User) -> bool:
         return cursor.rowcount > 0
 
 # delete
+@timed
+@backend_function
 def delete_user(user_id: int) -> bool:
     with get_db_connection() as connection, connection.cursor() as cursor:
         cursor.execute("DELETE FROM trivia_user WHERE id = %s", (user_id,))
@@ -1,17 +1,70 @@
-from api.question_api import fetch_questions
-from repository.answer_repository import create_answer
-from repository.database import is_tables_exists, create_tables
-from repository.question_repository import create_question
-from repository.user_repository import load_users
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
 
+from toolz import partition_all
 
-def seed():
+from api.client import IngestionClient
+from api.question_api import iter_questions
+from api.user_api import iter_users
+from config.api_config import SEED_USERS, SEED_QUESTIONS, SEED_BATCH_SIZE
+from model.Answer import Answer
+from model.Question import Question
+from model.User import User
+from repository.answer_repository import create_answers
+from repository.database import is_tables_exists, create_tables, get_db_connection
+from repository.question_cache import question_cache
+from repository.question_repository import create_questions
+from repository.user_repository import create_users
+
+
+@dataclass
+class SeedReport:
+    users: int
+    questions: int
+    answers: int
+    seconds: float
+
+    @property
+    def rows(self) -> int:
+        return self.users + self.questions + self.answers
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+
+def bulk_seed(users: Iterable[User], question_answer_pairs: Iterable[Tuple[Question, List[Answer]]],
+              batch_size: int = SEED_BATCH_SIZE) -> SeedReport:
+    # Both inputs may be streams; rows are written batch by batch inside one transaction
+    start_time = time.perf_counter()
+    user_count, question_count, answer_count = 0, 0, 0
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        for user_batch in partition_all(batch_size, users):
+            user_count += len(create_users(list(user_batch), cursor))
+        for pair_batch in partition_all(batch_size, question_answer_pairs):
+            question_ids = create_questions([question for question, _ in pair_batch], cursor)
+            answers = []
+            for question_id, (_, incorrect_answers) in zip(question_ids, pair_batch):
+                for answer in incorrect_answers:
+                    answer.question_id = question_id
+                    answers.append(answer)
+            create_answers(answers, cursor)
+            question_count += len(question_ids)
+            answer_count += len(answers)
+    # The questions were written on this transaction's cursor, so the cache is left for us to clear
+    question_cache.clear()
+    return SeedReport(
+        users=user_count,
+        questions=question_count,
+        answers=answer_count,
+        seconds=time.perf_counter() - start_time
+    )
+
+
+def seed(users: int = SEED_USERS, questions: int = SEED_QUESTIONS):
     if not is_tables_exists():
         create_tables()
-        load_users()
-        question_answer_pairs = fetch_questions()
-        for question, incorrect_answers in question_answer_pairs:
-            question_id = create_question(question)
-            for answer in incorrect_answers:
-                answer.question_id = question_id
-                create_answer(answer)
+        with IngestionClient() as client:
+            report = bulk_seed(iter_users(users, client=client), iter_questions(questions, client=client))
+        print(f"Seeded {report.rows} rows in {report.seconds:.3f} seconds ({report.rows_per_second:.0f} rows/s).")
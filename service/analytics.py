@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Dict, Iterable, List, Set
+
+from model.UserAnswer import UserAnswer
+from model.UserAnswerBatch import UserAnswerBatch
+from service.sketches import TimingCollector
+
+
+class TimeTotal:
+    # Exact running sum of float seconds, so mean() matches statistics.mean bit for bit
+    # without keeping every value in memory.
+    __slots__ = ('_numerator', '_exponent')
+
+    def __init__(self):
+        self._numerator = 0
+        self._exponent = 0
+
+    def add(self, value: float):
+        numerator, denominator = float(value).as_integer_ratio()
+        exponent = denominator.bit_length() - 1
+        if exponent > self._exponent:
+            self._numerator <<= exponent - self._exponent
+            self._exponent = exponent
+        self._numerator += numerator << (self._exponent - exponent)
+
+    def merge(self, other: 'TimeTotal'):
+        if other._exponent > self._exponent:
+            self._numerator <<= other._exponent - self._exponent
+            self._exponent = other._exponent
+        self._numerator += other._numerator << (self._exponent - other._exponent)
+
+    def __eq__(self, other):
+        if not isinstance(other, TimeTotal):
+            return NotImplemented
+        return Fraction(self._numerator, 1 << self._exponent) == Fraction(other._numerator, 1 << other._exponent)
+
+    def mean(self, count: int) -> float:
+        return float(Fraction(self._numerator, (1 << self._exponent) * count))
+
+
+@dataclass
+class UserStats:
+    answered: int = 0
+    correct: int = 0
+    min_time: float = float('inf')
+    max_time: float = float('-inf')
+    time_total: TimeTotal = field(default_factory=TimeTotal)
+    question_ids: Set[int] = field(default_factory=set)
+
+    @property
+    def avg_time(self) -> float:
+        return self.time_total.mean(self.answered) if self.answered else 0
+
+
+@dataclass
+class QuestionStats:
+    answered: int = 0
+    correct: int = 0
+    min_correct_time: float = float('inf')
+    time_total: TimeTotal = field(default_factory=TimeTotal)
+
+    @property
+    def avg_time(self) -> float:
+        return self.time_total.mean(self.answered) if self.answered else 0
+
+
+@dataclass
+class AnswerAggregates:
+    users: Dict[int, UserStats] = field(default_factory=dict)
+    questions: Dict[int, QuestionStats] = field(default_factory=dict)
+    correct_times: List[float] = field(default_factory=list)
+    incorrect_times: List[float] = field(default_factory=list)
+    # Without exact medians the raw times are not kept; per-question and per-correctness sketches are kept instead
+    timing: TimingCollector | None = None
+
+    def add(self, answer: UserAnswer):
+        self.add_values(answer.user_id, answer.question_id, answer.is_correct, answer.time_taken.total_seconds())
+
+    def add_values(self, user_id: int, question_id: int, is_correct: bool, seconds: float):
+        user_stats = self.users.get(user_id)
+        if user_stats is None:
+            user_stats = self.users[user_id] = UserStats()
+        user_stats.answered += 1
+        user_stats.min_time = min(user_stats.min_time, seconds)
+        user_stats.max_time = max(user_stats.max_time, seconds)
+        user_stats.time_total.add(seconds)
+        user_stats.question_ids.add(question_id)
+
+        question_stats = self.questions.get(question_id)
+        if question_stats is None:
+            question_stats = self.questions[question_id] = QuestionStats()
+        question_stats.answered += 1
+        question_stats.time_total.add(seconds)
+
+        if is_correct:
+            user_stats.correct += 1
+            question_stats.correct += 1
+            question_stats.min_correct_time = min(question_stats.min_correct_time, seconds)
+
+        if self.timing is not None:
+            self.timing.update(question_id, is_correct, seconds)
+        elif is_correct:
+            self.correct_times.append(seconds)
+        else:
+            self.incorrect_times.append(seconds)
+
+
+def aggregate_answers(user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+                      exact_medians: bool = True) -> AnswerAggregates:
+    aggregates = AnswerAggregates(timing=None if exact_medians else TimingCollector())
+    if isinstance(user_answers, UserAnswerBatch):
+        # Columnar input is read straight from its arrays, without materializing UserAnswer objects
+        for values in zip(user_answers.user_ids, user_answers.question_ids, user_answers.is_correct,
+                          user_answers.seconds):
+            aggregates.add_values(*values)
+        return aggregates
+    for answer in user_answers:
+        aggregates.add(answer)
+    return aggregates
@@ -0,0 +1,259 @@
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from config.service_config import (
+    ANSWER_QUEUE_SIZE,
+    ANSWER_BATCH_SIZE,
+    ANSWER_FLUSH_INTERVAL,
+    ANSWER_QUEUE_TIMEOUT,
+    ANSWER_RETRY_BACKOFF,
+    ANSWER_MAX_BACKOFF,
+    ANSWER_MAX_ATTEMPTS,
+    ANSWER_SHUTDOWN_TIMEOUT
+)
+from model.UserAnswer import UserAnswer
+from repository.database import refused_errors, transient_errors
+from repository.user_answer_repository import insert_user_answers
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerQueueFull(Exception):
+    pass
+
+
+@dataclass
+class AnswerWriterStats:
+    depth: int
+    capacity: int
+    in_flight: int
+    enqueued: int
+    written: int
+    duplicates: int
+    rejected: int
+    dropped: int
+    lost: int
+    batches: int
+    failed_attempts: int
+    last_error: str | None
+
+
+class AnswerWriter:
+    # Write-behind queue for user answers. submit() returns once the answer is queued; a background thread
+    # drains the queue in multi-row inserts of up to batch_size rows, waiting at most flush_interval for a
+    # batch to fill. A full queue blocks submitters for up to put_timeout and then rejects them. A batch that
+    # fails with a transient error is retried with backoff, up to max_attempts tries, and every row carries an
+    # idempotency key, so a retry after an insert that did commit stores nothing twice. Rows the database
+    # refuses outright (a deleted user, say) are dropped one by one instead of holding back the rest of their
+    # batch. A batch that runs out of tries, or fails with any other error, is lost and counted as such.
+    # Which errors count as refused or transient depends on the storage backend in use, unless
+    # refused_errors and transient_errors name them.
+    def __init__(self, max_size: int = ANSWER_QUEUE_SIZE, batch_size: int = ANSWER_BATCH_SIZE,
+                 flush_interval: float = ANSWER_FLUSH_INTERVAL, put_timeout: float = ANSWER_QUEUE_TIMEOUT,
+                 retry_backoff: float = ANSWER_RETRY_BACKOFF, max_backoff: float = ANSWER_MAX_BACKOFF,
+                 max_attempts: int = ANSWER_MAX_ATTEMPTS,
+                 insert: Callable[[List[UserAnswer]], List[int | None]] = insert_user_answers,
+                 refused_errors: Tuple[type, ...] = None, transient_errors: Tuple[type, ...] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._insert = insert
+        self._refused_errors = refused_errors
+        self._transient_errors = transient_errors
+        self._clock = clock
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._flushing = 0
+        self._closed = False
+        self._thread = None
+        self._pid = None
+        self._enqueued = 0
+        self._written = 0
+        self._duplicates = 0
+        self._rejected = 0
+        self._dropped = 0
+        self._lost = 0
+        self._batches = 0
+        self._failed_attempts = 0
+        self._last_error = None
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        # The worker starts with the first answer, so a writer built before a fork gets its thread in the child
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='answer-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, user_answer: UserAnswer, timeout: float = None) -> str:
+        key = user_answer.idempotency_key or uuid.uuid4().hex
+        timeout = self.put_timeout if timeout is None else timeout
+        with self._condition:
+            if self._closed:
+                raise AnswerQueueFull("The answer writer is closed.")
+            self._ensure_started()
+            deadline = self._clock() + timeout
+            while len(self._queue) >= self.max_size:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    self._rejected += 1
+                    raise AnswerQueueFull(f"The answer queue is full ({self.max_size} answers waiting).")
+                self._condition.wait(remaining)
+            # Stamped here rather than at insert time, so batching delays do not move answers in time
+            self._queue.append(replace(user_answer, idempotency_key=key,
+                                       answered_at=user_answer.answered_at or datetime.now(timezone.utc)))
+            self._enqueued += 1
+            self._condition.notify_all()
+        return key
+
+    def _next_batch(self) -> List[UserAnswer] | None:
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return None
+            deadline = self._clock() + self.flush_interval
+            while len(self._queue) < self.batch_size and not self._closed and not self._flushing:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._in_flight = len(batch)
+            self._condition.notify_all()
+            return batch
+
+    def _record_error(self, error: Exception):
+        with self._condition:
+            self._last_error = f"{type(error).__name__}: {error}"
+
+    def _refused(self) -> Tuple[type, ...]:
+        return self._refused_errors or refused_errors()
+
+    def _transient(self) -> Tuple[type, ...]:
+        return self._transient_errors or transient_errors()
+
+    def _insert_with_retry(self, rows: List[UserAnswer]) -> List[int | None]:
+        # Only transient errors are retried; the last one is raised once max_attempts tries have failed
+        delay = self.retry_backoff
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._insert(rows)
+            except self._transient() as e:
+                self._record_error(e)
+                with self._condition:
+                    self._failed_attempts += 1
+                if attempt == self.max_attempts:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+    def _lose(self, rows: List[UserAnswer], error: Exception):
+        self._record_error(error)
+        logger.error("Lost %d user answers after %s: %s", len(rows), type(error).__name__, error)
+
+    def _write(self, batch: List[UserAnswer]):
+        dropped = lost = 0
+        try:
+            new_ids = self._insert_with_retry(batch)
+        except self._refused():
+            new_ids = []
+            for row in batch:
+                try:
+                    new_ids += self._insert_with_retry([row])
+                except self._refused() as e:
+                    self._record_error(e)
+                    new_ids.append(None)
+                    dropped += 1
+                except Exception as e:
+                    self._lose([row], e)
+                    new_ids.append(None)
+                    lost += 1
+        except Exception as e:
+            self._lose(batch, e)
+            new_ids = []
+            lost = len(batch)
+        written = sum(1 for new_id in new_ids if new_id is not None)
+        with self._condition:
+            self._written += written
+            self._dropped += dropped
+            self._lost += lost
+            self._duplicates += len(batch) - written - dropped - lost
+            self._batches += 1
+            self._in_flight = 0
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def flush(self, timeout: float = None) -> bool:
+        # Writes out everything queued so far without waiting for batches to fill; False if it timed out
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._condition:
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                while self._queue or self._in_flight:
+                    if self._thread is None or not self._thread.is_alive():
+                        return False
+                    remaining = None if deadline is None else deadline - self._clock()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: float = ANSWER_SHUTDOWN_TIMEOUT) -> bool:
+        # Stops accepting answers and drains the queue; answers still queued after timeout are lost
+        with self._condition:
+            if self._closed:
+                return not self._queue and not self._in_flight
+            self._closed = True
+            self._condition.notify_all()
+        drained = self.flush(timeout)
+        atexit.unregister(self.close)
+        return drained
+
+    @property
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def stats(self) -> AnswerWriterStats:
+        with self._condition:
+            return AnswerWriterStats(
+                depth=len(self._queue),
+                capacity=self.max_size,
+                in_flight=self._in_flight,
+                enqueued=self._enqueued,
+                written=self._written,
+                duplicates=self._duplicates,
+                rejected=self._rejected,
+                dropped=self._dropped,
+                lost=self._lost,
+                batches=self._batches,
+                failed_attempts=self._failed_attempts,
+                last_error=self._last_error
+            )
+
+
+answer_writer = AnswerWriter()
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from config.service_config import GAME_FLUSH_EVERY
+from model.Question import Question
+from model.UserAnswer import UserAnswer
+from repository.question_repository import get_questions_with_answers
+from repository.user_answer_repository import create_user_answers
+
+
+@dataclass
+class RoundQuestion:
+    question: Question
+    options: List[str]
+
+
+@dataclass
+class AnswerResult:
+    is_correct: bool
+    correct_answer: str
+    time_taken: float
+    finished: bool
+
+
+class GameSession:
+    # One round for one player: questions and shuffled options are loaded with a single query up
+    # front, and answers are buffered and written in batches, so answering never waits on the DB.
+    # The clock is wall time, so a question asked by one worker can be answered in another. With
+    # flush_every None the session never writes its answers itself; its owner drains them instead.
+    def __init__(self, user_id: int, question_ids: List[int] = None, flush_every: int | None = GAME_FLUSH_EVERY,
+                 clock: Callable[[], float] = time.time, questions: List[RoundQuestion] = None):
+        self.user_id = user_id
+        self.flush_every = flush_every
+        self.questions = questions or []
+        self.correct_answers = 0
+        self.position = 0
+        self._clock = clock
+        self._asked_at = None
+        self._pending: List[UserAnswer] = []
+        self._lock = threading.Lock()
+        # Serialises flushes without holding up answers while a batch is being written
+        self._flush_lock = threading.Lock()
+        if questions is not None:
+            return
+        for question, incorrect_answers in get_questions_with_answers(question_ids):
+            options = [question.correct_answer] + [answer.incorrect_answer for answer in incorrect_answers]
+            random.shuffle(options)
+            self.questions.append(RoundQuestion(question=question, options=options))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.questions)
+
+    def next_question(self) -> RoundQuestion | None:
+        # The answer clock starts the first time a question is served; asking again does not restart it
+        with self._lock:
+            if self.finished:
+                return None
+            if self._asked_at is None:
+                self._asked_at = self._clock()
+            return self.questions[self.position]
+
+    def submit(self, option_index: int) -> AnswerResult:
+        # Answers the question last served by next_question, timed on this side rather than the player's
+        with self._lock:
+            if self.finished or self._asked_at is None:
+                raise ValueError("There is no question waiting for an answer.")
+            round_question = self.questions[self.position]
+            if not 0 <= option_index < len(round_question.options):
+                raise ValueError(f"option_index must be between 0 and {len(round_question.options) - 1}.")
+            time_taken = self._clock() - self._asked_at
+            self.position += 1
+            self._asked_at = None
+        is_correct = self.answer(round_question, option_index, time_taken)
+        return AnswerResult(
+            is_correct=is_correct,
+            correct_answer=round_question.question.correct_answer,
+            time_taken=time_taken,
+            finished=self.finished
+        )
+
+    def answer(self, round_question: RoundQuestion, option_index: int, time_taken: float) -> bool:
+        answer_text = round_question.options[option_index]
+        is_correct = answer_text == round_question.question.correct_answer
+        with self._lock:
+            self._pending.append(UserAnswer(
+                user_id=self.user_id,
+                question_id=round_question.question.id,
+                answer_text=answer_text,
+                is_correct=is_correct,
+                time_taken=timedelta(seconds=time_taken),
+                answered_at=datetime.now(timezone.utc)
+            ))
+            if is_correct:
+                self.correct_answers += 1
+            # A finished round is written straight away rather than waiting for a full batch
+            should_flush = self.flush_every is not None and (len(self._pending) >= self.flush_every or self.finished)
+        if should_flush:
+            self.flush()
+        return is_correct
+
+    def flush(self) -> List[int]:
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return []
+            # Answers leave the buffer only once the insert has committed; a failed flush is retried later.
+            # Answers given meanwhile are appended behind the batch.
+            new_ids = create_user_answers(batch)
+            with self._lock:
+                del self._pending[:len(batch)]
+        return new_ids
+
+    def drain(self) -> List[UserAnswer]:
+        # Hands the buffered answers to a caller that writes them itself
+        with self._lock:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'user_id': self.user_id,
+                'questions': [{'question': asdict(round_question.question), 'options': round_question.options}
+                              for round_question in self.questions],
+                'position': self.position,
+                'correct_answers': self.correct_answers,
+                'asked_at': self._asked_at
+            }
+
+    @classmethod
+    def from_dict(cls, state: Dict, flush_every: int | None = None,
+                  clock: Callable[[], float] = time.time) -> 'GameSession':
+        # Restores a round saved by to_dict without querying the questions again
+        session = cls(state['user_id'], flush_every=flush_every, clock=clock, questions=[
+            RoundQuestion(question=Question(**item['question']), options=item['options'])
+            for item in state['questions']
+        ])
+        session.position = state['position']
+        session.correct_answers = state['correct_answers']
+        session._asked_at = state['asked_at']
+        return session
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,195 @@
+import atexit
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from config.service_config import GAME_SESSION_TTL, GAME_SESSION_MAX, GAME_STORE
+from repository.game_session_repository import (
+    count_game_sessions,
+    create_game_session,
+    delete_expired_game_sessions,
+    delete_game_session,
+    get_game_session,
+    locked_game_session
+)
+from repository.user_answer_repository import create_user_answers, user_answers_written
+from service.game_session import GameSession
+
+GAME_STORES = ('database', 'memory')
+
+
+class GameStore(ABC):
+    # Where HTTP games live between requests. Implementations must close() every session they drop,
+    # so buffered answers are written even when a player walks away.
+    # Whether every worker process sees the same games; app.serve refuses several workers for a store that is not
+    shared = False
+
+    @abstractmethod
+    def add(self, session: GameSession) -> str:
+        ...
+
+    @abstractmethod
+    def get(self, game_id: str) -> GameSession | None:
+        ...
+
+    @contextmanager
+    def use(self, game_id: str) -> Iterator[GameSession | None]:
+        # For requests that change a game; the game is saved when the block exits cleanly
+        yield self.get(game_id)
+
+    @abstractmethod
+    def remove(self, game_id: str) -> GameSession | None:
+        ...
+
+    @abstractmethod
+    def sweep(self) -> int:
+        ...
+
+    @abstractmethod
+    def flush(self):
+        # Writes the buffered answers of every open session
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class InMemoryGameStore(GameStore):
+    # Per-process store: sessions expire ttl seconds after they were last used, and the least recently
+    # used session is dropped once max_size games are open. A game is only found by the process that
+    # started it, so app.serve refuses to start several workers with this store.
+    def __init__(self, ttl: float = GAME_SESSION_TTL, max_size: int = GAME_SESSION_MAX,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expired(self, now: float) -> List[GameSession]:
+        expired = []
+        while self._sessions:
+            game_id, (session, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[game_id]
+            expired.append(session)
+        return expired
+
+    def add(self, session: GameSession) -> str:
+        game_id = secrets.token_urlsafe(16)
+        with self._lock:
+            now = self._clock()
+            dropped = self._expired(now)
+            self._sessions[game_id] = (session, now + self.ttl)
+            while len(self._sessions) > self.max_size:
+                dropped.append(self._sessions.popitem(last=False)[1][0])
+        _close_all(dropped)
+        return game_id
+
+    def get(self, game_id: str) -> GameSession | None:
+        with self._lock:
+            now = self._clock()
+            # Entries are kept in expiry order, so a touched session moves to the end
+            dropped = self._expired(now)
+            entry = self._sessions.get(game_id)
+            if entry is not None:
+                self._sessions[game_id] = (entry[0], now + self.ttl)
+                self._sessions.move_to_end(game_id)
+        _close_all(dropped)
+        return entry[0] if entry else None
+
+    def remove(self, game_id: str) -> GameSession | None:
+        with self._lock:
+            entry = self._sessions.pop(game_id, None)
+        if entry is None:
+            return None
+        entry[0].close()
+        return entry[0]
+
+    def sweep(self) -> int:
+        with self._lock:
+            dropped = self._expired(self._clock())
+        _close_all(dropped)
+        return len(dropped)
+
+    def flush(self):
+        with self._lock:
+            sessions = [session for session, _ in self._sessions.values()]
+        for session in sessions:
+            session.flush()
+
+
+class DatabaseGameStore(GameStore):
+    # Shared store: each game is a row in game_session, so any worker can serve any game. Requests that
+    # change a game hold its row lock, and its answers are written in the same transaction as the state
+    # that counted them, so nothing is buffered in the process. Games expire ttl seconds after they were
+    # last used.
+    shared = True
+
+    def __init__(self, ttl: float = GAME_SESSION_TTL):
+        self.ttl = ttl
+
+    def __len__(self) -> int:
+        return count_game_sessions()
+
+    def add(self, session: GameSession) -> str:
+        game_id = secrets.token_urlsafe(16)
+        create_game_session(game_id, session.to_dict(), self.ttl)
+        return game_id
+
+    def get(self, game_id: str) -> GameSession | None:
+        state = get_game_session(game_id, self.ttl)
+        return GameSession.from_dict(state) if state is not None else None
+
+    @contextmanager
+    def use(self, game_id: str) -> Iterator[GameSession | None]:
+        with locked_game_session(game_id, self.ttl) as (cursor, state):
+            if state is None:
+                yield None
+                return
+            session = GameSession.from_dict(state)
+            yield session
+            answers = session.drain()
+            new_ids = create_user_answers(answers, cursor) if answers else []
+            state.update(session.to_dict())
+        user_answers_written(new_ids, answers)
+
+    def remove(self, game_id: str) -> GameSession | None:
+        state = delete_game_session(game_id)
+        return GameSession.from_dict(state) if state is not None else None
+
+    def sweep(self) -> int:
+        return delete_expired_game_sessions()
+
+    def flush(self):
+        # Answers are written with the state of their game, so none are waiting here
+        pass
+
+
+def _close_all(sessions: List[GameSession]):
+    for session in sessions:
+        session.close()
+
+
+if GAME_STORE not in GAME_STORES:
+    raise ValueError(f"GAME_STORE must be one of: {', '.join(GAME_STORES)}")
+game_store: GameStore = DatabaseGameStore() if GAME_STORE == 'database' else InMemoryGameStore()
+
+
+def flush_open_games():
+    game_store.flush()
+
+
+# One hook for the whole store rather than one per session; buffered answers are still written if the
+# process exits with games open
+atexit.register(flush_open_games)
@@ -0,0 +1,155 @@
+import csv
+import io
+import zlib
+from typing import Callable, Dict, IO, Iterable, Iterator, List
+
+from model.User import User
+from service.analytics import AnswerAggregates, UserStats
+
+REPORT_FIELDS = (
+    'user_id',
+    'name',
+    'total_questions',
+    'answered_questions',
+    'correct_answers',
+    'avg_time',
+    'fastest_answer',
+    'slowest_answer',
+    'unanswered_questions'
+)
+REPORT_FORMATS = ('csv', 'parquet', 'arrow')
+
+
+def build_user_report(user: User, total_questions: int, stats: UserStats | None) -> Dict:
+    stats = stats or UserStats()
+    answered_questions = len(stats.question_ids)
+    return {
+        'user_id': user.id,
+        'name': f"{user.first} {user.last}",
+        'total_questions': total_questions,
+        'answered_questions': answered_questions,
+        'correct_answers': stats.correct,
+        'avg_time': stats.avg_time,
+        'fastest_answer': stats.min_time if stats.answered else 0,
+        'slowest_answer': stats.max_time if stats.answered else 0,
+        'unanswered_questions': total_questions - answered_questions
+    }
+
+
+def iter_user_reports(users: Iterable[User], total_questions: int, aggregates: AnswerAggregates) -> Iterator[Dict]:
+    for user in users:
+        yield build_user_report(user, total_questions, aggregates.users.get(user.id))
+
+
+def _chunks(reports: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for report in reports:
+        chunk.append(report)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_chunks(reports: Iterable[Dict], chunk_size: int, progress: Callable[[int], None] | None) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    rows = 0
+    for chunk in _chunks(reports, chunk_size):
+        writer.writerows(chunk)
+        rows += len(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        if progress:
+            progress(rows)
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _require_pyarrow(report_format: str):
+    try:
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError(f"The {report_format} report format requires pyarrow to be installed.")
+
+
+def _arrow_chunks(reports: Iterable[Dict], chunk_size: int, progress: Callable[[int], None] | None,
+                  report_format: str) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('user_id', pa.int64()),
+        ('name', pa.string()),
+        ('total_questions', pa.int64()),
+        ('answered_questions', pa.int64()),
+        ('correct_answers', pa.int64()),
+        ('avg_time', pa.float64()),
+        ('fastest_answer', pa.float64()),
+        ('slowest_answer', pa.float64()),
+        ('unanswered_questions', pa.int64())
+    ])
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema) if report_format == 'parquet' else ipc.new_stream(sink, schema)
+    rows = 0
+    for chunk in _chunks(reports, chunk_size):
+        writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+        rows += len(chunk)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        if progress:
+            progress(rows)
+    writer.close()
+    yield sink.getvalue()
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # wbits=31 produces a gzip container, so the stream can be saved as .gz or served with Content-Encoding: gzip
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_report_chunks(reports: Iterable[Dict], report_format: str = 'csv', compress: bool = False,
+                       chunk_size: int = 1000, progress: Callable[[int], None] = None) -> Iterator[bytes]:
+    # Not a generator itself: a bad format or a missing pyarrow raises ValueError here, before the first chunk,
+    # while a caller can still answer with an error instead of a broken stream
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {report_format}")
+    if report_format == 'csv':
+        chunks = _csv_chunks(reports, chunk_size, progress)
+    else:
+        _require_pyarrow(report_format)
+        chunks = _arrow_chunks(reports, chunk_size, progress, report_format)
+    return _gzip_chunks(chunks) if compress else chunks
+
+
+def export_reports(reports: Iterable[Dict], target: str | IO[bytes] = 'user_reports.csv', report_format: str = 'csv',
+                   compress: bool = False, chunk_size: int = 1000, progress: Callable[[int], None] = None) -> int:
+    rows = 0
+
+    def count_rows(written: int):
+        nonlocal rows
+        rows = written
+        if progress:
+            progress(written)
+
+    chunks = iter_report_chunks(reports, report_format, compress, chunk_size, count_rows)
+    if isinstance(target, str):
+        with open(target, 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+    else:
+        for chunk in chunks:
+            target.write(chunk)
+    return rows
+
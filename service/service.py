@@ -1,25 +1,40 @@
-import csv
-from typing import List, Dict, Tuple
+import sys
+import time
+from datetime import datetime
+from typing import Callable, IO, Iterable, Iterator, List, Dict, Tuple
 import statistics as s
+from config.service_config import ANALYTICS_BACKEND, ANALYTICS_EXACT_MEDIANS
 from model.User import User
 from model.Question import Question
 from model.UserAnswer import UserAnswer
+from model.UserAnswerBatch import UserAnswerBatch
 from repository.user_repository import get_all_users
 from repository.question_repository import get_all_questions
-from repository.user_answer_repository import get_all_user_answers
+from repository.user_answer_repository import get_all_user_answers, iter_user_answers, get_user_answer_batch
+from repository.analytics_repository import iter_user_reports as iter_sql_user_reports
+from repository.storage import is_postgres
+from service import sql_service
+from service.analytics import AnswerAggregates, QuestionStats, UserStats, aggregate_answers
+from service.reports import export_reports, iter_user_reports
+from service.sketches import CORRECT_BUCKET, INCORRECT_BUCKET
 
 
 # Data fetching function remains the same as it's already functional
-def get_data() -> Tuple[List[User], List[Question], List[UserAnswer]]:
-    return get_all_users(), get_all_questions(), get_all_user_answers()
+def get_data(since: datetime = None, until: datetime = None) -> Tuple[List[User], List[Question], List[UserAnswer]]:
+    return get_all_users(), get_all_questions(), get_all_user_answers(since, until)
+
+
+# Same data, but answers are streamed from a server-side cursor instead of loaded into a list
+def get_data_stream(since: datetime = None,
+                    until: datetime = None) -> Tuple[List[User], List[Question], Iterator[UserAnswer]]:
+    return get_all_users(), get_all_questions(), iter_user_answers(since=since, until=until)
 
 
 # Exercise 1: Find the highest scorer
-def exercise_1(users: List[User], user_answers: List[UserAnswer]) -> Tuple[User, int]:
-    user_scores = {
-        answer.user_id: sum(1 for ans in user_answers if ans.is_correct and ans.user_id == answer.user_id)
-        for answer in user_answers
-    }
+def exercise_1(users: List[User], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> Tuple[User, int]:
+    aggregates = aggregates or aggregate_answers(user_answers)
+    user_scores = {user_id: stats.correct for user_id, stats in aggregates.users.items()}
 
     highest_score_user_id = max(user_scores, key=user_scores.get, default=None)
     highest_score_user = next((user for user in users if user.id == highest_score_user_id), None)
@@ -28,13 +43,11 @@ def exercise_1(users: List[User], user_answers: List[UserAnswer]) -> Tuple[User,
 
 
 # Exercise 2: Find the question answered the fastest
-def exercise_2(questions: List[Question], user_answers: List[UserAnswer]) -> Tuple[Question, float]:
+def exercise_2(questions: List[Question], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> Tuple[Question, float]:
+    aggregates = aggregates or aggregate_answers(user_answers)
     fastest_times = {
-        q.id: min(
-            (answer.time_taken.total_seconds() for answer in user_answers if
-             answer.is_correct and answer.question_id == q.id),
-            default=float('inf')
-        )
+        q.id: aggregates.questions[q.id].min_correct_time if q.id in aggregates.questions else float('inf')
         for q in questions
     }
 
@@ -45,12 +58,14 @@ def exercise_2(questions: List[Question], user_answers: List[UserAnswer]) -> Tup
 
 
 # Exercise 3: Find second place user by correctness and fastest time
-def exercise_3(users: List[User], user_answers: List[UserAnswer]) -> Tuple[User, float]:
+def exercise_3(users: List[User], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> Tuple[User, float]:
+    aggregates = aggregates or aggregate_answers(user_answers)
+    empty = UserStats()
     user_scores = {
         user.id: {
-            'correct': sum(1 for ans in user_answers if ans.is_correct and ans.user_id == user.id),
-            'fastest': min((ans.time_taken.total_seconds() for ans in user_answers if ans.user_id == user.id),
-                           default=float('inf'))
+            'correct': aggregates.users.get(user.id, empty).correct,
+            'fastest': aggregates.users.get(user.id, empty).min_time
         }
         for user in users
     }
@@ -64,118 +79,216 @@ def exercise_3(users: List[User], user_answers: List[UserAnswer]) -> Tuple[User,
 
 
 # Exercise 4: Calculate the average time per question
-def exercise_4(questions: List[Question], user_answers: List[UserAnswer]) -> Dict[int, float]:
+def exercise_4(questions: List[Question], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> Dict[int, float]:
+    aggregates = aggregates or aggregate_answers(user_answers)
     return {
-        q.id: s.mean([ans.time_taken.total_seconds() for ans in user_answers if ans.question_id == q.id])
-        if any(ans.question_id == q.id for ans in user_answers) else 0
+        q.id: aggregates.questions[q.id].avg_time if q.id in aggregates.questions else 0
         for q in questions
     }
 
 # Exercise 5: Calculate the success rate for each question
-def exercise_5(questions: List[Question], user_answers: List[UserAnswer]) -> Dict[int, float]:
-    question_success = {q.id: {'correct': 0, 'total': 0} for q in questions}
-    for answer in user_answers:
-        question_success[answer.question_id]['total'] += 1
-        if answer.is_correct:
-            question_success[answer.question_id]['correct'] += 1
+def exercise_5(questions: List[Question], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> Dict[int, float]:
+    aggregates = aggregates or aggregate_answers(user_answers)
+    question_success = {q.id: aggregates.questions.get(q.id, QuestionStats()) for q in questions}
 
     return {
-        q_id: (stats['correct'] / stats['total']) if stats['total'] > 0 else 0
+        q_id: (stats.correct / stats.answered) if stats.answered > 0 else 0
         for q_id, stats in question_success.items()
     }
 
 
 
 # Exercise 6: Find users who answered all questions
-def exercise_6(users: List[User], questions: List[Question], user_answers: List[UserAnswer]) -> List[User]:
+def exercise_6(users: List[User], questions: List[Question], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> List[User]:
+    aggregates = aggregates or aggregate_answers(user_answers)
     return [
         user for user in users
-        if len(set(ans.question_id for ans in user_answers if ans.user_id == user.id)) == len(questions)
+        if len(aggregates.users[user.id].question_ids if user.id in aggregates.users else ()) == len(questions)
     ]
 
 
 # Exercise 7: Median time for correct and incorrect answers
-def exercise_7(user_answers: List[UserAnswer]) -> Tuple[float, float]:
-    correct_times = [ans.time_taken.total_seconds() for ans in user_answers if ans.is_correct]
-    incorrect_times = [ans.time_taken.total_seconds() for ans in user_answers if not ans.is_correct]
+def exercise_7(user_answers: Iterable[UserAnswer] | UserAnswerBatch, aggregates: AnswerAggregates = None) -> Tuple[float, float]:
+    aggregates = aggregates or aggregate_answers(user_answers)
+    if aggregates.timing is not None:
+        correct_stats = aggregates.timing.get(CORRECT_BUCKET)
+        incorrect_stats = aggregates.timing.get(INCORRECT_BUCKET)
+        return (correct_stats.sketch.quantile(0.5) if correct_stats else 0,
+                incorrect_stats.sketch.quantile(0.5) if incorrect_stats else 0)
+    correct_times = aggregates.correct_times
+    incorrect_times = aggregates.incorrect_times
 
     return (s.median(correct_times) if correct_times else 0, s.median(incorrect_times) if incorrect_times else 0)
 
 
 # Exercise 8: Generate comprehensive user reports
-def exercise_8(users: List[User], questions: List[Question], user_answers: List[UserAnswer]) -> List[Dict]:
-    total_questions = len(questions)
-
-    def generate_report(user: User) -> Dict:
-        user_answers_for_user = [ans for ans in user_answers if ans.user_id == user.id]
-        answered_questions = len(set(ans.question_id for ans in user_answers_for_user))
-        correct_answers = sum(1 for ans in user_answers_for_user if ans.is_correct)
-        times = [ans.time_taken.total_seconds() for ans in user_answers_for_user]
-
-        return {
-            'user_id': user.id,
-            'name': f"{user.first} {user.last}",
-            'total_questions': total_questions,
-            'answered_questions': answered_questions,
-            'correct_answers': correct_answers,
-            'avg_time': s.mean(times) if times else 0,
-            'fastest_answer': min(times) if times else 0,
-            'slowest_answer': max(times) if times else 0,
-            'unanswered_questions': total_questions - answered_questions
-        }
-
-    reports = list(map(generate_report, users))
+def exercise_8(users: List[User], questions: List[Question], user_answers: Iterable[UserAnswer] | UserAnswerBatch,
+               aggregates: AnswerAggregates = None) -> List[Dict]:
+    aggregates = aggregates or aggregate_answers(user_answers)
+    reports = list(iter_user_reports(users, len(questions), aggregates))
+    export_reports(reports)
+    return reports
 
-    # Export to CSV
-    with open('user_reports.csv', 'w', newline='') as csvfile:
-        fieldnames = reports[0].keys() if reports else []
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(reports)
 
-    return reports
+def _vectorized():
+    try:
+        from service import vectorized
+    except ImportError:
+        raise ValueError("The vectorized analytics backend requires numpy and pandas to be installed.")
+    return vectorized
+
+
+def _require_postgres(backend: str):
+    if not is_postgres():
+        raise ValueError(f"The {backend} analytics backend needs the postgres storage backend.")
+
+
+def _run_vectorized_exercises(since: datetime = None, until: datetime = None) -> Tuple:
+    vectorized = _vectorized()
+    users, questions = get_all_users(), get_all_questions()
+    aggregates = vectorized.ColumnAggregates(vectorized.load_answer_columns(since, until))
+    reports = list(vectorized.iter_user_reports(users, len(questions), aggregates))
+    export_reports(reports)
+    return (
+        vectorized.exercise_1(users, aggregates),
+        vectorized.exercise_2(questions, aggregates),
+        vectorized.exercise_3(users, aggregates),
+        vectorized.exercise_4(questions, aggregates),
+        vectorized.exercise_5(questions, aggregates),
+        vectorized.exercise_6(users, questions, aggregates),
+        vectorized.exercise_7(aggregates),
+        reports
+    )
+
+
+# Run all exercises on the selected backend: 'python' streams answers into in-process aggregates,
+# 'columnar' loads them into a compact UserAnswerBatch first, 'vectorized' groups whole NumPy columns
+# (exact medians, no Python loop per answer), 'sql' pushes aggregation to Postgres.
+# since and until restrict every backend to answers given in that window, read only from the partitions it covers.
+def run_exercises(backend: str = ANALYTICS_BACKEND, since: datetime = None, until: datetime = None) -> Tuple:
+    if backend == 'sql':
+        _require_postgres(backend)
+        return (
+            sql_service.exercise_1(since, until),
+            sql_service.exercise_2(since, until),
+            sql_service.exercise_3(since, until),
+            sql_service.exercise_4(since, until),
+            sql_service.exercise_5(since, until),
+            sql_service.exercise_6(since, until),
+            sql_service.exercise_7(since, until),
+            sql_service.exercise_8(since, until)
+        )
+    if backend == 'vectorized':
+        return _run_vectorized_exercises(since, until)
+    if backend == 'columnar':
+        users, questions = get_all_users(), get_all_questions()
+        user_answers = get_user_answer_batch(since=since, until=until)
+    elif backend == 'python':
+        # Answers are consumed once while building the aggregates. Memory then grows with users and questions,
+        # except that exact medians keep one float per answer; ANALYTICS_EXACT_MEDIANS=false keeps sketches instead
+        users, questions, user_answers = get_data_stream(since, until)
+    else:
+        raise ValueError(f"Unknown analytics backend: {backend}")
+    aggregates = aggregate_answers(user_answers, exact_medians=ANALYTICS_EXACT_MEDIANS)
+    return (
+        exercise_1(users, user_answers, aggregates),
+        exercise_2(questions, user_answers, aggregates),
+        exercise_3(users, user_answers, aggregates),
+        exercise_4(questions, user_answers, aggregates),
+        exercise_5(questions, user_answers, aggregates),
+        exercise_6(users, questions, user_answers, aggregates),
+        exercise_7(user_answers, aggregates),
+        exercise_8(users, questions, user_answers, aggregates)
+    )
+
+
+# Stream per-user report rows without holding them in a list: grouped in SQL, or from streamed aggregates
+def iter_reports(backend: str = ANALYTICS_BACKEND, since: datetime = None, until: datetime = None) -> Iterator[Dict]:
+    if backend == 'sql':
+        _require_postgres(backend)
+        return iter_sql_user_reports(since=since, until=until)
+    if backend == 'vectorized':
+        vectorized = _vectorized()
+        users, questions = get_all_users(), get_all_questions()
+        aggregates = vectorized.ColumnAggregates(vectorized.load_answer_columns(since, until))
+        return vectorized.iter_user_reports(users, len(questions), aggregates)
+    if backend not in ('python', 'columnar'):
+        raise ValueError(f"Unknown analytics backend: {backend}")
+    users, questions, user_answers = get_data_stream(since, until)
+    aggregates = aggregate_answers(user_answers, exact_medians=False)
+    return iter_user_reports(users, len(questions), aggregates)
+
+
+def export_user_reports(target: str | IO[bytes] = 'user_reports.csv', backend: str = ANALYTICS_BACKEND,
+                        report_format: str = 'csv', compress: bool = False, chunk_size: int = 1000,
+                        progress: Callable[[int], None] = None, since: datetime = None,
+                        until: datetime = None) -> int:
+    return export_reports(iter_reports(backend, since, until), target, report_format, compress, chunk_size, progress)
+
+
+# Run every backend, report its timing and which exercises disagree with the python backend
+def compare_backends(backends: Tuple[str, ...] = ('python', 'sql')) -> Dict[str, float]:
+    timings, results = {}, {}
+    for backend in backends:
+        start_time = time.perf_counter()
+        results[backend] = run_exercises(backend)
+        timings[backend] = time.perf_counter() - start_time
+        print(f"{backend}: {timings[backend]:.3f} seconds")
+
+    reference = results[backends[0]]
+    for backend in backends[1:]:
+        mismatches = [idx for idx, (a, b) in enumerate(zip(reference, results[backend]), start=1) if a != b]
+        print(f"{backend} differs from {backends[0]} on exercises: {mismatches or 'none'}")
+    return timings
 
 
 # Main function to call all exercises
-def main():
-    users, questions, user_answers = get_data()
+def main(backend: str = ANALYTICS_BACKEND):
+    start_time = time.perf_counter()
+    (
+        (highest_scorer, highest_score),
+        (fastest_question, fastest_time),
+        (second_place_user, second_place_time),
+        avg_times,
+        success_rates,
+        all_answered_users,
+        (correct_median, incorrect_median),
+        reports
+    ) = run_exercises(backend)
+    elapsed = time.perf_counter() - start_time
 
     # Exercise 1
-    highest_scorer, highest_score = exercise_1(users, user_answers)
     print(
         f"Exercise 1: Highest scorer is {highest_scorer.first if highest_scorer else 'None'} {highest_scorer.last if highest_scorer else ''} with {highest_score} correct answers.")
 
     # Exercise 2
-    fastest_question, fastest_time = exercise_2(questions, user_answers)
     print(
         f"Exercise 2: Fastest question is '{fastest_question.question_text if fastest_question else 'None'}' answered in {fastest_time:.2f} seconds.")
 
     # Exercise 3
-    second_place_user, fastest_time = exercise_3(users, user_answers)
     print(
-        f"Exercise 3: Second place user is {second_place_user.first if second_place_user else 'None'} {second_place_user.last if second_place_user else ''} with a time of {fastest_time:.2f} seconds.")
+        f"Exercise 3: Second place user is {second_place_user.first if second_place_user else 'None'} {second_place_user.last if second_place_user else ''} with a time of {second_place_time:.2f} seconds.")
 
     # Exercise 4
-    avg_times = exercise_4(questions, user_answers)
     print("Exercise 4: Average time for each question:", avg_times)
 
     # Exercise 5
-    success_rates = exercise_5(questions, user_answers)
     print("Exercise 5: Success rates for each question:", success_rates)
 
     # Exercise 6
-    all_answered_users = exercise_6(users, questions, user_answers)
     print("Exercise 6: Users who answered all questions:", [f"{user.first} {user.last}" for user in all_answered_users])
 
     # Exercise 7
-    correct_median, incorrect_median = exercise_7(user_answers)
     print(
         f"Exercise 7: Median time for correct answers: {correct_median:.2f}s, incorrect answers: {incorrect_median:.2f}s")
 
     # Exercise 8
-    reports = exercise_8(users, questions, user_answers)
     print("Exercise 8: Reports exported to 'user_reports.csv'.")
+    print(f"Computed with the {backend} backend in {elapsed:.3f} seconds.")
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else ANALYTICS_BACKEND)
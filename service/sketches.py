@@ -0,0 +1,231 @@
+import math
+import random
+from typing import Dict, List
+
+from config.service_config import TIMING_SKETCH_K, QUESTION_SKETCH_K
+
+
+class RunningStats:
+    # Welford's running mean/variance; merge() uses Chan et al.'s pairwise update.
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, min: float = float('inf'),
+                 max: float = float('-inf')):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if value < self.min else self.min
+        self.max = value if value > self.max else self.max
+
+    def merge(self, other: 'RunningStats'):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningStats':
+        return cls(
+            count=data['count'],
+            mean=data['mean'],
+            m2=data['m2'],
+            min=data['min'] if data['min'] is not None else float('inf'),
+            max=data['max'] if data['max'] is not None else float('-inf')
+        )
+
+
+class QuantileSketch:
+    # KLL sketch (Karnin, Lang, Liberty 2016). Memory is O(k) regardless of the stream length, and with
+    # k=200 a quantile query lands within about 1.65% of the requested rank with 99% probability
+    # (e.g. p50 returns a value whose true rank is between p48.35 and p51.65). The bound shrinks roughly
+    # as 1/k, and merged sketches keep it.
+    _SHRINK = 2 / 3
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.count = 0
+        self.compactors: List[List[float]] = []
+        self._random = random.Random(seed)
+        self._size = 0
+        self._max_size = 0
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self._SHRINK ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            compactor = self.compactors[level]
+            if len(compactor) < self._capacity(level):
+                continue
+            if level + 1 == len(self.compactors):
+                self._grow()
+            compactor.sort()
+            # Keep one item back when the level is odd so the promoted weight stays exact
+            leftover = [compactor.pop()] if len(compactor) % 2 else []
+            offset = self._random.randint(0, 1)
+            self.compactors[level + 1].extend(compactor[offset::2])
+            self.compactors[level] = leftover
+            self._size = sum(len(c) for c in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def update(self, value: float):
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.count += other.count
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def quantile(self, q: float) -> float | None:
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        weighted = sorted(
+            (value, 1 << level)
+            for level, compactor in enumerate(self.compactors)
+            for value in compactor
+        )
+        if not weighted:
+            return None
+        total = sum(weight for _, weight in weighted)
+        target, cumulative = q * total, 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'count': self.count, 'compactors': [list(c) for c in self.compactors]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        sketch = cls(k=data['k'])
+        sketch.count = data['count']
+        sketch.compactors = []
+        for compactor in data['compactors']:
+            sketch._grow()
+            sketch.compactors[-1] = list(compactor)
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
+
+
+class TimingStats:
+    def __init__(self, k: int = 200, running: RunningStats = None, sketch: QuantileSketch = None):
+        self.running = running or RunningStats()
+        self.sketch = sketch or QuantileSketch(k)
+
+    def update(self, seconds: float):
+        self.running.update(seconds)
+        self.sketch.update(seconds)
+
+    def merge(self, other: 'TimingStats'):
+        self.running.merge(other.running)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def count(self) -> int:
+        return self.running.count
+
+    def percentiles(self) -> Dict[str, float | None]:
+        return {
+            'p50': self.sketch.quantile(0.5),
+            'p90': self.sketch.quantile(0.9),
+            'p99': self.sketch.quantile(0.99)
+        }
+
+    def to_dict(self) -> Dict:
+        return {'running': self.running.to_dict(), 'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TimingStats':
+        return cls(running=RunningStats.from_dict(data['running']), sketch=QuantileSketch.from_dict(data['sketch']))
+
+
+CORRECT_BUCKET = 'correct'
+INCORRECT_BUCKET = 'incorrect'
+
+
+def question_bucket(question_id: int) -> str:
+    return f"question:{question_id}"
+
+
+class TimingCollector:
+    # Per-question and per-correctness timing stats (running mean/variance plus a KLL quantile sketch)
+    def __init__(self, buckets: Dict[str, TimingStats] = None):
+        self.buckets = buckets or {}
+
+    def _bucket(self, name: str, k: int) -> TimingStats:
+        stats = self.buckets.get(name)
+        if stats is None:
+            stats = self.buckets[name] = TimingStats(k)
+        return stats
+
+    def update(self, question_id: int, is_correct: bool, seconds: float):
+        self._bucket(question_bucket(question_id), QUESTION_SKETCH_K).update(seconds)
+        self._bucket(CORRECT_BUCKET if is_correct else INCORRECT_BUCKET, TIMING_SKETCH_K).update(seconds)
+
+    def merge(self, other: 'TimingCollector'):
+        for name, stats in other.buckets.items():
+            if name in self.buckets:
+                self.buckets[name].merge(stats)
+            else:
+                self.buckets[name] = stats
+
+    def get(self, name: str) -> TimingStats | None:
+        return self.buckets.get(name)
+
+    def question(self, question_id: int) -> TimingStats | None:
+        return self.buckets.get(question_bucket(question_id))
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {name: stats.to_dict() for name, stats in self.buckets.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict]) -> 'TimingCollector':
+        return cls({name: TimingStats.from_dict(stats) for name, stats in data.items()})
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from model.Question import Question
+from model.User import User
+from repository.analytics_repository import (
+    find_highest_scorer,
+    find_fastest_answered_question,
+    find_second_place_user,
+    get_average_time_per_question,
+    get_success_rate_per_question,
+    get_users_who_answered_all_questions,
+    get_median_times,
+    get_user_reports
+)
+from service.reports import export_reports
+
+
+# Exercise 1: Find the highest scorer
+def exercise_1(since: datetime = None, until: datetime = None) -> Tuple[User, int]:
+    return find_highest_scorer(since, until)
+
+
+# Exercise 2: Find the question answered the fastest
+def exercise_2(since: datetime = None, until: datetime = None) -> Tuple[Question, float]:
+    return find_fastest_answered_question(since, until)
+
+
+# Exercise 3: Find second place user by correctness and fastest time
+def exercise_3(since: datetime = None, until: datetime = None) -> Tuple[User, float]:
+    return find_second_place_user(since, until)
+
+
+# Exercise 4: Calculate the average time per question
+def exercise_4(since: datetime = None, until: datetime = None) -> Dict[int, float]:
+    return get_average_time_per_question(since, until)
+
+
+# Exercise 5: Calculate the success rate for each question
+def exercise_5(since: datetime = None, until: datetime = None) -> Dict[int, float]:
+    return get_success_rate_per_question(since, until)
+
+
+# Exercise 6: Find users who answered all questions
+def exercise_6(since: datetime = None, until: datetime = None) -> List[User]:
+    return get_users_who_answered_all_questions(since, until)
+
+
+# Exercise 7: Median time for correct and incorrect answers
+def exercise_7(since: datetime = None, until: datetime = None) -> Tuple[float, float]:
+    return get_median_times(since, until)
+
+
+# Exercise 8: Generate comprehensive user reports
+def exercise_8(since: datetime = None, until: datetime = None) -> List[Dict]:
+    reports = get_user_reports(since, until)
+    export_reports(reports)
+    return reports
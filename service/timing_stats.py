@@ -0,0 +1,150 @@
+import atexit
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List
+
+from config.service_config import TIMING_FLUSH_INTERVAL
+from model.UserAnswer import UserAnswer
+from repository.timing_stats_repository import get_timing_stats, update_timing_stats, replace_timing_stats
+from repository.user_answer_repository import iter_user_answers, on_user_answers_written
+from service.sketches import TimingCollector, TimingStats
+
+logger = logging.getLogger(__name__)
+
+
+def _add_timings(collector: TimingCollector, user_answers: Iterable[UserAnswer]):
+    for answer in user_answers:
+        # Answers built in code may carry plain seconds instead of a timedelta
+        seconds = answer.time_taken.total_seconds() if isinstance(answer.time_taken, timedelta) \
+            else float(answer.time_taken)
+        collector.update(answer.question_id, answer.is_correct, seconds)
+
+def collect_timings(user_answers: Iterable[UserAnswer]) -> TimingCollector:
+    collector = TimingCollector()
+    _add_timings(collector, user_answers)
+    return collector
+
+
+def load_timings(buckets: Iterable[str] = None) -> TimingCollector:
+    return TimingCollector.from_dict(get_timing_stats(list(buckets) if buckets is not None else None))
+
+
+def save_timings(collector: TimingCollector):
+    # Merges freshly collected stats into whatever is already stored for the same buckets
+    def merge(stored: Dict[str, Dict]) -> Dict[str, Dict]:
+        merged = TimingCollector.from_dict(stored)
+        merged.merge(collector)
+        return {name: merged.buckets[name].to_dict() for name in collector.buckets}
+
+    if collector.buckets:
+        update_timing_stats(list(collector.buckets), merge)
+
+
+@dataclass
+class TimingRecorderStats:
+    pending_buckets: int
+    flushes: int
+    failed_flushes: int
+    last_error: str | None
+
+
+class TimingRecorder:
+    # Folds committed user answers into an in-memory collector, which a background thread merges into
+    # timing_stats every flush_interval seconds. Writers only touch process memory, and each process merges
+    # once per interval instead of once per write. A failed merge keeps its stats for the next attempt; if the
+    # process dies first they are lost, and rebuild_timings() recomputes them from the answers.
+    def __init__(self, flush_interval: float = TIMING_FLUSH_INTERVAL,
+                 save: Callable[[TimingCollector], None] = save_timings):
+        self.flush_interval = flush_interval
+        self._save = save
+        self._pending = TimingCollector()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._last_error = None
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        # Started by the first answer, so a recorder built before a fork gets its thread in the child
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='timing-recorder', daemon=True)
+            self._thread.start()
+
+    def record(self, user_answers: List[UserAnswer]):
+        with self._lock:
+            _add_timings(self._pending, user_answers)
+            if user_answers:
+                self._ensure_started()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> bool:
+        # False if the merge failed; its stats stay pending
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, TimingCollector()
+            if not pending.buckets:
+                return True
+            try:
+                self._save(pending)
+            except Exception as e:
+                logger.warning("Timing stats merge failed; %d buckets stay pending", len(pending.buckets),
+                               exc_info=True)
+                with self._lock:
+                    pending.merge(self._pending)
+                    self._pending = pending
+                    self._failed_flushes += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                return False
+            with self._lock:
+                self._flushes += 1
+            return True
+
+    def close(self) -> bool:
+        self._stopped.set()
+        if self._thread is not None and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+        return self.flush()
+
+    def stats(self) -> TimingRecorderStats:
+        with self._lock:
+            return TimingRecorderStats(
+                pending_buckets=len(self._pending.buckets),
+                flushes=self._flushes,
+                failed_flushes=self._failed_flushes,
+                last_error=self._last_error
+            )
+
+
+def rebuild_timings() -> TimingCollector:
+    collector = collect_timings(iter_user_answers())
+    replace_timing_stats(collector.to_dict())
+    return collector
+
+
+def timing_summary(stats: TimingStats) -> Dict:
+    return {'count': stats.count, 'mean': stats.running.mean, 'stdev': stats.running.stdev,
+            'min': stats.running.min, 'max': stats.running.max, **stats.percentiles()}
+
+
+timing_recorder = TimingRecorder()
+_tracking = False
+
+
+def track_timings():
+    # Called by each entry point that writes user answers, so their timings reach timing_stats
+    global _tracking
+    if not _tracking:
+        _tracking = True
+        on_user_answers_written(timing_recorder.record)
@@ -0,0 +1,223 @@
+import io
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model.Question import Question
+from model.User import User
+from model.UserAnswerBatch import UserAnswerBatch
+from repository.user_answer_repository import copy_user_answer_columns
+
+_LIMB_BITS = 26
+_EXACT_ROWS = 1 << 26
+
+
+@dataclass
+class AnswerColumns:
+    user_ids: np.ndarray
+    question_ids: np.ndarray
+    is_correct: np.ndarray
+    seconds: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @classmethod
+    def from_batch(cls, batch: UserAnswerBatch) -> 'AnswerColumns':
+        # The batch arrays expose their buffers, so the id and time columns are shared rather than copied
+        return cls(
+            user_ids=np.frombuffer(batch.user_ids, dtype=np.int64),
+            question_ids=np.frombuffer(batch.question_ids, dtype=np.int64),
+            is_correct=np.frombuffer(batch.is_correct, dtype=np.int8).astype(bool),
+            seconds=np.frombuffer(batch.seconds, dtype=np.float64)
+        )
+
+
+def load_answer_columns(since: datetime = None, until: datetime = None) -> AnswerColumns:
+    buffer = io.BytesIO()
+    copy_user_answer_columns(buffer, since, until)
+    if not buffer.tell():
+        return AnswerColumns(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, bool), np.empty(0, np.float64))
+    buffer.seek(0)
+    # round_trip parsing gives the same doubles as float() on the text, which is what psycopg2 returns
+    frame = pd.read_csv(buffer, header=None, names=['user_id', 'question_id', 'is_correct', 'seconds'],
+                        dtype={'user_id': np.int64, 'question_id': np.int64, 'is_correct': np.int8,
+                               'seconds': np.float64},
+                        float_precision='round_trip')
+    return AnswerColumns(
+        user_ids=frame['user_id'].to_numpy(),
+        question_ids=frame['question_id'].to_numpy(),
+        is_correct=frame['is_correct'].to_numpy().astype(bool),
+        seconds=frame['seconds'].to_numpy()
+    )
+
+
+class ExactSums:
+    # Exact per-group sums of float seconds, so means equal TimeTotal.mean and statistics.mean bit for bit.
+    # Scaled by the smallest unit in the data every value is an integer; it is cut once into signed 26-bit
+    # limbs, and each grouping sums the limbs with bincount (exact in float64 for up to 2**26 rows at a
+    # time) before recombining them as Python ints and dividing with a single rounding.
+    def __init__(self, values: np.ndarray):
+        self.limbs: List[Tuple[int, np.ndarray]] = []
+        magnitudes = np.abs(values)
+        nonzero = magnitudes > 0
+        if not nonzero.any():
+            self.lowest = 0
+            return
+        self.lowest = int(np.frexp(np.min(magnitudes, where=nonzero, initial=np.inf))[1]) - 53
+        top = int(np.frexp(magnitudes.max())[1]) - self.lowest
+        # Every step below is exact: scaling by powers of two, truncation, and differences that fit in 26 bits
+        scaled = np.ldexp(values, -self.lowest)
+        for position in range(0, top, _LIMB_BITS):
+            if position + _LIMB_BITS >= top:
+                self.limbs.append((position, scaled))
+                break
+            rest = np.trunc(scaled * 2.0 ** -_LIMB_BITS)
+            self.limbs.append((position, scaled - rest * 2.0 ** _LIMB_BITS))
+            scaled = rest
+
+    def means(self, codes: np.ndarray, counts: np.ndarray) -> List[float]:
+        totals = np.zeros(len(counts), dtype=object)
+        for position, limbs in self.limbs:
+            for start in range(0, len(codes), _EXACT_ROWS):
+                sums = np.bincount(codes[start:start + _EXACT_ROWS], weights=limbs[start:start + _EXACT_ROWS],
+                                   minlength=len(counts))
+                totals += sums.astype(np.int64).astype(object) << position
+        if self.lowest >= 0:
+            return [(total << self.lowest) / count if count else 0
+                    for total, count in zip(totals.tolist(), counts.tolist())]
+        return [total / (count << -self.lowest) if count else 0
+                for total, count in zip(totals.tolist(), counts.tolist())]
+
+
+def _group_extreme(codes: np.ndarray, values: np.ndarray, size: int, extreme: np.ufunc, initial: float) -> np.ndarray:
+    extremes = np.full(size, initial)
+    extreme.at(extremes, codes, values)
+    return extremes
+
+
+class ColumnAggregates:
+    # Per-user and per-question totals over the whole answer columns. Users and questions are numbered by
+    # first appearance, which is the order the python backend's dicts are filled in.
+    def __init__(self, columns: AnswerColumns):
+        self.columns = columns
+        user_codes, self.user_ids = pd.factorize(columns.user_ids)
+        question_codes, self.question_ids = pd.factorize(columns.question_ids)
+        self.user_index = pd.Index(self.user_ids)
+        self.question_index = pd.Index(self.question_ids)
+        users, questions = len(self.user_ids), len(self.question_ids)
+        correct = columns.is_correct
+        sums = ExactSums(columns.seconds)
+
+        self.user_answered = np.bincount(user_codes, minlength=users)
+        self.user_correct = np.bincount(user_codes, weights=correct, minlength=users).astype(np.int64)
+        self.user_min_time = _group_extreme(user_codes, columns.seconds, users, np.minimum, np.inf)
+        self.user_max_time = _group_extreme(user_codes, columns.seconds, users, np.maximum, -np.inf)
+        self.user_avg_time = sums.means(user_codes, self.user_answered)
+        # Distinct (user, question) pairs: pack both codes into one int64, sort, and keep the first of each run
+        bits = max(questions - 1, 0).bit_length()
+        pairs = np.sort((user_codes.astype(np.int64) << bits) | question_codes)
+        distinct = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))] if len(pairs) else pairs
+        self.user_distinct_questions = np.bincount(distinct >> bits, minlength=users)
+
+        self.question_answered = np.bincount(question_codes, minlength=questions)
+        self.question_correct = np.bincount(question_codes, weights=correct, minlength=questions).astype(np.int64)
+        self.question_min_correct_time = _group_extreme(question_codes, np.where(correct, columns.seconds, np.inf),
+                                                        questions, np.minimum, np.inf)
+        self.question_avg_time = sums.means(question_codes, self.question_answered)
+
+    def user_positions(self, users: List[User]) -> np.ndarray:
+        return self.user_index.get_indexer([user.id for user in users])
+
+    def question_positions(self, questions: List[Question]) -> np.ndarray:
+        return self.question_index.get_indexer([question.id for question in questions])
+
+
+def _per_item(positions: np.ndarray, values: np.ndarray, default) -> np.ndarray:
+    if not len(values):
+        return np.full(len(positions), default)
+    return np.where(positions >= 0, values[positions], default)
+
+
+def _median(values: np.ndarray) -> float:
+    return float(np.median(values)) if len(values) else 0
+
+
+# Exercise 1: Find the highest scorer
+def exercise_1(users: List[User], aggregates: ColumnAggregates) -> Tuple[User, int]:
+    if not len(aggregates.user_ids):
+        return None, 0
+    best = int(np.argmax(aggregates.user_correct))
+    user_id = int(aggregates.user_ids[best])
+    return next((user for user in users if user.id == user_id), None), int(aggregates.user_correct[best])
+
+
+# Exercise 2: Find the question answered the fastest
+def exercise_2(questions: List[Question], aggregates: ColumnAggregates) -> Tuple[Question, float]:
+    if not questions:
+        return None, 0
+    fastest = _per_item(aggregates.question_positions(questions), aggregates.question_min_correct_time, np.inf)
+    best = int(np.argmin(fastest))
+    return questions[best], float(fastest[best])
+
+
+# Exercise 3: Find second place user by correctness and fastest time
+def exercise_3(users: List[User], aggregates: ColumnAggregates) -> Tuple[User, float]:
+    if len(users) < 2:
+        return None, 0
+    positions = aggregates.user_positions(users)
+    correct = _per_item(positions, aggregates.user_correct, 0)
+    fastest = _per_item(positions, aggregates.user_min_time, np.inf)
+    # lexsort is stable, so ties keep the users' order just like the python backend's sort
+    second = int(np.lexsort((fastest, -correct))[1])
+    return users[second], float(fastest[second])
+
+
+# Exercise 4: Calculate the average time per question
+def exercise_4(questions: List[Question], aggregates: ColumnAggregates) -> Dict[int, float]:
+    positions = aggregates.question_positions(questions).tolist()
+    return {q.id: aggregates.question_avg_time[pos] if pos >= 0 else 0 for q, pos in zip(questions, positions)}
+
+
+# Exercise 5: Calculate the success rate for each question
+def exercise_5(questions: List[Question], aggregates: ColumnAggregates) -> Dict[int, float]:
+    positions = aggregates.question_positions(questions).tolist()
+    rates = (aggregates.question_correct / np.maximum(aggregates.question_answered, 1)).tolist()
+    return {q.id: rates[pos] if pos >= 0 else 0 for q, pos in zip(questions, positions)}
+
+
+# Exercise 6: Find users who answered all questions
+def exercise_6(users: List[User], questions: List[Question], aggregates: ColumnAggregates) -> List[User]:
+    answered = _per_item(aggregates.user_positions(users), aggregates.user_distinct_questions, 0)
+    return [user for user, count in zip(users, answered.tolist()) if count == len(questions)]
+
+
+# Exercise 7: Median time for correct and incorrect answers
+def exercise_7(aggregates: ColumnAggregates) -> Tuple[float, float]:
+    columns = aggregates.columns
+    return _median(columns.seconds[columns.is_correct]), _median(columns.seconds[~columns.is_correct])
+
+
+# Exercise 8: Generate comprehensive user reports
+def iter_user_reports(users: List[User], total_questions: int, aggregates: ColumnAggregates) -> Iterator[Dict]:
+    positions = aggregates.user_positions(users).tolist()
+    answered = aggregates.user_distinct_questions.tolist()
+    correct = aggregates.user_correct.tolist()
+    fastest = aggregates.user_min_time.tolist()
+    slowest = aggregates.user_max_time.tolist()
+    for user, pos in zip(users, positions):
+        answered_questions = answered[pos] if pos >= 0 else 0
+        yield {
+            'user_id': user.id,
+            'name': f"{user.first} {user.last}",
+            'total_questions': total_questions,
+            'answered_questions': answered_questions,
+            'correct_answers': correct[pos] if pos >= 0 else 0,
+            'avg_time': aggregates.user_avg_time[pos] if pos >= 0 else 0,
+            'fastest_answer': fastest[pos] if pos >= 0 else 0,
+            'slowest_answer': slowest[pos] if pos >= 0 else 0,
+            'unanswered_questions': total_questions - answered_questions
+        }
@@ -0,0 +1,194 @@
+import random
+import statistics as s
+from datetime import timedelta
+
+import pytest
+
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from service import service
+from service.analytics import aggregate_answers
+
+
+def _answer(user_id, question_id, is_correct, seconds):
+    return UserAnswer(user_id=user_id, question_id=question_id, answer_text="answer", is_correct=is_correct,
+                      time_taken=timedelta(seconds=seconds))
+
+
+def test_user_aggregates():
+    aggregates = aggregate_answers([
+        _answer(1, 1, True, 2.5),
+        _answer(1, 2, False, 4.0),
+        _answer(1, 2, True, 1.5),
+        _answer(2, 1, False, 3.0)
+    ])
+    user_stats = aggregates.users[1]
+    assert user_stats.answered == 3
+    assert user_stats.correct == 2
+    assert user_stats.min_time == 1.5
+    assert user_stats.max_time == 4.0
+    assert user_stats.question_ids == {1, 2}
+    assert aggregates.users[2].correct == 0
+
+
+def test_question_aggregates():
+    aggregates = aggregate_answers([
+        _answer(1, 1, True, 2.5),
+        _answer(2, 1, True, 1.0),
+        _answer(3, 1, False, 0.5)
+    ])
+    question_stats = aggregates.questions[1]
+    assert question_stats.answered == 3
+    assert question_stats.correct == 2
+    assert question_stats.min_correct_time == 1.0
+    assert aggregates.correct_times == [2.5, 1.0]
+    assert aggregates.incorrect_times == [0.5]
+
+
+def test_avg_time_matches_statistics_mean():
+    times = [0.1, 0.2, 0.3, 1e-6, 12345.678901]
+    aggregates = aggregate_answers([_answer(1, 1, True, t) for t in times])
+    expected = s.mean([timedelta(seconds=t).total_seconds() for t in times])
+    assert aggregates.users[1].avg_time == expected
+    assert aggregates.questions[1].avg_time == expected
+
+
+# The per-exercise implementations the aggregates replaced, kept as the reference the single pass must match
+def _old_exercise_1(users, user_answers):
+    user_scores = {
+        answer.user_id: sum(1 for ans in user_answers if ans.is_correct and ans.user_id == answer.user_id)
+        for answer in user_answers
+    }
+    highest_score_user_id = max(user_scores, key=user_scores.get, default=None)
+    highest_score_user = next((user for user in users if user.id == highest_score_user_id), None)
+    return highest_score_user, user_scores.get(highest_score_user_id, 0)
+
+def _old_exercise_2(questions, user_answers):
+    fastest_times = {
+        q.id: min(
+            (answer.time_taken.total_seconds() for answer in user_answers if
+             answer.is_correct and answer.question_id == q.id),
+            default=float('inf')
+        )
+        for q in questions
+    }
+    fastest_question_id = min(fastest_times, key=fastest_times.get, default=None)
+    fastest_question = next((q for q in questions if q.id == fastest_question_id), None)
+    return fastest_question, fastest_times.get(fastest_question_id, 0)
+
+def _old_exercise_3(users, user_answers):
+    user_scores = {
+        user.id: {
+            'correct': sum(1 for ans in user_answers if ans.is_correct and ans.user_id == user.id),
+            'fastest': min((ans.time_taken.total_seconds() for ans in user_answers if ans.user_id == user.id),
+                           default=float('inf'))
+        }
+        for user in users
+    }
+    sorted_users = sorted(user_scores.items(), key=lambda x: (x[1]['correct'], -x[1]['fastest']), reverse=True)
+    second_place_user_id = sorted_users[1][0] if len(sorted_users) > 1 else None
+    second_place_user = next((user for user in users if user.id == second_place_user_id), None)
+    return second_place_user, user_scores.get(second_place_user_id, {}).get('fastest', 0)
+
+def _old_exercise_4(questions, user_answers):
+    return {
+        q.id: s.mean([ans.time_taken.total_seconds() for ans in user_answers if ans.question_id == q.id])
+        if any(ans.question_id == q.id for ans in user_answers) else 0
+        for q in questions
+    }
+
+def _old_exercise_5(questions, user_answers):
+    question_success = {q.id: {'correct': 0, 'total': 0} for q in questions}
+    for answer in user_answers:
+        question_success[answer.question_id]['total'] += 1
+        if answer.is_correct:
+            question_success[answer.question_id]['correct'] += 1
+    return {
+        q_id: (stats['correct'] / stats['total']) if stats['total'] > 0 else 0
+        for q_id, stats in question_success.items()
+    }
+
+def _old_exercise_6(users, questions, user_answers):
+    return [
+        user for user in users
+        if len(set(ans.question_id for ans in user_answers if ans.user_id == user.id)) == len(questions)
+    ]
+
+def _old_exercise_7(user_answers):
+    correct_times = [ans.time_taken.total_seconds() for ans in user_answers if ans.is_correct]
+    incorrect_times = [ans.time_taken.total_seconds() for ans in user_answers if not ans.is_correct]
+    return (s.median(correct_times) if correct_times else 0, s.median(incorrect_times) if incorrect_times else 0)
+
+def _old_exercise_8(users, questions, user_answers):
+    total_questions = len(questions)
+
+    def generate_report(user):
+        user_answers_for_user = [ans for ans in user_answers if ans.user_id == user.id]
+        answered_questions = len(set(ans.question_id for ans in user_answers_for_user))
+        correct_answers = sum(1 for ans in user_answers_for_user if ans.is_correct)
+        times = [ans.time_taken.total_seconds() for ans in user_answers_for_user]
+        return {
+            'user_id': user.id,
+            'name': f"{user.first} {user.last}",
+            'total_questions': total_questions,
+            'answered_questions': answered_questions,
+            'correct_answers': correct_answers,
+            'avg_time': s.mean(times) if times else 0,
+            'fastest_answer': min(times) if times else 0,
+            'slowest_answer': max(times) if times else 0,
+            'unanswered_questions': total_questions - answered_questions
+        }
+
+    return list(map(generate_report, users))
+
+
+def _seeded(seed: int):
+    rng = random.Random(seed)
+    users = [User(first=f"First{idx}", last=f"Last{idx}", email=f"user{idx}@example.com", id=idx)
+             for idx in range(1, 21)]
+    questions = [Question(question_text=f"Question {idx}?", correct_answer="yes", id=idx) for idx in range(1, 9)]
+    # Users 18-20 and question 8 get no answers, and whole tenths of a second make ties in times likely.
+    # User 1 answers questions 1-7, so exercise 6 finds someone once question 8 is left out.
+    answers = [_answer(1, question_id, True, 0.5) for question_id in range(1, 8)]
+    answers += [_answer(rng.randint(1, 17), rng.randint(1, 7), rng.random() < 0.5, rng.randint(1, 40) / 10)
+                for _ in range(300)]
+    rng.shuffle(answers)
+    return users, questions, answers
+
+
+def _assert_parity(users, questions, answers):
+    aggregates = aggregate_answers(answers)
+    assert service.exercise_1(users, answers, aggregates) == _old_exercise_1(users, answers)
+    assert service.exercise_2(questions, answers, aggregates) == _old_exercise_2(questions, answers)
+    assert service.exercise_3(users, answers, aggregates) == _old_exercise_3(users, answers)
+    assert service.exercise_4(questions, answers, aggregates) == _old_exercise_4(questions, answers)
+    assert service.exercise_5(questions, answers, aggregates) == _old_exercise_5(questions, answers)
+    assert service.exercise_6(users, questions, answers, aggregates) == _old_exercise_6(users, questions, answers)
+    assert service.exercise_7(answers, aggregates) == _old_exercise_7(answers)
+    assert service.exercise_8(users, questions, answers, aggregates) == _old_exercise_8(users, questions, answers)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_single_pass_matches_per_exercise_implementations(seed, tmp_path, monkeypatch):
+    # exercise_8 writes user_reports.csv to the working directory
+    monkeypatch.chdir(tmp_path)
+    users, questions, answers = _seeded(seed)
+    _assert_parity(users, questions, answers)
+    _assert_parity(users, questions[:-1], answers)
+
+
+def test_single_pass_breaks_ties_like_per_exercise_implementations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    users, questions, _ = _seeded(0)
+    # Users 2 and 3 tie on score and fastest time, questions 1 and 2 on fastest correct time
+    answers = [_answer(2, 1, True, 1.0), _answer(3, 2, True, 1.0), _answer(3, 1, False, 2.0),
+               _answer(2, 2, False, 2.0), _answer(1, 3, False, 1.0)]
+    _assert_parity(users, questions, answers)
+
+
+def test_single_pass_matches_per_exercise_implementations_without_answers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    users, questions, _ = _seeded(0)
+    _assert_parity(users, questions, [])
+    _assert_parity([], [], [])
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from repository.database import create_tables, drop_all_tables
+from repository.question_repository import create_question
+from repository.user_answer_repository import create_user_answer
+from repository.user_repository import create_user
+from repository.analytics_repository import (
+    find_highest_scorer,
+    find_fastest_answered_question,
+    find_second_place_user,
+    get_success_rate_per_question,
+    get_users_who_answered_all_questions,
+    get_median_times
+)
+
+
+@pytest.fixture(scope="module")
+def setup_database():
+    drop_all_tables()
+    create_tables()
+    first_user = create_user(User(first="first", last="user", email="first@gmail.com"))
+    second_user = create_user(User(first="second", last="user", email="second@gmail.com"))
+    first_question = create_question(Question(question_text="What is 2 + 2?", correct_answer="4"))
+    second_question = create_question(Question(question_text="What is 3 + 3?", correct_answer="6"))
+    for user_id, question_id, is_correct, seconds in [
+        (first_user, first_question, True, 2),
+        (first_user, second_question, True, 4),
+        (second_user, first_question, False, 1),
+        (second_user, second_question, True, 3)
+    ]:
+        create_user_answer(UserAnswer(user_id=user_id, question_id=question_id, answer_text="answer",
+                                      is_correct=is_correct, time_taken=timedelta(seconds=seconds)))
+    yield first_user, second_user, first_question, second_question
+
+
+def test_find_highest_scorer(setup_database):
+    first_user, _, _, _ = setup_database
+    user, score = find_highest_scorer()
+    assert user.id == first_user
+    assert score == 2
+
+
+def test_find_fastest_answered_question(setup_database):
+    _, _, first_question, _ = setup_database
+    question, fastest = find_fastest_answered_question()
+    assert question.id == first_question
+    assert fastest == 2.0
+
+
+def test_find_second_place_user(setup_database):
+    _, second_user, _, _ = setup_database
+    user, fastest = find_second_place_user()
+    assert user.id == second_user
+    assert fastest == 1.0
+
+
+def test_get_success_rate_per_question(setup_database):
+    _, _, first_question, second_question = setup_database
+    assert get_success_rate_per_question() == {first_question: 0.5, second_question: 1.0}
+
+
+def test_get_users_who_answered_all_questions(setup_database):
+    assert len(get_users_who_answered_all_questions()) == 2
+
+
+def test_get_median_times(setup_database):
+    assert get_median_times() == (3.0, 1.0)
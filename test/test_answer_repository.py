@@ -1,48 +1,90 @@
 import pytest
 from model.Answer import Answer
-from repository.database import create_tables, get_db_connection
-from repository.answer_repository import create_answer, get_all_answers, find_answer_by_id, update_answer, delete_answer
+from model.Question import Question
+from repository.database import create_tables, drop_all_tables, get_db_connection
+from repository.question_repository import create_question
+from repository.storage import STORAGE_BACKENDS, use_backend
+from repository.answer_repository import create_answer, get_all_answers, find_answer_by_id, update_answer, delete_answer, \
+    get_answers_by_question_id, get_answers_by_question_ids, create_answers
 
 
-@pytest.fixture(scope="module")
-def setup_database():
+@pytest.fixture(scope="module", params=STORAGE_BACKENDS)
+def setup_database(request):
+    use_backend(request.param)
+    if request.param == 'sqlite':
+        drop_all_tables()
     create_tables()
-    yield
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    cursor.execute("DROP TABLE answer CASCADE")
-    connection.commit()
-    cursor.close()
-    connection.close()
+    yield create_question(Question(question_text="Answered?", correct_answer="yes"))
+    if request.param == 'postgres':
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE answer CASCADE")
+        connection.commit()
+        cursor.close()
+        connection.close()
+    else:
+        drop_all_tables()
+    use_backend('postgres')
 
 
 def test_create_answer(setup_database):
-    answer = Answer(question_id=1, incorrect_answer="Wrong Answer")
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Wrong Answer")
     new_id = create_answer(answer)
     assert new_id > 0
 
 
+def test_create_answers(setup_database):
+    question_id = setup_database
+    answers = [Answer(question_id=question_id, incorrect_answer=f"Bulk Answer {i}") for i in range(3)]
+    new_ids = create_answers(answers)
+    assert len(new_ids) == 3
+    for new_id, answer in zip(new_ids, answers):
+        assert find_answer_by_id(new_id).incorrect_answer == answer.incorrect_answer
+
+
 def test_get_all_answers(setup_database):
-    answer = Answer(question_id=1, incorrect_answer="Wrong Answer")
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Wrong Answer")
     create_answer(answer)
     answers = get_all_answers()
     assert len(answers) > 0
     assert isinstance(answers[0], Answer)
 
 
+def test_get_answers_by_question_id(setup_database):
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Scoped Answer")
+    new_id = create_answer(answer)
+    answers = get_answers_by_question_id(question_id)
+    assert new_id in [a.id for a in answers]
+    assert all(a.question_id == question_id for a in answers)
+
+
+def test_get_answers_by_question_ids(setup_database):
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Batched Answer")
+    create_answer(answer)
+    answers_by_question = get_answers_by_question_ids([question_id, 999])
+    assert len(answers_by_question[question_id]) > 0
+    assert answers_by_question[999] == []
+
+
 def test_find_answer_by_id(setup_database):
-    answer = Answer(question_id=1, incorrect_answer="Another Wrong Answer")
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Another Wrong Answer")
     new_id = create_answer(answer)
     found_answer = find_answer_by_id(new_id)
     assert found_answer is not None
-    assert found_answer.question_id == 1
+    assert found_answer.question_id == question_id
     assert found_answer.incorrect_answer == "Another Wrong Answer"
 
 
 def test_update_answer(setup_database):
-    answer = Answer(question_id=1, incorrect_answer="Old Answer")
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Old Answer")
     new_id = create_answer(answer)
-    updated_answer = Answer(question_id=1, incorrect_answer="Updated Answer")
+    updated_answer = Answer(question_id=question_id, incorrect_answer="Updated Answer")
     update_success = update_answer(new_id, updated_answer)
     assert update_success
     updated_answer_in_db = find_answer_by_id(new_id)
@@ -51,7 +93,8 @@ def test_update_answer(setup_database):
 
 
 def test_delete_answer(setup_database):
-    answer = Answer(question_id=1, incorrect_answer="Delete Me")
+    question_id = setup_database
+    answer = Answer(question_id=question_id, incorrect_answer="Delete Me")
     new_id = create_answer(answer)
     created_answer = find_answer_by_id(new_id)
     assert created_answer is not None
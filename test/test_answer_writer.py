@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+from datetime import timedelta
+
+import pytest
+from psycopg2 import IntegrityError, OperationalError
+
+from model.UserAnswer import UserAnswer
+from repository.storage import use_backend
+from service.answer_writer import AnswerQueueFull, AnswerWriter
+
+
+def _answer(user_id: int = 1, key: str = None) -> UserAnswer:
+    return UserAnswer(user_id=user_id, question_id=1, answer_text="yes", is_correct=True,
+                      time_taken=timedelta(seconds=1), idempotency_key=key)
+
+
+class FakeStore:
+    def __init__(self, failures: int = 0, refused_user: int = None, refusal: type = IntegrityError,
+                 failure: type = OperationalError):
+        self.rows = {}
+        self.batches = []
+        self.failures = failures
+        self.refused_user = refused_user
+        self.refusal = refusal
+        self.failure = failure
+        self.release = threading.Event()
+        self.release.set()
+
+    def insert(self, batch):
+        self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise self.failure("database is away")
+        if any(row.user_id == self.refused_user for row in batch):
+            raise self.refusal("violates foreign key constraint")
+        self.batches.append(len(batch))
+        new_ids = []
+        for row in batch:
+            if row.idempotency_key in self.rows:
+                new_ids.append(None)
+            else:
+                self.rows[row.idempotency_key] = row
+                new_ids.append(len(self.rows))
+        return new_ids
+
+
+def test_batches_fill_up_to_batch_size():
+    store = FakeStore()
+    store.release.clear()
+    writer = AnswerWriter(batch_size=3, flush_interval=10, insert=store.insert)
+    keys = [writer.submit(_answer()) for _ in range(7)]
+    store.release.set()
+    assert writer.flush(timeout=5)
+    assert sum(store.batches) == 7 and max(store.batches) <= 3
+    assert sorted(store.rows) == sorted(keys)
+    assert writer.close()
+
+
+def test_backpressure_rejects_when_full():
+    store = FakeStore()
+    store.release.clear()
+    writer = AnswerWriter(max_size=2, batch_size=1, flush_interval=0, put_timeout=0.05, insert=store.insert)
+    writer.submit(_answer())
+    # The first answer may already be in flight, so fill the queue itself before expecting a rejection
+    while writer.depth:
+        pass
+    writer.submit(_answer())
+    writer.submit(_answer())
+    with pytest.raises(AnswerQueueFull):
+        writer.submit(_answer())
+    assert writer.stats().rejected == 1
+    store.release.set()
+    assert writer.close(timeout=5)
+    assert len(store.rows) == 3
+
+
+def test_failed_batches_are_retried_without_duplicates():
+    store = FakeStore(failures=2)
+    writer = AnswerWriter(retry_backoff=0.001, insert=store.insert)
+    writer.submit(_answer(key="same"))
+    writer.submit(_answer(key="same"))
+    writer.submit(_answer(key="other"))
+    assert writer.close(timeout=5)
+    stats = writer.stats()
+    assert sorted(store.rows) == ["other", "same"]
+    assert stats.failed_attempts == 2
+    assert stats.written == 2 and stats.duplicates == 1
+    assert stats.last_error == "OperationalError: database is away"
+
+
+def test_batches_are_lost_after_max_attempts():
+    store = FakeStore(failures=3)
+    writer = AnswerWriter(retry_backoff=0.001, max_attempts=3, insert=store.insert)
+    writer.submit(_answer())
+    writer.submit(_answer())
+    assert writer.close(timeout=5)
+    stats = writer.stats()
+    assert not store.rows
+    assert stats.failed_attempts == 3
+    assert stats.lost == 2 and stats.written == 0 and stats.duplicates == 0
+
+
+def test_only_transient_errors_are_retried():
+    store = FakeStore(failures=1, failure=ValueError)
+    writer = AnswerWriter(retry_backoff=0.001, insert=store.insert)
+    writer.submit(_answer())
+    assert writer.flush(timeout=5)
+    writer.submit(_answer())
+    assert writer.close(timeout=5)
+    stats = writer.stats()
+    assert stats.failed_attempts == 0
+    assert stats.lost == 1 and stats.written == 1
+    assert stats.last_error == "ValueError: database is away"
+
+
+def test_refused_rows_do_not_block_their_batch():
+    store = FakeStore(refused_user=2)
+    store.release.clear()
+    writer = AnswerWriter(flush_interval=10, insert=store.insert)
+    for user_id in (1, 2, 3):
+        writer.submit(_answer(user_id))
+    store.release.set()
+    assert writer.close(timeout=5)
+    assert sorted(row.user_id for row in store.rows.values()) == [1, 3]
+    assert writer.stats().dropped == 1
+
+
+def test_refused_rows_follow_the_storage_backend():
+    use_backend('sqlite')
+    try:
+        store = FakeStore(refused_user=2, refusal=sqlite3.IntegrityError)
+        writer = AnswerWriter(retry_backoff=0.001, insert=store.insert)
+        for user_id in (1, 2):
+            writer.submit(_answer(user_id))
+        assert writer.close(timeout=5)
+        assert writer.stats().dropped == 1 and writer.stats().failed_attempts == 0
+    finally:
+        use_backend('postgres')
+
+
+def test_closed_writer_refuses_answers():
+    writer = AnswerWriter(insert=FakeStore().insert)
+    writer.close()
+    with pytest.raises(AnswerQueueFull):
+        writer.submit(_answer())
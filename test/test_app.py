@@ -0,0 +1,228 @@
+import sqlite3
+import sys
+
+import pytest
+import app as app_module
+from app import create_app, init_worker, worker_count
+from controllers.bulk import bulk_create
+from metrics import instrument as metrics
+from repository.database import create_tables
+from repository.storage import use_backend
+from service.game_store import InMemoryGameStore
+from service.timing_stats import timing_recorder
+
+
+@pytest.fixture(scope="module")
+def client():
+    create_tables()
+    init_worker()
+    return create_app({'TESTING': True}).test_client()
+
+
+def test_registers_blueprints(client):
+    rules = {rule.rule for rule in client.application.url_map.iter_rules()}
+    assert {"/questions", "/users", "/answers", "/user-answers", "/leaderboard", "/reports/users", "/health"} <= rules
+
+
+def test_health(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json['status'] == "ok"
+
+
+def test_answer_routes(client):
+    question_id = client.post("/questions", json={"question_text": "App question?", "correct_answer": "yes"}).json['id']
+    response = client.post("/answers", json={"question_id": question_id, "incorrect_answer": "no"})
+    assert response.status_code == 201
+    answers = client.get(f"/questions/{question_id}/answers").json
+    assert [answer['incorrect_answer'] for answer in answers] == ["no"]
+    assert client.delete(f"/answers/{response.json['id']}").status_code == 200
+    assert client.get(f"/answers/{response.json['id']}").status_code == 404
+
+
+def test_user_answer_routes(client):
+    user_id = client.post("/users", json={"first": "app", "last": "player", "email": "app@gmail.com"}).json['id']
+    question_id = client.post("/questions", json={"question_text": "App answer?", "correct_answer": "yes"}).json['id']
+    response = client.post("/user-answers", json={"user_id": user_id, "question_id": question_id,
+                                                  "answer_text": "yes", "is_correct": True, "time_taken": 1.25})
+    assert response.status_code == 201
+    user_answer = client.get(f"/user-answers/{response.json['id']}").json
+    assert user_answer['time_taken'] == 1.25
+    page = client.get("/user-answers?limit=1").json
+    assert len(page['items']) == 1
+    assert client.get(f"/leaderboard/{user_id}").status_code == 200
+    assert client.post("/user-answers", json={"user_id": user_id}).status_code == 400
+    keyed = {"user_id": user_id, "question_id": question_id, "answer_text": "yes", "is_correct": True,
+             "time_taken": 1, "idempotency_key": "sync-1"}
+    assert client.post("/user-answers", json=keyed).status_code == 201
+    assert client.post("/user-answers", json=keyed).status_code == 409
+    assert client.post("/user-answers", json={**keyed, "idempotency_key": None, "user_id": 10 ** 9}).status_code == 409
+
+
+def test_question_timings_follow_every_write(client):
+    user_id = client.post("/users", json={"first": "timed", "last": "player", "email": "timed@gmail.com"}).json['id']
+    question_id = client.post("/questions", json={"question_text": "Timed?", "correct_answer": "yes"}).json['id']
+    assert client.get(f"/questions/{question_id}/timings").status_code == 404
+    client.post("/user-answers", json={"user_id": user_id, "question_id": question_id, "answer_text": "yes",
+                                       "is_correct": True, "time_taken": 1})
+    client.post("/user-answers", json=[
+        {"user_id": user_id, "question_id": question_id, "answer_text": "no", "is_correct": False, "time_taken": 3}
+        for _ in range(2)
+    ])
+    assert timing_recorder.flush()
+    timings = client.get(f"/questions/{question_id}/timings").json
+    assert timings['count'] == 3
+    assert timings['min'] == 1 and timings['max'] == 3 and timings['p50'] == 3
+
+
+def test_time_window_routes(client):
+    user_id = client.post("/users", json={"first": "window", "last": "player", "email": "window@gmail.com"}).json['id']
+    question_id = client.post("/questions", json={"question_text": "Window?", "correct_answer": "yes"}).json['id']
+    client.post("/user-answers", json={"user_id": user_id, "question_id": question_id, "answer_text": "yes",
+                                       "is_correct": True, "time_taken": 0.5})
+    recent = client.get("/user-answers?window=1h").json
+    assert user_id in {user_answer['user_id'] for user_answer in recent}
+    assert all(user_answer['answered_at'] for user_answer in recent)
+    assert user_id in {entry['user_id'] for entry in client.get("/leaderboard?window=24h&limit=1000").json}
+    assert client.get("/leaderboard?since=2000-01-01T00:00:00&until=2000-01-02T00:00:00").json == []
+    assert client.get("/leaderboard?window=soon").status_code == 400
+    assert client.get("/user-answers?since=yesterday").status_code == 400
+    assert client.get("/reports/users?window=24h").status_code == 200
+
+
+def test_report_route_rejects_bad_options_before_streaming(client, monkeypatch):
+    assert client.get("/reports/users?gzip=maybe").status_code == 400
+    assert client.get("/reports/users?format=xlsx").status_code == 400
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    response = client.get("/reports/users?format=parquet")
+    assert response.status_code == 400
+    assert "requires pyarrow" in response.json['error']
+
+
+
+def test_queued_user_answer_route(client):
+    from service.answer_writer import answer_writer
+
+    user_id = client.post("/users", json={"first": "queued", "last": "player", "email": "queued@gmail.com"}).json['id']
+    question_id = client.post("/questions", json={"question_text": "Queued?", "correct_answer": "yes"}).json['id']
+    body = {"user_id": user_id, "question_id": question_id, "answer_text": "yes", "is_correct": True,
+            "time_taken": 0.75}
+    for _ in range(2):
+        response = client.post("/user-answers?async=true", json=body, headers={"Idempotency-Key": "queued-1"})
+        assert response.status_code == 202
+        assert response.json['idempotency_key'] == "queued-1"
+    assert client.post("/user-answers?async=true", json={**body, "is_correct": 1}).status_code == 400
+    assert answer_writer.flush(timeout=5)
+    answers = [answer for answer in client.get("/user-answers").json if answer['user_id'] == user_id]
+    assert len(answers) == 1
+    assert answers[0]['time_taken'] == 0.75
+
+
+def test_bulk_create_routes(client):
+    users = [{"first": "bulk", "last": f"user{idx}", "email": f"bulk{idx}@gmail.com"} for idx in range(3)]
+    response = client.post("/users", json=users)
+    assert response.status_code == 201
+    user_ids = response.json['ids']
+    assert [client.get(f"/users/{user_id}").json['last'] for user_id in user_ids] == ["user0", "user1", "user2"]
+
+    response = client.post("/questions", json=[
+        {"question_text": "Bulk one?", "correct_answer": "yes", "incorrect_answers": ["no", "maybe"]},
+        {"question_text": "Bulk two?", "correct_answer": "yes"}
+    ])
+    assert response.status_code == 201
+    question_ids = response.json['ids']
+    answers = client.get(f"/questions/{question_ids[0]}/answers").json
+    assert sorted(answer['incorrect_answer'] for answer in answers) == ["maybe", "no"]
+
+    response = client.post("/answers", json=[{"question_id": question_ids[1], "incorrect_answer": "no"}])
+    assert response.status_code == 201
+
+    response = client.post("/user-answers", json=[
+        {"user_id": user_id, "question_id": question_ids[0], "answer_text": "yes", "is_correct": True,
+         "time_taken": 2.5}
+        for user_id in user_ids
+    ])
+    assert response.status_code == 201
+    assert client.get(f"/user-answers/{response.json['ids'][-1]}").json['user_id'] == user_ids[-1]
+
+
+def test_bulk_create_reports_every_invalid_item(client):
+    response = client.post("/users", json=[
+        {"first": "ok", "last": "user", "email": "ok@gmail.com"},
+        {"first": "", "last": "user", "email": "empty@gmail.com"},
+        {"first": "extra", "last": "user", "email": "extra@gmail.com", "age": 3},
+        "not an object"
+    ])
+    assert response.status_code == 400
+    assert [error['index'] for error in response.json['errors']] == [1, 2, 3]
+    assert client.get("/users?stream=json").json[-1]['email'] != "ok@gmail.com"
+
+    question_id = client.post("/questions", json={"question_text": "Bulk refs?", "correct_answer": "yes"}).json['id']
+    response = client.post("/user-answers", json=[
+        {"user_id": 999999, "question_id": question_id, "answer_text": "yes", "is_correct": True, "time_taken": 1},
+        {"user_id": 999999, "question_id": 999999, "answer_text": "yes", "is_correct": "yes", "time_taken": 1}
+    ])
+    assert response.status_code == 400
+    assert response.json['errors'] == [{"index": 1, "error": "is_correct must be a boolean"}]
+    response = client.post("/user-answers", json=[
+        {"user_id": 999999, "question_id": question_id, "answer_text": "yes", "is_correct": True, "time_taken": 1}
+    ])
+    assert response.json['errors'] == [{"index": 0, "error": "user_id 999999 does not exist"}]
+    assert client.post("/answers", json=[]).status_code == 400
+
+def test_bulk_create_conflicts_on_either_backend(client):
+    def create(items):
+        # A referenced row deleted between the check and the insert
+        raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+    use_backend('sqlite')
+    try:
+        with client.application.app_context():
+            response, status = bulk_create([{}], dict, create, "rows")
+    finally:
+        use_backend('postgres')
+    assert status == 409
+    assert response.json['error'] == "FOREIGN KEY constraint failed"
+
+def test_game_routes(client):
+    user_id = client.post("/users", json={"first": "game", "last": "player", "email": "game@gmail.com"}).json['id']
+    question_id = client.post("/questions", json={"question_text": "Game question?", "correct_answer": "yes"}).json['id']
+    client.post("/answers", json={"question_id": question_id, "incorrect_answer": "no"})
+    response = client.post("/games", json={"user_id": user_id, "question_ids": [question_id]})
+    assert response.status_code == 201
+    game_id = response.json['game_id']
+    assert client.post(f"/games/{game_id}/answer", json={"option_index": 0}).status_code == 400
+    question = client.get(f"/games/{game_id}/question").json
+    assert question['question_id'] == question_id
+    option_index = question['options'].index("yes")
+    result = client.post(f"/games/{game_id}/answer", json={"option_index": option_index}).json
+    assert result['is_correct'] and result['finished']
+    assert result['time_taken'] >= 0
+    assert client.get(f"/games/{game_id}/question").json['correct_answers'] == 1
+    assert client.delete(f"/games/{game_id}").status_code == 200
+    assert client.get(f"/games/{game_id}").status_code == 404
+    assert client.post("/games", json={"user_id": 10 ** 9}).status_code == 404
+    for question_ids in ("1", [], [question_id, "2"], [True], [0], [question_id] * 101):
+        assert client.post("/games", json={"user_id": user_id, "question_ids": question_ids}).status_code == 400
+
+
+def test_metrics_route(client):
+    metrics.reset()
+    metrics.enable()
+    try:
+        client.get("/users?limit=1")
+        text = client.get("/metrics").get_data(as_text=True)
+    finally:
+        metrics.disable()
+    assert 'trivia_http_request_seconds_count{method="GET",route="/users",status="200"} 1' in text
+    assert 'trivia_repository_call_seconds_count{function="user_repository.get_users_page"} 1' in text
+    assert 'trivia_db_connections_opened_total' in text
+    assert 'trivia_sql_statement_seconds_bucket' in text
+
+
+def test_in_memory_games_refuse_several_workers(monkeypatch):
+    assert worker_count(9) == 9
+    monkeypatch.setattr(app_module, 'game_store', InMemoryGameStore())
+    with pytest.raises(ValueError):
+        worker_count(9)
+    assert worker_count(1) == 1
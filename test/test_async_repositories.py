@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import psycopg
+import pytest
+from async_app import create_async_app
+from model.Answer import Answer
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from repository import async_answer_repository, async_question_repository, async_user_answer_repository, \
+    async_user_repository
+from repository.async_database import close_async_pool
+from repository.database import create_tables
+
+
+def _run(coroutine):
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await close_async_pool()
+    return asyncio.run(run())
+
+
+@pytest.fixture(scope="module")
+def setup_database():
+    create_tables()
+    yield
+
+
+def test_user_crud(setup_database):
+    async def scenario():
+        user_id = await async_user_repository.create_user(User(first="async", last="user", email="async@gmail.com"))
+        assert (await async_user_repository.find_user_by_id(user_id)).email == "async@gmail.com"
+        assert await async_user_repository.update_user(user_id, User(first="async", last="updated", email="a@b.com"))
+        assert (await async_user_repository.find_user_by_id(user_id)).last == "updated"
+        assert await async_user_repository.delete_user(user_id)
+        assert await async_user_repository.find_user_by_id(user_id) is None
+        assert not await async_user_repository.delete_user(user_id)
+    _run(scenario())
+
+
+def test_bulk_users_page_and_iter(setup_database):
+    async def scenario():
+        users = [User(first=f"async{i}", last="bulk", email=f"async{i}@gmail.com") for i in range(5)]
+        new_ids = await async_user_repository.create_users(users)
+        page = await async_user_repository.get_users_page(2, after_id=new_ids[0])
+        assert [user.id for user in page] == new_ids[1:3]
+        streamed = [user.id async for user in async_user_repository.iter_users(itersize=2)]
+        assert set(new_ids) <= set(streamed)
+        assert streamed == sorted(streamed)
+    _run(scenario())
+
+
+def test_question_and_answers(setup_database):
+    async def scenario():
+        question_id = await async_question_repository.create_question(
+            Question(question_text="Async question?", correct_answer="yes"))
+        await async_answer_repository.create_answers([Answer(question_id=question_id, incorrect_answer="no"),
+                                                      Answer(question_id=question_id, incorrect_answer="maybe")])
+        assert (await async_question_repository.find_question_by_id(question_id)).correct_answer == "yes"
+        answers = await async_answer_repository.get_answers_by_question_id(question_id)
+        assert [answer.incorrect_answer for answer in answers] == ["no", "maybe"]
+        [(question, incorrect_answers)] = await async_question_repository.get_questions_with_answers([question_id])
+        assert question.id == question_id and len(incorrect_answers) == 2
+        assert await async_answer_repository.delete_answer(answers[0].id)
+        assert len(await async_answer_repository.get_answers_by_question_id(question_id)) == 1
+        assert await async_question_repository.update_question(
+            question_id, Question(question_text="Async question?", correct_answer="no"))
+        assert (await async_question_repository.find_question_by_id(question_id)).correct_answer == "no"
+    _run(scenario())
+
+
+def test_user_answers(setup_database):
+    async def scenario():
+        user_id = await async_user_repository.create_user(User(first="async", last="player", email="p@gmail.com"))
+        question_id = await async_question_repository.create_question(
+            Question(question_text="Async answer?", correct_answer="yes"))
+        new_ids = await async_user_answer_repository.create_user_answers([
+            UserAnswer(user_id=user_id, question_id=question_id, answer_text="yes", is_correct=True,
+                       time_taken=timedelta(seconds=1.5)),
+            UserAnswer(user_id=user_id, question_id=question_id, answer_text="no", is_correct=False,
+                       time_taken=timedelta(seconds=3))
+        ])
+        user_answer = await async_user_answer_repository.find_user_answer_by_id(new_ids[0])
+        assert user_answer.time_taken == timedelta(seconds=1.5)
+        assert await async_user_answer_repository.delete_user_answer(new_ids[1])
+        assert await async_user_answer_repository.find_user_answer_by_id(new_ids[1]) is None
+    _run(scenario())
+
+
+def test_user_answer_keys_and_windows(setup_database):
+    async def scenario():
+        user_id = await async_user_repository.create_user(User(first="keyed", last="player", email="k@gmail.com"))
+        question_id = await async_question_repository.create_question(
+            Question(question_text="Async window?", correct_answer="yes"))
+        old, new = datetime(2001, 1, 1, tzinfo=timezone.utc), datetime(2001, 1, 3, tzinfo=timezone.utc)
+
+        def answer(key, answered_at):
+            return UserAnswer(user_id=user_id, question_id=question_id, answer_text="yes", is_correct=True,
+                              time_taken=timedelta(seconds=1), answered_at=answered_at, idempotency_key=key)
+
+        await async_user_answer_repository.create_user_answers([answer("async-old", old)])
+        new_id = await async_user_answer_repository.create_user_answer(answer("async-new", new))
+        for duplicate in (async_user_answer_repository.create_user_answer(answer("async-new", new)),
+                          async_user_answer_repository.create_user_answers([answer("async-old", old)])):
+            with pytest.raises(psycopg.IntegrityError):
+                await duplicate
+        since, until = datetime(2001, 1, 2, tzinfo=timezone.utc), datetime(2001, 1, 4, tzinfo=timezone.utc)
+        window = await async_user_answer_repository.get_all_user_answers(since, until)
+        assert [user_answer.id for user_answer in window] == [new_id]
+        streamed = [user_answer.id async for user_answer in
+                    async_user_answer_repository.iter_user_answers(until=since)
+                    if user_answer.user_id == user_id]
+        assert len(streamed) == 1 and streamed != [new_id]
+    _run(scenario())
+
+
+def test_schema_change_replaces_connections(setup_database):
+    async def scenario():
+        for _ in range(6):
+            await async_user_repository.get_users_page(1)
+        create_tables()
+        assert isinstance(await async_user_repository.get_users_page(1), list)
+    _run(scenario())
+
+
+def test_async_app_routes(setup_database):
+    async def scenario():
+        client = create_async_app().test_client()
+        response = await client.post("/users", json={"first": "route", "last": "user", "email": "route@gmail.com"})
+        assert response.status_code == 201
+        user_id = (await response.get_json())['id']
+        response = await client.get(f"/users/{user_id}")
+        assert (await response.get_json())['email'] == "route@gmail.com"
+        response = await client.get("/users?limit=1")
+        assert len((await response.get_json())['items']) == 1
+        response = await client.get("/questions?stream=ndjson")
+        assert response.status_code == 200
+        assert (await response.get_data(as_text=True)).endswith('\n')
+    _run(scenario())
@@ -0,0 +1,38 @@
+from bench.data import generate_questions, generate_user_answers, generate_users
+from bench.harness import BenchResult, compare, measure
+
+
+def _result(name, median, number=1):
+    return BenchResult(name=name, group="test", runs=1, number=number, min=median, median=median, mean=median,
+                       p95=median, max=median)
+
+
+def test_generators_are_deterministic():
+    assert list(generate_users(5, seed=1)) == list(generate_users(5, seed=1))
+    pairs = list(generate_questions(3, incorrect_answers=2))
+    assert len({question.question_text for question, _ in pairs}) == 3
+    assert all(len(answers) == 2 for _, answers in pairs)
+    answers = list(generate_user_answers(200, [1, 2], [10, 20, 30], seed=3))
+    assert answers == list(generate_user_answers(200, [1, 2], [10, 20, 30], seed=3))
+    assert {answer.question_id for answer in answers} == {10, 20, 30}
+    assert all(answer.time_taken.total_seconds() > 0 for answer in answers)
+
+
+def test_measure_counts_calls():
+    calls = []
+    result = measure("append", "test", lambda: calls.append(1), runs=3, number=4, warmup=2)
+    assert len(calls) == 2 + 3 * 4
+    assert result.min <= result.median <= result.max
+
+
+def test_measure_calibrates_number():
+    result = measure("noop", "test", lambda: None, runs=2, min_time=0.001, max_number=64)
+    assert 1 <= result.number <= 64
+
+
+def test_compare_flags_regressions():
+    baseline = {'fast': 1.0, 'steady': 1.0}
+    results = [_result('fast', 1.5), _result('steady', 2.2, number=2), _result('new', 9.0)]
+    regressions = compare(results, baseline, threshold=0.2)
+    assert [regression.name for regression in regressions] == ['fast']
+    assert regressions[0].ratio == 1.5
@@ -0,0 +1,58 @@
+from repository.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_or_load_caches_value():
+    cache = TTLCache(max_size=2, ttl=10)
+    calls = []
+    loader = lambda: calls.append(1) or "value"
+    assert cache.get_or_load("key", loader) == "value"
+    assert cache.get_or_load("key", loader) == "value"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+
+
+def test_none_is_not_cached():
+    cache = TTLCache(max_size=2, ttl=10)
+    assert cache.get_or_load("key", lambda: None) is None
+    assert cache.stats().size == 0
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats().evictions == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.stats().expirations == 1
+
+
+def test_invalidate_drops_racing_load():
+    cache = TTLCache(max_size=2, ttl=10)
+
+    def loader():
+        cache.invalidate("a")
+        return "stale"
+
+    assert cache.get_or_load("a", loader) == "stale"
+    assert cache.get("a") is None
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from config.sql_config import SQL_URI
+from repository.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(SQL_URI, min_size=1, max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+def test_connection_is_reused(pool):
+    with pool.getconn() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid() AS pid")
+        first_pid = cursor.fetchone()['pid']
+    with pool.getconn() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid() AS pid")
+        second_pid = cursor.fetchone()['pid']
+    assert first_pid == second_pid
+    assert pool.stats().created == 1
+
+
+def test_checkout_timeout(pool):
+    first = pool.getconn()
+    second = pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    first.close()
+    second.close()
+    stats = pool.stats()
+    assert stats.timeouts == 1
+    assert stats.in_use == 0
+    assert stats.idle == 2
+
+
+def test_statement_cache(pool):
+    for value in range(3):
+        with pool.getconn() as connection, connection.cursor() as cursor:
+            cursor.execute("SELECT %s::int AS value", (value,))
+            assert cursor.fetchone()['value'] == value
+            assert len(connection.statement_cache) == 1
+
+
+def test_connecting_does_not_hold_the_pool_lock(pool):
+    idle = pool.getconn()
+    connect, connecting, opened = pool._connect, threading.Event(), threading.Event()
+
+    def slow_connect():
+        connecting.set()
+        opened.wait(5)
+        return connect()
+
+    pool._connect = slow_connect
+    checkout = threading.Thread(target=lambda: pool.getconn().close())
+    checkout.start()
+    assert connecting.wait(5)
+    started = time.monotonic()
+    idle.close()
+    with pool.getconn():
+        assert pool.stats().in_use == 2
+    assert time.monotonic() - started < 1
+    opened.set()
+    checkout.join(5)
+    stats = pool.stats()
+    assert (stats.size, stats.created, stats.in_use) == (2, 2, 0)
+
+
+def test_failed_connect_gives_its_slot_back(pool):
+    pool.getconn()
+
+    def failing_connect():
+        raise OSError("database is away")
+
+    pool._connect = failing_connect
+    with pytest.raises(OSError):
+        pool.getconn()
+    stats = pool.stats()
+    assert (stats.size, stats.in_use) == (1, 1)
@@ -0,0 +1,154 @@
+import pytest
+from model.Answer import Answer
+from model.Question import Question
+from model.User import User
+from repository.answer_repository import create_answer
+from repository.database import create_tables, drop_all_tables
+from repository.question_repository import create_question
+from repository.storage import STORAGE_BACKENDS, use_backend
+from repository.user_answer_repository import get_all_user_answers
+from repository.user_repository import create_user
+from service.game_session import GameSession
+from service.game_store import DatabaseGameStore, GameStore, InMemoryGameStore
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_refreshes_expiry():
+    clock = FakeClock()
+    store = InMemoryGameStore(ttl=10, max_size=10, clock=clock)
+    session = FakeSession()
+    game_id = store.add(session)
+    clock.now = 8
+    assert store.get(game_id) is session
+    clock.now = 16
+    assert store.get(game_id) is session
+    clock.now = 27
+    assert store.get(game_id) is None
+    assert session.closed
+
+
+def test_sweep_closes_expired_sessions():
+    clock = FakeClock()
+    store = InMemoryGameStore(ttl=10, max_size=10, clock=clock)
+    first, second = FakeSession(), FakeSession()
+    store.add(first)
+    clock.now = 5
+    second_id = store.add(second)
+    clock.now = 12
+    assert store.sweep() == 1
+    assert first.closed and not second.closed
+    assert store.get(second_id) is second
+
+
+def test_evicts_least_recently_used():
+    clock = FakeClock()
+    store = InMemoryGameStore(ttl=100, max_size=2, clock=clock)
+    sessions = [FakeSession() for _ in range(3)]
+    first_id = store.add(sessions[0])
+    store.add(sessions[1])
+    store.get(first_id)
+    store.add(sessions[2])
+    assert len(store) == 2
+    assert sessions[1].closed
+    assert store.get(first_id) is sessions[0]
+
+
+def test_remove_closes_session():
+    store = InMemoryGameStore()
+    session = FakeSession()
+    game_id = store.add(session)
+    assert store.remove(game_id) is session
+    assert session.closed
+    assert store.remove(game_id) is None
+
+
+def test_flush_writes_every_open_session():
+    store = InMemoryGameStore()
+    sessions = [FakeSession() for _ in range(3)]
+    for session in sessions:
+        store.add(session)
+    store.flush()
+    assert [session.flushes for session in sessions] == [1, 1, 1]
+    assert not any(session.closed for session in sessions)
+
+
+@pytest.fixture(scope="module", params=STORAGE_BACKENDS)
+def setup_database(request):
+    use_backend(request.param)
+    if request.param == 'sqlite':
+        drop_all_tables()
+    create_tables()
+    user_id = create_user(User(first="stored", last="player", email="stored@gmail.com"))
+    question_id = create_question(Question(question_text="Stored game?", correct_answer="yes"))
+    create_answer(Answer(question_id=question_id, incorrect_answer="no"))
+    yield user_id, question_id
+    if request.param == 'sqlite':
+        drop_all_tables()
+    use_backend('postgres')
+
+
+def test_game_store_is_abstract():
+    with pytest.raises(TypeError):
+        GameStore()
+
+
+def test_database_games_are_shared_between_stores(setup_database):
+    user_id, question_id = setup_database
+    # Two stores stand in for two worker processes
+    first, second = DatabaseGameStore(), DatabaseGameStore()
+    game_id = first.add(GameSession(user_id, [question_id]))
+    with second.use(game_id) as session:
+        round_question = session.next_question()
+    with first.use(game_id) as session:
+        result = session.submit(round_question.options.index("yes"))
+    assert result.is_correct and result.finished
+    status = second.get(game_id)
+    assert (status.position, status.correct_answers) == (1, 1)
+    answers = [answer for answer in get_all_user_answers() if answer.user_id == user_id]
+    assert [(answer.question_id, answer.is_correct) for answer in answers] == [(question_id, True)]
+    assert second.remove(game_id).finished
+    assert first.get(game_id) is None
+    with first.use(game_id) as session:
+        assert session is None
+
+
+def test_database_game_keeps_state_when_the_request_fails(setup_database):
+    user_id, question_id = setup_database
+    store = DatabaseGameStore()
+    game_id = store.add(GameSession(user_id, [question_id]))
+    with store.use(game_id) as session:
+        session.next_question()
+    with pytest.raises(RuntimeError):
+        with store.use(game_id) as session:
+            session.submit(0)
+            raise RuntimeError("request failed")
+    assert store.get(game_id).position == 0
+    store.remove(game_id)
+
+
+def test_database_store_sweeps_expired_games(setup_database):
+    user_id, question_id = setup_database
+    store = DatabaseGameStore(ttl=-1)
+    game_id = store.add(GameSession(user_id, [question_id]))
+    assert store.get(game_id) is None
+    assert store.sweep() >= 1
+    assert len(store) == 0
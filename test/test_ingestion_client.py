@@ -0,0 +1,102 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import api.question_api as question_api
+import api.user_api as user_api
+from api.client import IngestionClient, IngestionError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    question_bank = 120
+    calls = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.lock:
+            call = self.calls[url.path] = self.calls.get(url.path, 0) + 1
+        if url.path == '/questions':
+            # Every third request is rate limited in the body, the way OpenTDB does it
+            if call % 3 == 0:
+                return self._send(200, {'response_code': 5, 'results': []})
+            amount = int(params['amount'])
+            start = (call * 7) % self.question_bank
+            return self._send(200, {'response_code': 0, 'results': [
+                {'question': f"Question {(start + idx) % self.question_bank}", 'correct_answer': "yes",
+                 'incorrect_answers': ["no", "maybe"]}
+                for idx in range(amount)
+            ]})
+        if url.path == '/users':
+            if call == 1:
+                return self._send(429, {'error': "slow down"}, {'Retry-After': '0'})
+            return self._send(200, {'results': [
+                {'name': {'first': f"first{idx}", 'last': "user"}, 'email': f"user{idx}@mail.com"}
+                for idx in range(int(params['results']))
+            ]})
+        if url.path == '/broken':
+            return self._send(503, {})
+        self._send(404, {})
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    StubHandler.calls = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(question_api, 'QUESTION_API_URL', f"{base_url}/questions")
+    monkeypatch.setattr(user_api, 'USER_API_URL', f"{base_url}/users")
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    with IngestionClient(concurrency=4, timeout=5, max_retries=5, backoff=0) as client:
+        yield client
+
+
+def test_iter_questions_dedupes_by_text(stub_server, client):
+    pairs = list(question_api.iter_questions(100, page_size=10, client=client))
+    texts = [question.question_text for question, _ in pairs]
+    assert len(texts) == 100
+    assert len(set(texts)) == 100
+    assert all(len(answers) == 2 for _, answers in pairs)
+    assert client.retries > 0
+
+
+def test_iter_questions_stops_when_bank_is_exhausted(stub_server, client):
+    pairs = list(question_api.iter_questions(500, page_size=50, client=client))
+    assert len(pairs) == StubHandler.question_bank
+
+
+def test_iter_users_retries_rate_limit(stub_server, client):
+    users = list(user_api.iter_users(25, page_size=10, client=client))
+    assert len(users) == 25
+    assert client.retries == 1
+
+
+def test_gives_up_after_max_retries(stub_server):
+    with IngestionClient(max_retries=2, backoff=0) as client:
+        with pytest.raises(IngestionError):
+            client.get_json(f"{stub_server}/broken")
+        assert client.requests == 3
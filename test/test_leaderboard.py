@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from repository.database import create_tables, drop_all_tables, get_db_connection
+from repository.leaderboard import RankedSet, leaderboard, record_user_answers
+from repository.question_repository import create_question
+from repository.user_answer_repository import create_user_answer, create_user_answers, delete_user_answer
+from repository.user_repository import create_users
+
+
+@pytest.fixture(scope="module")
+def setup_database():
+    drop_all_tables()
+    create_tables()
+    user_ids = create_users([User(first=f"player{i}", last="user", email=f"player{i}@gmail.com") for i in range(3)])
+    question_id = create_question(Question(question_text="What is 2 + 2?", correct_answer="4"))
+    yield user_ids, question_id
+
+
+def _answer(user_id, question_id, is_correct, seconds):
+    return create_user_answer(UserAnswer(user_id=user_id, question_id=question_id, answer_text="answer",
+                                         is_correct=is_correct, time_taken=timedelta(seconds=seconds)))
+
+
+def test_ranked_set():
+    ranked = RankedSet()
+    for key in [5, 1, 3, 4, 2]:
+        ranked.add(key)
+    ranked.remove(4)
+    assert ranked.first(3) == [1, 2, 3]
+    assert ranked.rank(3) == 2
+    assert ranked.select(3) == 5
+    assert len(ranked) == 4
+
+
+def test_leaderboard_updates_incrementally(setup_database):
+    (first, second, third), question_id = setup_database
+    _answer(first, question_id, True, 5)
+    _answer(second, question_id, True, 2)
+    assert [entry.user_id for entry in leaderboard.top(2)] == [second, first]
+    fastest_id = _answer(first, question_id, True, 1)
+    _answer(third, question_id, False, 1)
+    assert leaderboard.rank_of(first) == 1
+    assert leaderboard.nth(2).user_id == second
+    assert leaderboard.rank_of(third) == 3
+    delete_user_answer(fastest_id)
+    assert leaderboard.nth(1).user_id == second
+    assert leaderboard.rank_of(first) == 2
+    assert leaderboard.nth(2).fastest == 5.0
+
+
+def test_leaderboard_counts_answers_committed_after_the_load(setup_database):
+    (first, second, _), question_id = setup_database
+    entry = leaderboard.nth(leaderboard.rank_of(first))
+    late = UserAnswer(user_id=first, question_id=question_id, answer_text="answer", is_correct=True,
+                      time_taken=timedelta(seconds=0.5))
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        late_ids = create_user_answers([late], cursor)
+        # A higher id commits first and the leaderboard loads while the lower one is still in flight
+        _answer(second, question_id, False, 9)
+        leaderboard.reset()
+        len(leaderboard)
+    record_user_answers(late_ids, [late])
+    recorded = leaderboard.nth(leaderboard.rank_of(first))
+    assert (recorded.correct, recorded.answered, recorded.fastest) == (entry.correct + 1, entry.answered + 1, 0.5)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from metrics import instrument as metrics
+from metrics.registry import Registry
+
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def _count(function: str) -> int:
+    return metrics.snapshot()[metrics.REPOSITORY_LATENCY.name].get(function, {}).get('count', 0)
+
+
+@metrics.timed
+def _add(a, b):
+    return a + b
+
+@metrics.timed
+def _nested(depth):
+    return depth if depth == 0 else _nested(depth - 1)
+
+@metrics.timed
+def _numbers(count):
+    yield from range(count)
+
+@metrics.timed
+async def _double(value):
+    return value * 2
+
+@metrics.timed
+def _fail():
+    raise ValueError("boom")
+
+
+def test_disabled_records_nothing():
+    metrics.reset()
+    assert _add(1, 2) == 3
+    assert _count('test_metrics._add') == 0
+
+
+def test_timed_functions(enabled):
+    assert _add(1, 2) == 3
+    assert _nested(3) == 0
+    assert list(_numbers(3)) == [0, 1, 2]
+    assert asyncio.run(_double(2)) == 4
+    with pytest.raises(ValueError):
+        _fail()
+    assert _count('test_metrics._add') == 1
+    assert _count('test_metrics._nested') == 1
+    assert _count('test_metrics._numbers') == 1
+    assert _count('test_metrics._double') == 1
+    assert metrics.snapshot()[metrics.REPOSITORY_ERRORS.name] == {'test_metrics._fail': 1}
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Test latency.", ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, '/users')
+    data = registry.snapshot()['latency_seconds']['/users']
+    assert data['count'] == 4
+    assert data['buckets'] == {'0.1': 1, '1.0': 3, '+Inf': 4}
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/users",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/users"} 4' in text
+
+
+def test_statement_labels_are_normalized(enabled):
+    metrics.observe_sql("SELECT *\n   FROM question\n WHERE id = %s", 0.001)
+    assert list(metrics.snapshot()[metrics.SQL_LATENCY.name]) == ["SELECT * FROM question WHERE id = %s"]
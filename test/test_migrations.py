@@ -0,0 +1,83 @@
+import pytest
+
+from repository.database import create_tables, drop_all_tables, get_db_connection
+from repository.migrations import MIGRATIONS, migrate, schema_state
+
+
+@pytest.fixture(scope="module")
+def setup_database():
+    create_tables()
+    yield
+
+
+def _execute(*statements):
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def test_migrate_is_idempotent(setup_database):
+    assert migrate() == []
+    state = schema_state()
+    assert state.versions == {migration.version for migration in MIGRATIONS}
+    assert {'trivia_user', 'question', 'answer', 'user_answer', 'timing_stats', 'game_session', 'schema_migrations'} \
+        <= state.tables
+    assert 'user_answer' in state.partitioned
+    for migration in MIGRATIONS:
+        for index in migration.indexes:
+            if index.name != 'idx_user_answer_idempotency_key':
+                assert state.indexes[index.name] is True
+    assert 'idx_user_answer_idempotency_key' not in state.indexes
+
+
+def test_migrate_builds_indexes_concurrently_on_large_tables(setup_database):
+    _execute("DROP INDEX idx_answer_question_id", "DELETE FROM schema_migrations WHERE version = 3")
+    assert 3 not in schema_state().versions
+
+    assert migrate(concurrent_rows=0) == [3]
+    state = schema_state()
+    assert 3 in state.versions
+    assert state.indexes['idx_answer_question_id'] is True
+
+
+def test_migrate_repairs_dropped_indexes(setup_database):
+    _execute("DROP INDEX idx_user_answer_user_id")
+
+    # The index belongs to migration 3 and is rebuilt by the partitioning in migration 4 as well
+    assert migrate() == [3, 4]
+    assert schema_state().indexes['idx_user_answer_user_id'] is True
+
+
+def test_migrate_stops_at_target(setup_database):
+    _execute("DROP INDEX idx_answer_question_id", "DELETE FROM schema_migrations WHERE version = 3")
+
+    assert migrate(target=2) == []
+    assert 3 not in schema_state().versions
+    assert migrate() == [3]
+
+
+def test_upgrade_defers_nothing_onto_partitioned_tables(setup_database):
+    # A v1 database large enough for concurrent builds: the user_answer indexes of migrations 2 and 3 would be
+    # deferred, but migration 4 partitions the table and removes the idempotency key index
+    drop_all_tables()
+    assert migrate(target=1) == [1]
+    _execute(
+        "INSERT INTO trivia_user (first, last, email) VALUES ('v1', 'user', 'v1@gmail.com')",
+        "INSERT INTO question (question_text, correct_answer) VALUES ('v1?', 'yes')",
+        "INSERT INTO user_answer (user_id, question_id, answer_text, is_correct, time_taken) "
+        "SELECT u.id, q.id, 'yes', n % 2 = 0, n * interval '1 second' "
+        "FROM trivia_user u, question q, generate_series(1, 20) n",
+        "ANALYZE user_answer"
+    )
+
+    assert migrate(concurrent_rows=10) == [2, 3, 4, 5]
+    state = schema_state()
+    assert state.versions == {migration.version for migration in MIGRATIONS}
+    assert 'user_answer' in state.partitioned
+    assert 'idx_user_answer_idempotency_key' not in state.indexes
+    assert state.indexes['idx_user_answer_user_id'] is True
+    assert state.indexes['idx_user_answer_question_id'] is True
+    assert migrate() == []
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS count FROM user_answer")
+        assert cursor.fetchone()['count'] == 20
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from repository.database import create_tables, get_db_connection
+from repository.leaderboard import top_between
+from repository.partitions import AnswerPartitions, answer_partitions, answered_between, next_period, period_start
+from repository.question_repository import create_question
+from repository.user_answer_repository import create_user_answers, get_all_user_answers, insert_user_answers
+from repository.user_repository import create_user
+
+OLD = datetime(2001, 3, 15, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def setup_database():
+    create_tables()
+    user_id = create_user(User(first="partition", last="player", email="partition@gmail.com"))
+    question_id = create_question(Question(question_text="Partitioned?", correct_answer="yes"))
+    yield user_id, question_id
+    answer_partitions.drop_before(datetime(2002, 1, 1, tzinfo=timezone.utc))
+
+
+def _answer(user_id, question_id, answered_at, is_correct=True, seconds=1.0, key=None):
+    return UserAnswer(user_id=user_id, question_id=question_id, answer_text="yes", is_correct=is_correct,
+                      time_taken=timedelta(seconds=seconds), idempotency_key=key, answered_at=answered_at)
+
+
+def _partitions():
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT inhrelid::regclass::text AS name FROM pg_inherits "
+                       "WHERE inhparent = 'user_answer'::regclass")
+        return {row['name'] for row in cursor.fetchall()}
+
+
+def test_periods():
+    moment = datetime(2026, 12, 31, 23, 30, tzinfo=timezone.utc)
+    assert period_start(moment, 'month') == datetime(2026, 12, 1, tzinfo=timezone.utc)
+    assert next_period(period_start(moment, 'month'), 'month') == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert period_start(moment, 'week') == datetime(2026, 12, 28, tzinfo=timezone.utc)
+    assert period_start(datetime(2026, 12, 31, 23, 30), 'day') == datetime(2026, 12, 31, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        AnswerPartitions(interval='year')
+
+
+def test_answered_between():
+    assert answered_between() == ('TRUE', [])
+    condition, params = answered_between(OLD, None, 'ua.answered_at')
+    assert condition == "ua.answered_at >= %s" and params == [OLD]
+    assert answered_between(OLD, OLD)[0] == "answered_at >= %s AND answered_at < %s"
+
+
+def test_writes_create_partitions(setup_database):
+    user_id, question_id = setup_database
+    create_user_answers([_answer(user_id, question_id, OLD), _answer(user_id, question_id, OLD + timedelta(days=31))])
+    assert {'user_answer_p20010301', 'user_answer_p20010401'} <= _partitions()
+    assert answer_partitions.missing([OLD]) == []
+
+
+def test_writes_in_caller_transaction_create_partitions_there(setup_database):
+    user_id, question_id = setup_database
+    answered_at = datetime(2001, 6, 10, tzinfo=timezone.utc)
+    answer_partitions.reset()
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        # The transaction has already written to user_answer, so only its own connection may add a partition
+        create_user_answers([_answer(user_id, question_id, datetime(2001, 5, 2, tzinfo=timezone.utc))], cursor)
+        create_user_answers([_answer(user_id, question_id, answered_at)], cursor)
+    assert 'user_answer_p20010601' in _partitions()
+    assert [answer.answered_at for answer in get_all_user_answers(answered_at, answered_at + timedelta(days=1))] \
+        == [answered_at]
+
+
+def test_queries_prune_to_window(setup_database):
+    user_id, question_id = setup_database
+    since, until = datetime(2001, 3, 1, tzinfo=timezone.utc), datetime(2001, 4, 1, tzinfo=timezone.utc)
+    in_window = get_all_user_answers(since, until)
+    assert [answer.answered_at for answer in in_window] == [OLD]
+
+    with get_db_connection() as connection, connection.cursor() as cursor:
+        condition, params = answered_between(since, until)
+        cursor.execute(f"EXPLAIN SELECT * FROM user_answer WHERE {condition}", params)
+        plan = '\n'.join(row['QUERY PLAN'] for row in cursor.fetchall())
+    assert 'user_answer_p20010301' in plan and 'user_answer_p20010401' not in plan
+
+    entries = top_between(10, since, until)
+    assert [(entry.user_id, entry.correct, entry.answered) for entry in entries] == [(user_id, 1, 1)]
+
+
+def test_retention_drops_partitions(setup_database):
+    user_id, question_id = setup_database
+    insert_user_answers([_answer(user_id, question_id, OLD, key="partition-key")])
+
+    assert answer_partitions.drop_before(datetime(2001, 4, 1, tzinfo=timezone.utc)) == ['user_answer_p20010301']
+    assert 'user_answer_p20010301' not in _partitions()
+    assert get_all_user_answers(until=datetime(2001, 4, 1, tzinfo=timezone.utc)) == []
+    assert len(get_all_user_answers(until=datetime(2001, 5, 1, tzinfo=timezone.utc))) == 1
+    # The key went with its partition, so the same answer can be written again
+    assert insert_user_answers([_answer(user_id, question_id, OLD, key="partition-key")])[0] is not None
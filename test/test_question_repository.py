@@ -1,25 +1,61 @@
+import importlib
+
 import pytest
 from model.Question import Question
-from repository.database import create_tables, get_db_connection
+from repository.database import create_tables, drop_all_tables, get_db_connection
+from repository.storage import STORAGE_BACKENDS, get_backend, is_postgres, use_backend
 from repository.question_repository import create_question, get_all_questions, find_question_by_id, update_question, \
-    delete_question
+    delete_question, create_questions, get_questions_with_answers, get_questions_page, iter_questions
+from repository.answer_repository import create_answer
+from model.Answer import Answer
+from seed.seed import bulk_seed
 
-@pytest.fixture(scope="module")
-def setup_database():
+@pytest.fixture(scope="module", params=STORAGE_BACKENDS)
+def setup_database(request):
+    use_backend(request.param)
+    if request.param == 'sqlite':
+        drop_all_tables()
     create_tables()
     yield
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    cursor.execute("DROP TABLE question CASCADE")
-    connection.commit()
-    cursor.close()
-    connection.close()
+    if request.param == 'postgres':
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE question CASCADE")
+        connection.commit()
+        cursor.close()
+        connection.close()
+    else:
+        drop_all_tables()
+    use_backend('postgres')
 
 def test_create_question(setup_database):
     question = Question(question_text="What is 2 + 2?", correct_answer="4")
     new_id = create_question(question)
     assert new_id > 0
 
+def test_create_questions(setup_database):
+    questions = [Question(question_text=f"What is {i} + {i}?", correct_answer=str(i + i)) for i in range(3)]
+    new_ids = create_questions(questions)
+    assert len(new_ids) == 3
+    for new_id, question in zip(new_ids, questions):
+        assert find_question_by_id(new_id).question_text == question.question_text
+
+def test_question_cache_is_invalidated_after_commit(setup_database, monkeypatch):
+    # Invalidating before the commit would let a reader re-cache the list without the new questions
+    module = importlib.import_module('repository.question_repository' if is_postgres()
+                                     else f'repository.{get_backend()}_question_repository')
+    visible = []
+    monkeypatch.setattr(module, 'invalidate_question',
+                        lambda question_id=None: visible.append({q.id for q in module._load_all_questions()}))
+    new_ids = create_questions([Question(question_text="Committed first?", correct_answer="yes")])
+    assert visible and new_ids[0] in visible[0]
+
+def test_seeded_questions_reach_the_cache(setup_database):
+    get_all_questions()
+    bulk_seed([], [(Question(question_text="Seeded later?", correct_answer="yes"),
+                    [Answer(question_id=None, incorrect_answer="no")])])
+    assert "Seeded later?" in [question.question_text for question in get_all_questions()]
+
 def test_get_all_questions(setup_database):
     question = Question(question_text="What is the capital of France?", correct_answer="Paris")
     create_question(question)
@@ -27,6 +63,26 @@ def test_get_all_questions(setup_database):
     assert len(questions) > 0
     assert isinstance(questions[0], Question)
 
+def test_get_questions_with_answers(setup_database):
+    question = Question(question_text="What is 6 * 7?", correct_answer="42")
+    new_id = create_question(question)
+    create_answer(Answer(question_id=new_id, incorrect_answer="41"))
+    create_answer(Answer(question_id=new_id, incorrect_answer="43"))
+    [(found_question, answers)] = get_questions_with_answers([new_id])
+    assert found_question.correct_answer == "42"
+    assert [answer.incorrect_answer for answer in answers] == ["41", "43"]
+
+def test_get_questions_page(setup_database):
+    create_questions([Question(question_text=f"Page question {i}", correct_answer="yes") for i in range(3)])
+    first_page = get_questions_page(2)
+    assert len(first_page) == 2
+    second_page = get_questions_page(2, after_id=first_page[-1].id)
+    assert all(question.id > first_page[-1].id for question in second_page)
+
+def test_iter_questions(setup_database):
+    questions = list(iter_questions(itersize=1))
+    assert [question.id for question in questions] == sorted(question.id for question in get_all_questions())
+
 def test_find_question_by_id(setup_database):
     question = Question(question_text="What is 3 + 5?", correct_answer="8")
     new_id = create_question(question)
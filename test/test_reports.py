@@ -0,0 +1,56 @@
+import csv
+import gzip
+import io
+import sys
+
+import pytest
+
+from model.User import User
+from service.reports import REPORT_FIELDS, build_user_report, export_reports, iter_report_chunks
+
+
+def _reports(count):
+    return [build_user_report(User(first="first", last=str(idx), email=f"{idx}@mail.com", id=idx), 5, None)
+            for idx in range(1, count + 1)]
+
+
+def test_build_user_report_without_answers():
+    report = build_user_report(User(first="Ada", last="Lovelace", email="ada@mail.com", id=7), 3, None)
+    assert report['name'] == "Ada Lovelace"
+    assert report['answered_questions'] == 0
+    assert report['unanswered_questions'] == 3
+    assert report['fastest_answer'] == 0
+
+
+def test_csv_chunks():
+    chunks = list(iter_report_chunks(_reports(5), chunk_size=2))
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert list(rows[0].keys()) == list(REPORT_FIELDS)
+    assert [row['user_id'] for row in rows] == ['1', '2', '3', '4', '5']
+
+
+def test_gzip_round_trip():
+    plain = b''.join(iter_report_chunks(_reports(50), chunk_size=7))
+    compressed = b''.join(iter_report_chunks(_reports(50), compress=True, chunk_size=7))
+    assert gzip.decompress(compressed) == plain
+
+
+def test_export_reports_to_file_object():
+    target, progress = io.BytesIO(), []
+    rows = export_reports(_reports(5), target, chunk_size=2, progress=progress.append)
+    assert rows == 5
+    assert progress == [2, 4, 5]
+    assert target.getvalue().decode('utf-8').count('\n') == 6
+
+
+def test_unknown_report_format():
+    # Raised by the call itself, before any chunk is requested
+    with pytest.raises(ValueError):
+        iter_report_chunks(_reports(1), report_format='xlsx')
+
+
+def test_missing_pyarrow_is_reported_before_streaming(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ValueError, match="requires pyarrow"):
+        iter_report_chunks(_reports(1), report_format='parquet')
@@ -0,0 +1,83 @@
+import bisect
+import random
+import statistics as s
+from datetime import timedelta
+
+from model.UserAnswer import UserAnswer
+from service.sketches import QuantileSketch, RunningStats, TimingCollector, TimingStats
+from service.timing_stats import TimingRecorder
+
+
+def test_running_stats_match_statistics():
+    rng = random.Random(1)
+    values = [rng.uniform(0, 30) for _ in range(1000)]
+    running = RunningStats()
+    for value in values[:400]:
+        running.update(value)
+    other = RunningStats()
+    for value in values[400:]:
+        other.update(value)
+    running.merge(other)
+    assert running.count == 1000
+    assert abs(running.mean - s.mean(values)) < 1e-9
+    assert abs(running.variance - s.variance(values)) < 1e-9
+    assert running.min == min(values)
+    assert running.max == max(values)
+
+
+def test_quantile_sketch_rank_error():
+    rng = random.Random(7)
+    values = [rng.expovariate(0.2) for _ in range(50000)]
+    sketch = QuantileSketch(k=200, seed=7)
+    for value in values:
+        sketch.update(value)
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        rank = bisect.bisect_left(ordered, sketch.quantile(q)) / len(ordered)
+        assert abs(rank - q) < 0.0165
+
+
+def test_quantile_sketch_merge_and_serialize():
+    first, second = QuantileSketch(k=50, seed=1), QuantileSketch(k=50, seed=2)
+    for value in range(5000):
+        (first if value % 2 else second).update(float(value))
+    first.merge(second)
+    restored = QuantileSketch.from_dict(first.to_dict())
+    assert restored.count == 5000
+    assert abs(restored.quantile(0.5) - 2500) < 5000 * 0.05
+
+
+def test_timing_collector_buckets():
+    collector = TimingCollector()
+    collector.update(1, True, 2.0)
+    collector.update(1, False, 4.0)
+    assert collector.question(1).count == 2
+    assert collector.get('correct').count == 1
+    restored = TimingCollector.from_dict(collector.to_dict())
+    assert restored.question(1).running.mean == 3.0
+    assert isinstance(restored.get('incorrect'), TimingStats)
+
+
+def _answers(*seconds):
+    return [UserAnswer(user_id=1, question_id=1, answer_text="yes", is_correct=True,
+                       time_taken=timedelta(seconds=value)) for value in seconds]
+
+
+def test_timing_recorder_keeps_stats_of_a_failed_merge():
+    saved, failures = [], [RuntimeError("database is away")]
+
+    def save(collector):
+        if failures:
+            raise failures.pop()
+        saved.append(collector)
+
+    recorder = TimingRecorder(flush_interval=3600, save=save)
+    recorder.record(_answers(1, 2))
+    assert not recorder.flush()
+    recorder.record(_answers(3))
+    assert recorder.flush()
+    assert [collector.question(1).count for collector in saved] == [3]
+    stats = recorder.stats()
+    assert stats.flushes == 1 and stats.failed_flushes == 1 and stats.pending_buckets == 0
+    assert stats.last_error == "RuntimeError: database is away"
+    recorder.close()
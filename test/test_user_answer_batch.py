@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from model.UserAnswer import UserAnswer
+from model.UserAnswerBatch import UserAnswerBatch
+from service.analytics import aggregate_answers
+
+
+def _user_answers():
+    return [
+        UserAnswer(user_id=1, question_id=1, answer_text="Paris", is_correct=True, time_taken=timedelta(seconds=2.5), id=1),
+        UserAnswer(user_id=2, question_id=1, answer_text="London", is_correct=False, time_taken=timedelta(seconds=4), id=2),
+        UserAnswer(user_id=2, question_id=2, answer_text="Paris", is_correct=True, time_taken=timedelta(seconds=1), id=3)
+    ]
+
+
+def test_round_trip():
+    user_answers = _user_answers()
+    batch = UserAnswerBatch.from_user_answers(user_answers)
+    assert len(batch) == 3
+    assert list(batch) == user_answers
+
+
+def test_answer_text_is_interned():
+    batch = UserAnswerBatch.from_user_answers(_user_answers())
+    assert batch.answer_texts == ["Paris", "London"]
+    assert list(batch.answer_codes) == [0, 1, 0]
+
+
+def test_aggregates_match_object_path():
+    user_answers = _user_answers()
+    assert aggregate_answers(UserAnswerBatch.from_user_answers(user_answers)) == aggregate_answers(user_answers)
@@ -1,50 +1,99 @@
 from datetime import timedelta
 
 import pytest
+from model.Question import Question
+from model.User import User
 from model.UserAnswer import UserAnswer
-from repository.database import create_tables, get_db_connection
-from repository.user_answer_repository import create_user_answer, get_all_user_answers, find_user_answer_by_id, update_user_answer, delete_user_answer
+from repository.database import create_tables, drop_all_tables, get_db_connection
+from repository.question_repository import create_question
+from repository.storage import STORAGE_BACKENDS, use_backend
+from repository.user_repository import create_user
+from repository.user_answer_repository import create_user_answer, get_all_user_answers, find_user_answer_by_id, update_user_answer, delete_user_answer, \
+    create_user_answers, iter_user_answers, insert_user_answers
 
 
-@pytest.fixture(scope="module")
-def setup_database():
+@pytest.fixture(scope="module", params=STORAGE_BACKENDS)
+def setup_database(request):
+    use_backend(request.param)
+    if request.param == 'sqlite':
+        drop_all_tables()
     create_tables()
-    yield
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    cursor.execute("DROP TABLE user_answer CASCADE")
-    connection.commit()
-    cursor.close()
-    connection.close()
+    yield (create_user(User(first="answer", last="user", email="answer@gmail.com")),
+           create_question(Question(question_text="Answered?", correct_answer="yes")))
+    if request.param == 'postgres':
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE user_answer CASCADE")
+        connection.commit()
+        cursor.close()
+        connection.close()
+    else:
+        drop_all_tables()
+    use_backend('postgres')
 
 def test_create_user_answer(setup_database):
-    user_answer = UserAnswer(user_id=1, question_id=1, answer_text="Sample Answer", is_correct=True,
+    user_id, question_id = setup_database
+    user_answer = UserAnswer(user_id=user_id, question_id=question_id, answer_text="Sample Answer", is_correct=True,
                              time_taken=timedelta(seconds=5))
     new_id = create_user_answer(user_answer)
     assert new_id > 0
 
+def test_create_user_answers(setup_database):
+    user_id, question_id = setup_database
+    user_answers = [UserAnswer(user_id=user_id, question_id=question_id, answer_text=f"Bulk Answer {i}",
+                               is_correct=i % 2 == 0, time_taken=timedelta(seconds=i + 1)) for i in range(3)]
+    new_ids = create_user_answers(user_answers)
+    assert len(new_ids) == 3
+    for new_id, user_answer in zip(new_ids, user_answers):
+        found_user_answer = find_user_answer_by_id(new_id)
+        assert found_user_answer.answer_text == user_answer.answer_text
+        assert found_user_answer.is_correct is user_answer.is_correct
+        assert found_user_answer.time_taken == user_answer.time_taken
+
+def test_insert_user_answers_skips_known_keys(setup_database):
+    user_id, question_id = setup_database
+    def keyed(key):
+        return UserAnswer(user_id=user_id, question_id=question_id, answer_text=f"Keyed {key}", is_correct=True,
+                          time_taken=timedelta(seconds=1.5), idempotency_key=key)
+
+    first_ids = insert_user_answers([keyed("key-1"), keyed("key-2")])
+    assert all(first_ids)
+    retried_ids = insert_user_answers([keyed("key-2"), keyed("key-3"), keyed("key-3")])
+    assert retried_ids[0] is None and retried_ids[1] is not None and retried_ids[2] is None
+    found = find_user_answer_by_id(retried_ids[1])
+    assert found.answer_text == "Keyed key-3"
+    assert found.time_taken == timedelta(seconds=1.5)
+
 def test_get_all_user_answers(setup_database):
-    user_answer = UserAnswer(user_id=1, question_id=1, answer_text="Sample Answer", is_correct=True, time_taken=5.0)
+    user_id, question_id = setup_database
+    user_answer = UserAnswer(user_id=user_id, question_id=question_id, answer_text="Sample Answer", is_correct=True, time_taken=5.0)
     create_user_answer(user_answer)
     user_answers = get_all_user_answers()
     assert len(user_answers) > 0
     assert isinstance(user_answers[0], UserAnswer)
 
+def test_iter_user_answers(setup_database):
+    user_answers = list(iter_user_answers(itersize=1))
+    assert len(user_answers) == len(get_all_user_answers())
+    assert all(isinstance(user_answer, UserAnswer) for user_answer in user_answers)
+
 def test_find_user_answer_by_id(setup_database):
-    user_answer = UserAnswer(user_id=1, question_id=1, answer_text="Another Sample Answer", is_correct=False, time_taken=timedelta(seconds=10))
+    user_id, question_id = setup_database
+    user_answer = UserAnswer(user_id=user_id, question_id=question_id, answer_text="Another Sample Answer", is_correct=False, time_taken=timedelta(seconds=10))
     new_id = create_user_answer(user_answer)
     found_user_answer = find_user_answer_by_id(new_id)
     assert found_user_answer is not None
-    assert found_user_answer.user_id == 1
-    assert found_user_answer.question_id == 1
+    assert found_user_answer.user_id == user_id
+    assert found_user_answer.question_id == question_id
     assert found_user_answer.answer_text == "Another Sample Answer"
     assert found_user_answer.is_correct is False
     assert found_user_answer.time_taken == timedelta(seconds=10)
 
 def test_update_user_answer(setup_database):
-    user_answer = UserAnswer(user_id=1, question_id=1, answer_text="Old Answer", is_correct=True, time_taken=5.0)
+    user_id, question_id = setup_database
+    user_answer = UserAnswer(user_id=user_id, question_id=question_id, answer_text="Old Answer", is_correct=True, time_taken=5.0)
     new_id = create_user_answer(user_answer)
-    updated_user_answer = UserAnswer(user_id=1, question_id=1, answer_text="Updated Answer", is_correct=False, time_taken=8.0)
+    updated_user_answer = UserAnswer(user_id=user_id, question_id=question_id, answer_text="Updated Answer", is_correct=False, time_taken=8.0)
     update_success = update_user_answer(new_id, updated_user_answer)
     assert update_success
     updated_user_answer_in_db = find_user_answer_by_id(new_id)
@@ -55,7 +104,8 @@ def test_update_user_answer(setup_database):
 
 
 def test_delete_user_answer(setup_database):
-    user_answer = UserAnswer(user_id=1, question_id=1, answer_text="Delete Me", is_correct=True, time_taken=5.0)
+    user_id, question_id = setup_database
+    user_answer = UserAnswer(user_id=user_id, question_id=question_id, answer_text="Delete Me", is_correct=True, time_taken=5.0)
     new_id = create_user_answer(user_answer)
     created_user_answer = find_user_answer_by_id(new_id)
     assert created_user_answer is not None
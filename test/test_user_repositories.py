@@ -1,21 +1,32 @@
+import threading
+
 import pytest
 from model.User import User
-from repository.database import create_tables, get_db_connection
-from repository.user_repository import create_user, get_all_users, find_user_by_id, load_users, update_user, delete_user
+from repository.database import create_tables, drop_all_tables, get_db_connection
+from repository.storage import STORAGE_BACKENDS, use_backend
+from repository.user_repository import create_user, get_all_users, find_user_by_id, load_users, update_user, delete_user, \
+    create_users, get_users_page, iter_users
 
 
-@pytest.fixture(scope="module")
-def setup_database():
+@pytest.fixture(scope="module", params=STORAGE_BACKENDS)
+def setup_database(request):
+    use_backend(request.param)
+    if request.param == 'sqlite':
+        drop_all_tables()
     create_tables()
     load_users()
     yield
-    # Tear down - happens after tests are finished
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    cursor.execute("DROP TABLE trivia_user CASCADE")
-    connection.commit()
-    cursor.close()
-    connection.close()
+    if request.param == 'postgres':
+        # Tear down - happens after tests are finished
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE trivia_user CASCADE")
+        connection.commit()
+        cursor.close()
+        connection.close()
+    else:
+        drop_all_tables()
+    use_backend('postgres')
 
 
 def test_create_fighter(setup_database):
@@ -24,12 +35,45 @@ def test_create_fighter(setup_database):
     assert new_id > 0
 
 
+def test_create_users(setup_database):
+    users = [User(first=f"bulk{i}", last="user", email=f"bulk{i}@gmail.com") for i in range(3)]
+    new_ids = create_users(users)
+    assert len(new_ids) == 3
+    for new_id, user in zip(new_ids, users):
+        assert find_user_by_id(new_id).email == user.email
+
+
 def test_get_all(setup_database):
     users = get_all_users()
     assert len(users) > 0
     assert isinstance(users[0], User)
 
 
+def test_get_users_page(setup_database):
+    first_page = get_users_page(2)
+    assert len(first_page) == 2
+    second_page = get_users_page(2, after_id=first_page[-1].id)
+    assert all(user.id > first_page[-1].id for user in second_page)
+
+
+def test_iter_users(setup_database):
+    users = list(iter_users(itersize=1))
+    assert [user.id for user in users] == sorted(user.id for user in get_all_users())
+
+
+def test_iter_users_lets_others_write_between_pages(setup_database):
+    users = iter_users(itersize=1)
+    next(users)
+    writer = threading.Thread(target=create_user, args=(User(first="mid", last="stream", email="mid@gmail.com"),))
+    writer.start()
+    try:
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+    finally:
+        users.close()
+        writer.join()
+
+
 def test_select_by_id(setup_database):
     user = find_user_by_id(1)
     assert user is not None
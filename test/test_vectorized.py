@@ -0,0 +1,120 @@
+import random
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip('pandas')
+
+from model.Question import Question
+from model.User import User
+from model.UserAnswer import UserAnswer
+from model.UserAnswerBatch import UserAnswerBatch
+from repository.database import create_tables, drop_all_tables
+from repository.question_repository import create_question, get_all_questions
+from repository.user_answer_repository import create_user_answer, get_all_user_answers, get_user_answer_batch
+from repository.user_repository import create_user, get_all_users
+from service import service, vectorized
+from service.analytics import TimeTotal, aggregate_answers
+
+
+def _data(seed: int, user_count: int = 30, question_count: int = 12, answer_count: int = 600):
+    rng = random.Random(seed)
+    users = [User(first=f"First{idx}", last=f"Last{idx}", email=f"user{idx}@example.com", id=idx)
+             for idx in range(1, user_count + 1)]
+    questions = [Question(question_text=f"Question {idx}?", correct_answer="yes", id=idx)
+                 for idx in range(1, question_count + 1)]
+    # Coarse times and few users make ties in score, fastest time and medians likely
+    answers = [
+        UserAnswer(user_id=rng.randint(1, user_count - 3), question_id=rng.randint(1, question_count - 1),
+                   answer_text="yes", is_correct=rng.random() < 0.6,
+                   time_taken=timedelta(microseconds=rng.choice([rng.randint(1, 50) * 100_000,
+                                                                 rng.randint(1, 30_000_000)])))
+        for _ in range(answer_count)
+    ]
+    return users, questions, answers
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_exercises_match_python_backend(seed):
+    users, questions, answers = _data(seed)
+    aggregates = aggregate_answers(answers)
+    columns = vectorized.ColumnAggregates(vectorized.AnswerColumns.from_batch(UserAnswerBatch.from_user_answers(answers)))
+
+    assert vectorized.exercise_1(users, columns) == service.exercise_1(users, answers, aggregates)
+    assert vectorized.exercise_2(questions, columns) == service.exercise_2(questions, answers, aggregates)
+    assert vectorized.exercise_3(users, columns) == service.exercise_3(users, answers, aggregates)
+    assert vectorized.exercise_4(questions, columns) == service.exercise_4(questions, answers, aggregates)
+    assert vectorized.exercise_5(questions, columns) == service.exercise_5(questions, answers, aggregates)
+    assert vectorized.exercise_6(users, questions, columns) == service.exercise_6(users, questions, answers, aggregates)
+    assert vectorized.exercise_7(columns) == service.exercise_7(answers, aggregates)
+    reports = list(vectorized.iter_user_reports(users, len(questions), columns))
+    assert reports == list(service.iter_user_reports(users, len(questions), aggregates))
+    assert [type(value) for value in reports[-1].values()] == [int, str, int, int, int, int, int, int, int]
+
+
+def test_every_user_answering_everything():
+    users = [User(first="First", last=f"Last{idx}", email=f"user{idx}@example.com", id=idx) for idx in (1, 2, 3)]
+    questions = [Question(question_text=f"Question {idx}?", correct_answer="yes", id=idx) for idx in (1, 2)]
+    answers = [UserAnswer(user_id=user.id, question_id=question.id, answer_text="yes", is_correct=True,
+                          time_taken=timedelta(seconds=1))
+               for user in users for question in questions]
+    columns = vectorized.ColumnAggregates(vectorized.AnswerColumns.from_batch(UserAnswerBatch.from_user_answers(answers)))
+    assert vectorized.exercise_6(users, questions, columns) == users
+    assert vectorized.exercise_1(users, columns) == (users[0], 2)
+
+
+def test_empty_answers():
+    users, questions, _ = _data(0)
+    columns = vectorized.ColumnAggregates(vectorized.AnswerColumns.from_batch(UserAnswerBatch()))
+    aggregates = aggregate_answers([])
+    assert vectorized.exercise_1(users, columns) == service.exercise_1(users, [], aggregates)
+    assert vectorized.exercise_2(questions, columns) == service.exercise_2(questions, [], aggregates)
+    assert vectorized.exercise_3(users, columns) == service.exercise_3(users, [], aggregates)
+    assert vectorized.exercise_7(columns) == (0, 0)
+
+
+def test_exact_means_round_once():
+    rng = random.Random(7)
+    groups = [[rng.choice([rng.random() * 10 ** rng.randint(-6, 6), 0.1, 0.2, 0.3]) for _ in range(rng.randint(1, 50))]
+              for _ in range(40)]
+    codes = vectorized.np.array([code for code, values in enumerate(groups) for _ in values])
+    values = vectorized.np.array([value for values in groups for value in values])
+    counts = vectorized.np.bincount(codes, minlength=len(groups))
+    expected = []
+    for group in groups:
+        total = TimeTotal()
+        for value in group:
+            total.add(value)
+        expected.append(total.mean(len(group)))
+    assert vectorized.ExactSums(values).means(codes, counts) == expected
+
+
+@pytest.fixture(scope="module")
+def setup_database():
+    drop_all_tables()
+    create_tables()
+    users, questions, answers = _data(11, user_count=6, question_count=4, answer_count=40)
+    user_ids = {user.id: create_user(user) for user in users}
+    question_ids = {question.id: create_question(question) for question in questions}
+    for answer in answers:
+        create_user_answer(UserAnswer(user_id=user_ids[answer.user_id], question_id=question_ids[answer.question_id],
+                                      answer_text=answer.answer_text, is_correct=answer.is_correct,
+                                      time_taken=answer.time_taken))
+
+
+def test_load_answer_columns_matches_batch(setup_database):
+    loaded = vectorized.load_answer_columns()
+    batch = vectorized.AnswerColumns.from_batch(get_user_answer_batch())
+    for name in ('user_ids', 'question_ids', 'is_correct', 'seconds'):
+        assert getattr(loaded, name).tolist() == getattr(batch, name).tolist()
+
+
+def test_database_exercises_match_python_backend(setup_database):
+    users, questions, answers = get_all_users(), get_all_questions(), get_all_user_answers()
+    aggregates = aggregate_answers(answers)
+    columns = vectorized.ColumnAggregates(vectorized.load_answer_columns())
+    assert vectorized.exercise_3(users, columns) == service.exercise_3(users, answers, aggregates)
+    assert vectorized.exercise_4(questions, columns) == service.exercise_4(questions, answers, aggregates)
+    assert vectorized.exercise_7(columns) == service.exercise_7(answers, aggregates)
+    assert list(vectorized.iter_user_reports(users, len(questions), columns)) == \
+        list(service.iter_user_reports(users, len(questions), aggregates))